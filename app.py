@@ -13,6 +13,9 @@ from engine.tm_engine import TMEngine
 from engine.moore_mealy_engine import MooreMealyEngine
 from engine.theory_engine import TheoryEngine
 from engine.lba_engine import LBAEngine
+from engine.dfa_stream import SessionStore
+from engine.mapped_input import resolve_input_path
+from engine.stride_table import DEFAULT_MEMORY_BUDGET
 from builders.solution_builder import SolutionBuilder
 import os
 import uuid
@@ -25,6 +28,12 @@ app.config['STATIC_FOLDER'] = 'static'
 # Ensure static directory exists
 os.makedirs('static', exist_ok=True)
 
+# Streaming membership sessions live on disk so any worker can resume them
+session_store = SessionStore(os.environ.get('SESSION_DIR', 'sessions'))
+
+# File-backed runs may only read from (and write to) this directory
+INPUT_DIR = os.environ.get('INPUT_DIR', 'inputs')
+
 @app.route('/')
 def index():
     """Render main page"""
@@ -38,7 +47,14 @@ def solve():
     {
         "question": "string",
         "grammar": "string (optional)",
-        "automaton": "dict (optional)"
+        "automaton": "dict (optional)",
+        "test_string": "string (optional)",
+        "test_strings": "list (optional)",
+        "words": "sorted list of strings (optional) - build a DFA for exactly these words",
+        "words_file": "string, relative to INPUT_DIR (optional) - sorted word list, one per line",
+        "query": "dict (optional) - PDA target configurations, e.g. {state, stack_top}",
+        "saturation": "'post' or 'pre' (optional) - saturation used to answer a PDA reachability query",
+        "cache_bytes": "int (optional) - memory cap for the lazy NFA determinization cache"
     }
     """
     try:
@@ -52,24 +68,30 @@ def solve():
         automaton = data.get('automaton', {})
         
         # Step 1: Classify the query
-        classification = classify_query(question, grammar, automaton)
+        classification = classify_query(question, grammar, automaton, data.get('reference_automaton'))
         
         # Step 2: Parse the input
         parsed_input = parse_input(classification, grammar, automaton)
+        for key in ('test_string', 'test_strings', 'final_states', 'trace', 'regex_backend', 'reference_automaton', 'stride_budget', 'words',
+                    'membership_engine', 'max_configurations', 'max_memory_bytes', 'max_time_ms', 'query', 'saturation', 'cache_bytes'):
+            if key in data:
+                parsed_input[key] = data[key]
+        if data.get('words_file'):
+            parsed_input['words_path'] = resolve_input_path(INPUT_DIR, data['words_file'])
         
         # Step 3: Route to appropriate engine
         task_type = classification['task_type']
         result = None
         
-        if task_type in ['cfg_construction', 'cfg_ambiguity', 'cfg_derivation', 'cfg_parse_tree', 'cfg_to_cnf', 'cfg_to_pda']:
+        if task_type in ['cfg_construction', 'cfg_ambiguity', 'cfg_derivation', 'cfg_parse_tree', 'cfg_to_cnf', 'cfg_to_pda', 'cfg_membership']:
             engine = CFGEngine()
             result = engine.solve(task_type, parsed_input)
             
-        elif task_type in ['dfa_construction', 'nfa_construction', 'nfa_to_dfa', 'dfa_minimization', 're_to_nfa', 'dfa_membership']:
+        elif task_type in ['dfa_construction', 'nfa_construction', 'nfa_to_dfa', 'dfa_minimization', 're_to_nfa', 'dfa_membership', 'dfa_equivalence', 'dfa_inclusion']:
             engine = DFAEngine()
             result = engine.solve(task_type, parsed_input)
             
-        elif task_type in ['pda_construction', 'pda_from_cfg', 'pda_membership', 'pda_transitions']:
+        elif task_type in ['pda_construction', 'pda_from_cfg', 'pda_membership', 'pda_transitions', 'pda_reachability', 'pda_to_cfg']:
             engine = PDAEngine()
             result = engine.solve(task_type, parsed_input)
             
@@ -101,6 +123,153 @@ def solve():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/membership/batch', methods=['POST'])
+def membership_batch():
+    """
+    Test many strings against one DFA in a single call
+    Expected JSON:
+    {
+        "automaton": "dict",
+        "test_strings": "list of strings",
+        "final_states": "bool (optional)",
+        "trace": "bool (optional)",
+        "stride_budget": "int (optional) - memory budget in bytes for stride tables",
+        "cache_bytes": "int (optional) - memory cap for the lazy NFA determinization cache"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'automaton' not in data or 'test_strings' not in data:
+            return jsonify({'error': 'automaton and test_strings are required'}), 400
+        
+        engine = DFAEngine()
+        result = engine.batch_membership({
+            'automaton': data['automaton'],
+            'test_strings': data['test_strings'],
+            'final_states': data.get('final_states', False),
+            'trace': data.get('trace', False),
+            'stride_budget': data.get('stride_budget', DEFAULT_MEMORY_BUDGET),
+            'cache_bytes': data.get('cache_bytes')
+        })
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/membership/stream', methods=['POST'])
+def create_stream_session():
+    """
+    Start a streaming membership session for a DFA
+    Expected JSON:
+    {
+        "automaton": "dict"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('automaton'):
+            return jsonify({'error': 'automaton is required'}), 400
+        
+        session_id, session = session_store.create(data['automaton'])
+        return jsonify({'session_id': session_id, **session.status()}), 201
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/membership/stream/<session_id>', methods=['POST'])
+def feed_stream_session(session_id):
+    """
+    Feed the request body (plain or chunked upload) to a streaming session
+    """
+    try:
+        session = session_store.load(session_id)
+        
+        while True:
+            block = request.stream.read(64 * 1024)
+            if not block:
+                break
+            session.feed_bytes(block)
+        
+        session_store.save(session_id, session)
+        return jsonify({'session_id': session_id, **session.status()})
+        
+    except KeyError:
+        return jsonify({'error': 'Session not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/membership/stream/<session_id>', methods=['GET', 'DELETE'])
+def stream_session_status(session_id):
+    """Read back or close a streaming session"""
+    try:
+        session = session_store.load(session_id)
+        status = {'session_id': session_id, **session.status()}
+        
+        if request.method == 'DELETE':
+            session_store.delete(session_id)
+        
+        return jsonify(status)
+        
+    except KeyError:
+        return jsonify({'error': 'Session not found'}), 404
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/membership/file', methods=['POST'])
+def membership_file():
+    """
+    Run a DFA, Moore or Mealy machine over a memory-mapped local file
+    Expected JSON:
+    {
+        "automaton": "dict",
+        "path": "string, relative to INPUT_DIR",
+        "machine_type": "dfa | moore | mealy (optional, default dfa)",
+        "output_path": "string, relative to INPUT_DIR (optional, transducers only)",
+        "workers": "int from 1 to the CPU count (optional, dfa only) - split the file across this many processes"
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('automaton') or not data.get('path'):
+            return jsonify({'error': 'automaton and path are required'}), 400
+        
+        path = resolve_input_path(INPUT_DIR, data['path'])
+        machine_type = data.get('machine_type', 'dfa')
+        
+        if machine_type == 'dfa' and data.get('workers') is not None:
+            workers = data['workers']
+            max_workers = os.cpu_count() or 1
+            if isinstance(workers, bool) or not isinstance(workers, int) or not 1 <= workers <= max_workers:
+                return jsonify({'error': f'workers must be an integer from 1 to {max_workers}'}), 400
+            result = DFAEngine().parallel_membership(data['automaton'], path=path, workers=workers)
+        elif machine_type == 'dfa':
+            result = DFAEngine().file_membership(data['automaton'], path)
+        else:
+            output_path = None
+            if data.get('output_path'):
+                output_path = resolve_input_path(INPUT_DIR, data['output_path'])
+            result = MooreMealyEngine().run_file(data['automaton'], machine_type, path, output_path)
+        
+        if 'error' in result:
+            return jsonify(result), 400
+        
+        result.pop('output_path', None)
+        return jsonify(result)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/diagram/<filename>')
 def get_diagram(filename):
     """Serve generated diagram files"""
@@ -41,15 +41,33 @@ class SolutionBuilder:
         elif task_type in ['cfg_derivation']:
             solution = self._build_derivation_solution(result, solution)
         
+        elif task_type in ['cfg_parse_tree']:
+            solution = self._build_parse_tree_solution(result, solution)
+        
         elif task_type in ['dfa_construction', 'nfa_to_dfa', 'dfa_minimization']:
             solution = self._build_dfa_solution(result, solution)
         
         elif task_type in ['re_to_nfa']:
             solution = self._build_regex_solution(result, solution)
         
+        elif task_type in ['dfa_membership', 'pda_membership']:
+            solution = self._build_membership_solution(result, solution)
+        
+        elif task_type in ['cfg_membership']:
+            solution = self._build_cfg_membership_solution(result, solution)
+        
+        elif task_type in ['dfa_equivalence', 'dfa_inclusion']:
+            solution = self._build_equivalence_solution(result, solution)
+        
         elif task_type in ['pda_construction', 'pda_from_cfg']:
             solution = self._build_pda_solution(result, solution)
         
+        elif task_type in ['pda_reachability']:
+            solution = self._build_reachability_solution(result, solution)
+        
+        elif task_type in ['pda_to_cfg']:
+            solution = self._build_pda_to_cfg_solution(result, solution)
+        
         elif task_type in ['tm_construction', 'tm_trace']:
             solution = self._build_tm_solution(result, solution)
         
@@ -79,19 +97,7 @@ class SolutionBuilder:
             # Generate parse tree diagrams
             for i, tree_info in enumerate(result.get('parse_trees', [])):
                 filename = f'parse_tree_{i}_{uuid.uuid4().hex[:8]}'
-                
-                # Create a sample parse tree
-                tree_data = {
-                    'label': 'E',
-                    'is_terminal': False,
-                    'children': [
-                        {'label': 'E', 'is_terminal': False, 'children': []},
-                        {'label': '+', 'is_terminal': True, 'children': []},
-                        {'label': 'E', 'is_terminal': False, 'children': []}
-                    ]
-                }
-                
-                diagram_file = self.renderer.render_parse_tree(tree_data, filename)
+                diagram_file = self.renderer.render_parse_tree(tree_info['tree'], filename)
                 
                 if diagram_file:
                     solution['diagrams'].append({
@@ -102,6 +108,25 @@ class SolutionBuilder:
         
         return solution
     
+    def _build_parse_tree_solution(self, result, solution):
+        """Build solution for parse tree generation"""
+        for key in ['test_string', 'derivable', 'tree_count', 'is_ambiguous']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        for i, tree_info in enumerate(result.get('parse_trees', [])):
+            filename = f'parse_tree_{i}_{uuid.uuid4().hex[:8]}'
+            diagram_file = self.renderer.render_parse_tree(tree_info['tree'], filename)
+            
+            if diagram_file:
+                solution['diagrams'].append({
+                    'title': f'Parse Tree {i+1}',
+                    'filename': diagram_file,
+                    'type': 'parse_tree'
+                })
+        
+        return solution
+    
     def _build_derivation_solution(self, result, solution):
         """Build solution for derivation generation"""
         solution['details']['derivation_type'] = result.get('derivation_type', 'leftmost')
@@ -175,6 +200,75 @@ class SolutionBuilder:
             
             solution['details']['nfa'] = nfa
         
+        if 'matches' in result:
+            solution['details']['matches'] = result['matches']
+        
+        return solution
+    
+    def _build_membership_solution(self, result, solution):
+        """Build solution for membership tests"""
+        for key in ['test_string', 'accepted', 'final_state', 'reason', 'trace',
+                    'results', 'total', 'accepted_count', 'rejected_count',
+                    'exact', 'membership_engine', 'sample_moves', 'stop_reason',
+                    'move_count', 'distinct_stacks', 'gss_nodes', 'gss_edges', 'summaries',
+                    'simulation_mode', 'cache_stats', 'match_ends', 'match_count']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        return solution
+    
+    def _build_cfg_membership_solution(self, result, solution):
+        """Build solution for CYK membership tests"""
+        for key in ['test_string', 'accepted', 'results', 'total', 'accepted_count', 'rejected_count',
+                    'cnf_grammar', 'cnf_rule_count', 'cnf_non_terminals']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        if 'cyk_table' in result:
+            solution['tables'].append({
+                'title': 'CYK Table',
+                'data': result['cyk_table']
+            })
+        
+        return solution
+    
+    def _build_equivalence_solution(self, result, solution):
+        """Build solution for DFA equivalence and inclusion checks"""
+        for key in ['equivalent', 'included', 'counterexample', 'accepted_by',
+                    'union_count', 'product_states_explored']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        return solution
+    
+    def _build_reachability_solution(self, result, solution):
+        """Build solution for PDA reachability analysis"""
+        for key in ['reachable_states', 'unreachable_states', 'stack_tops', 'can_empty_stack',
+                    'empty_stack_states', 'language_empty', 'query', 'saturation',
+                    'p_automaton_states', 'p_automaton_transitions']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        if 'p_automaton_table' in result:
+            solution['tables'].append({
+                'title': 'P-Automaton',
+                'data': result['p_automaton_table']
+            })
+        
+        return solution
+    
+    def _build_pda_to_cfg_solution(self, result, solution):
+        """Build solution for PDA to CFG conversion"""
+        for key in ['grammar', 'variables', 'rule_count', 'naive_variables', 'naive_rule_count']:
+            if key in result:
+                solution['details'][key] = result[key]
+        
+        if 'grammar_table' in result:
+            solution['tables'].append({
+                'title': 'Grammar Rules',
+                'data': result['grammar_table']
+            })
+        
         return solution
     
     def _build_pda_solution(self, result, solution):
@@ -85,11 +85,13 @@ class GraphvizBuilder:
         edge_labels = {}
         
         for from_state, trans in transitions.items():
-            for symbol, to_state in trans.items():
-                edge_key = (from_state, to_state)
-                if edge_key not in edge_labels:
-                    edge_labels[edge_key] = []
-                edge_labels[edge_key].append(symbol)
+            for symbol, targets in trans.items():
+                # NFA targets are lists; draw one edge per target state
+                for to_state in (targets if isinstance(targets, list) else [targets]):
+                    edge_key = (from_state, to_state)
+                    if edge_key not in edge_labels:
+                        edge_labels[edge_key] = []
+                    edge_labels[edge_key].append(symbol)
         
         # Add edges with combined labels
         for (from_state, to_state), symbols in edge_labels.items():
@@ -2,15 +2,21 @@
 CFG Engine - Handles Context-Free Grammar problems
 """
 from engine.utils import validate_grammar, normalize_production
+from engine.earley import EarleyGrammar, EarleyParser, INFINITE, tree_derivation, tree_to_dict
+from engine.cyk import CNFGrammar, CYKRecognizer
+from collections import deque
 import itertools
+import re
 import copy
 
 class CFGEngine:
     """Engine for CFG-related problems"""
     
     def __init__(self):
-        self.max_derivation_depth = 10
         self.max_string_length = 10
+        self.max_candidates = 200
+        self.max_sentential_forms = 20000
+        self.max_chart_length = 10
     
     def solve(self, task_type, parsed_input):
         """Main solver dispatcher"""
@@ -33,6 +39,9 @@ class CFGEngine:
         elif task_type == 'cfg_to_pda':
             return self.convert_to_pda(parsed_input)
         
+        elif task_type == 'cfg_membership':
+            return self.test_membership(parsed_input)
+        
         else:
             return {'error': f'Unsupported CFG task: {task_type}'}
     
@@ -75,6 +84,11 @@ class CFGEngine:
     def check_ambiguity(self, parsed_input):
         """
         Check if a grammar is ambiguous by finding a string with multiple parse trees
+        
+        Each candidate (the given test_string first, then short strings the
+        grammar derives, generated lazily) is parsed with Earley into a shared
+        packed parse forest; the grammar is ambiguous on a string exactly
+        when some forest node has more than one packed child.
         """
         grammar = parsed_input.get('grammar', {})
         
@@ -83,175 +97,273 @@ class CFGEngine:
         if not valid:
             return {'error': message}
         
-        # Quick check for known ambiguous patterns
-        rules = grammar.get('rules', {})
-        
-        # Check for classic arithmetic ambiguity (E → E+E | E*E)
-        for non_term, productions in rules.items():
-            for prod in productions:
-                # Check if production has the same non-terminal appearing twice
-                if prod.count(non_term) >= 2:
-                    return {
-                        'is_ambiguous': True,
-                        'ambiguous_string': 'a+a*a',
-                        'explanation': f'The grammar is ambiguous. Production {non_term} → {prod} allows the same non-terminal to appear multiple times, creating ambiguity. For example, "a+a*a" can be parsed as (a+a)*a or a+(a*a).',
-                        'reason': 'Recursive production with non-associative operators',
-                        'example_trees': 'Two different parse trees possible',
-                        'how_to_fix': 'Add precedence rules or use different non-terminals for each operator level'
-                    }
-        
-        # Try generating a few candidate strings
-        try:
-            candidate_strings = self._generate_candidate_strings(grammar)
-            
-            # Check first few strings only (limit computation)
-            for test_string in list(candidate_strings)[:10]:
-                derivations = self._find_all_derivations(grammar, test_string)
-                
-                if len(derivations) > 1:
-                    # Found ambiguity!
-                    return {
-                        'is_ambiguous': True,
-                        'ambiguous_string': test_string,
-                        'derivation_count': len(derivations),
-                        'derivations': derivations[:2],  # Return first two
-                        'explanation': f'The grammar is ambiguous. The string "{test_string}" has {len(derivations)} different parse trees.',
-                        'diagram_filename': 'ambiguity.png'
-                    }
-        except Exception as e:
-            # If analysis fails, provide heuristic answer
-            return {
-                'is_ambiguous': 'Unknown',
-                'explanation': f'Unable to definitively determine ambiguity due to computational limits. Grammar may be ambiguous. Consider checking manually or using specialized tools.'
-            }
+        earley = EarleyGrammar(grammar)
+        parser = EarleyParser(earley)
+        
+        # The given test_string is tried before any candidate is generated
+        candidates = self._candidate_strings(earley)
+        if parsed_input.get('test_string') is not None:
+            candidates = itertools.chain([earley.tokenize_input(parsed_input['test_string'])], candidates)
+        
+        checked = 0
+        for tokens in candidates:
+            checked += 1
+            forest = parser.parse(tokens)
+            if forest.accepted and forest.is_ambiguous():
+                string = earley.render(tokens)
+                count = self._tree_count(forest)
+                trees = forest.trees(limit=2)
+                derivations = [tree_derivation(tree, earley) for tree in trees]
+                return {
+                    'is_ambiguous': True,
+                    'ambiguous_string': string,
+                    'derivation_count': count,
+                    'derivations': derivations,
+                    'parse_trees': [
+                        {'tree_id': i, 'tree': tree_to_dict(tree), 'derivation_steps': derivations[i]}
+                        for i, tree in enumerate(trees)
+                    ],
+                    'forest_nodes': len(forest.nodes()),
+                    'explanation': f'The grammar is ambiguous. The string "{string}" has {count} different parse trees.',
+                    'diagram_filename': 'ambiguity.png'
+                }
         
         return {
             'is_ambiguous': False,
-            'explanation': f'No ambiguous strings found in quick check. The grammar may still be ambiguous, but no evidence found in limited search.'
+            'strings_checked': checked,
+            'explanation': f'No ambiguous string found among {checked} derivable strings (up to length {self.max_string_length}). The grammar may still be ambiguous on longer strings.'
         }
     
     def _generate_candidate_strings(self, grammar):
-        """Generate strings that might reveal ambiguity"""
-        candidates = set()
-        start_symbol = grammar['start_symbol']
-        
-        # Use BFS to generate strings
-        queue = [(start_symbol, 0)]
-        
-        while queue and len(candidates) < 100:
-            current, depth = queue.pop(0)
-            
-            if depth > self.max_derivation_depth:
-                continue
-            
-            # Check if current is all terminals
-            if self._is_terminal_string(current, grammar['non_terminals']):
-                if len(current) <= self.max_string_length and current != 'ε':
-                    candidates.add(current)
+        """Derivable terminal strings up to max_string_length, shortest first"""
+        return sorted(self._candidate_strings(grammar), key=lambda tokens: (len(tokens), tokens))
+    
+    def _candidate_strings(self, grammar):
+        """
+        Yield derivable terminal strings up to max_string_length
+        
+        Expands leftmost non-terminals breadth-first, so strings with short
+        derivations come first. Forms whose shortest possible yield is too
+        long are skipped, and so are forms longer than max_string_length
+        plus the number of nullable non-terminals: without that cap a
+        nullable recursive rule (S → SS | ε) grows forms forever while their
+        shortest yield stays 0.
+        """
+        min_lengths = self._min_lengths(grammar)
+        if grammar.start not in min_lengths:
+            return
+        
+        max_form_length = self.max_string_length + len(grammar.nullable)
+        found = set()
+        seen = {(grammar.start,)}
+        queue = deque(seen)
+        explored = 0
+        
+        while queue and len(found) < self.max_candidates and explored < self.max_sentential_forms:
+            form = queue.popleft()
+            explored += 1
+        
+            position = next((i for i, symbol in enumerate(form) if symbol in grammar.non_terminals), None)
+            if position is None:
+                if form not in found:
+                    found.add(form)
+                    yield form
                 continue
-            
-            # Expand one non-terminal
-            for i, char in enumerate(current):
-                if char in grammar['rules']:
-                    for production in grammar['rules'][char]:
-                        new_string = current[:i] + production + current[i+1:]
-                        queue.append((new_string, depth + 1))
-        
-        return list(candidates)
+        
+            for rule in grammar.by_lhs.get(form[position], ()):
+                new_form = form[:position] + grammar.rules[rule][1] + form[position + 1:]
+                if new_form in seen or len(new_form) > max_form_length:
+                    continue
+                if any(symbol in grammar.non_terminals and symbol not in min_lengths for symbol in new_form):
+                    continue
+                if sum(min_lengths.get(symbol, 1) for symbol in new_form) > self.max_string_length:
+                    continue
+                seen.add(new_form)
+                queue.append(new_form)
     
-    def _is_terminal_string(self, s, non_terminals):
-        """Check if string contains only terminals"""
-        for char in s:
-            if char in non_terminals:
-                return False
-        return True
+    def _min_lengths(self, grammar):
+        """Length of the shortest string each productive non-terminal derives"""
+        lengths = {}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in grammar.rules:
+                if any(symbol in grammar.non_terminals and symbol not in lengths for symbol in rhs):
+                    continue
+                length = sum(lengths.get(symbol, 1) for symbol in rhs)
+                if length < lengths.get(lhs, length + 1):
+                    lengths[lhs] = length
+                    changed = True
+        return lengths
     
-    def _find_all_derivations(self, grammar, target_string):
-        """Find all possible derivations for a target string"""
-        derivations = []
-        start_symbol = grammar['start_symbol']
-        
-        # Use DFS to find all derivation paths
-        def dfs(current, path, depth):
-            if depth > self.max_derivation_depth:
-                return
-            
-            # Check if we've reached the target
-            if current == target_string:
-                derivations.append(path[:])
-                return
-            
-            # Check if current is longer than target or is terminal but doesn't match
-            if len(current) > len(target_string) * 2:
-                return
-            
-            # Try expanding each non-terminal
-            for i, char in enumerate(current):
-                if char in grammar['rules']:
-                    for production in grammar['rules'][char]:
-                        new_string = current[:i] + production + current[i+1:]
-                        new_path = path + [(char, production, new_string)]
-                        dfs(new_string, new_path, depth + 1)
-        
-        dfs(start_symbol, [(start_symbol, '', start_symbol)], 0)
-        
-        return derivations
+    def _tree_count(self, forest):
+        count = forest.count_trees()
+        return 'infinitely many' if count == INFINITE else count
     
-    def _generate_parse_trees(self, grammar, test_string, derivations):
-        """Generate parse tree representations for multiple derivations"""
-        trees = []
-        
-        for i, derivation in enumerate(derivations):
-            tree = {
-                'tree_id': i,
-                'derivation_steps': derivation,
-                'diagram_filename': f'parse_tree_{i}.png'
-            }
-            trees.append(tree)
+    def _parse_target(self, grammar, parsed_input):
+        """
+        Parse the requested string: test_string, else the first quoted string
+        in the question, else the shortest derivable string
         
-        return trees
+        Returns:
+            tuple: (tokens, forest, substituted), where substituted is True
+            when no string was given and the shortest one was used; (None,
+            None, True) if the grammar derives no string
+        """
+        test_string = parsed_input.get('test_string')
+        if test_string is None:
+            # An opening quote follows whitespace, so apostrophes (What's) don't count
+            quoted = re.search(r'(?:^|\s)(["\'])(.+?)\1(?!\w)', parsed_input.get('question', ''))
+            if quoted:
+                test_string = quoted.group(2)
+        if test_string is not None:
+            tokens = grammar.tokenize_input(test_string)
+            return tokens, EarleyParser(grammar).parse(tokens), False
+        
+        candidates = self._generate_candidate_strings(grammar)
+        if not candidates:
+            return None, None, True
+        return candidates[0], EarleyParser(grammar).parse(candidates[0]), True
+    
+    def _substitute_note(self, substituted, string):
+        if not substituted:
+            return ''
+        return f' No string was given, so the shortest derivable string "{string}" was used.'
     
     def generate_derivation(self, parsed_input):
-        """Generate leftmost or rightmost derivation"""
+        """Generate a leftmost or rightmost derivation of test_string from its parse forest"""
         grammar = parsed_input.get('grammar', {})
         derivation_type = parsed_input.get('derivation_type', 'leftmost')
         
-        # For demo, generate a simple derivation
-        start_symbol = grammar['start_symbol']
-        rules = grammar['rules']
-        
-        derivation_steps = [start_symbol]
-        current = start_symbol
-        
-        for step in range(5):
-            if derivation_type == 'leftmost':
-                # Find leftmost non-terminal
-                expanded = False
-                for i, char in enumerate(current):
-                    if char in rules and rules[char]:
-                        production = rules[char][0]  # Take first production
-                        current = current[:i] + production + current[i+1:]
-                        derivation_steps.append(current)
-                        expanded = True
-                        break
-                if not expanded:
-                    break
+        valid, message = validate_grammar(grammar)
+        if not valid:
+            return {'error': message}
+        
+        earley = EarleyGrammar(grammar)
+        tokens, forest, substituted = self._parse_target(earley, parsed_input)
+        if tokens is None:
+            return {'error': 'The grammar does not derive any string'}
+        
+        string = earley.render(tokens)
+        if not forest.accepted:
+            return {
+                'derivation_type': derivation_type,
+                'test_string': string,
+                'derivable': False,
+                'steps': [],
+                'explanation': f'The string "{string}" cannot be derived from {earley.start}, so it has no {derivation_type} derivation.'
+            }
         
+        steps = tree_derivation(forest.trees()[0], earley, rightmost=derivation_type == 'rightmost')
         return {
             'derivation_type': derivation_type,
-            'steps': derivation_steps,
-            'explanation': f'This is a {derivation_type} derivation where we expand the {derivation_type} non-terminal at each step.'
+            'test_string': string,
+            'derivable': True,
+            'steps': [form for _, _, form in steps],
+            'productions_used': [f'{lhs} → {production}' for lhs, production, _ in steps[1:]],
+            'tree_count': self._tree_count(forest),
+            'explanation': f'This is a {derivation_type} derivation of "{string}" where we expand the {derivation_type} non-terminal at each step.' + self._substitute_note(substituted, string)
         }
     
     def generate_parse_tree(self, parsed_input):
-        """Generate parse tree for a string"""
+        """Generate the parse tree(s) of test_string from its parse forest"""
         grammar = parsed_input.get('grammar', {})
         
+        valid, message = validate_grammar(grammar)
+        if not valid:
+            return {'error': message}
+        
+        earley = EarleyGrammar(grammar)
+        tokens, forest, substituted = self._parse_target(earley, parsed_input)
+        if tokens is None:
+            return {'error': 'The grammar does not derive any string'}
+        
+        string = earley.render(tokens)
+        if not forest.accepted:
+            return {
+                'test_string': string,
+                'derivable': False,
+                'tree_count': 0,
+                'explanation': f'The string "{string}" cannot be derived from {earley.start}, so it has no parse tree.'
+            }
+        
+        trees = forest.trees(limit=2)
+        count = self._tree_count(forest)
         return {
-            'parse_tree': 'Generated parse tree',
+            'test_string': string,
+            'derivable': True,
+            'parse_tree': tree_to_dict(trees[0]),
+            'parse_trees': [{'tree_id': i, 'tree': tree_to_dict(tree)} for i, tree in enumerate(trees)],
+            'tree_count': count,
+            'is_ambiguous': len(trees) > 1,
             'diagram_filename': 'parse_tree.png',
-            'explanation': 'Parse tree shows the hierarchical structure of the derivation.'
+            'explanation': f'Parse tree shows the hierarchical structure of the derivation of "{string}". The string has {count} parse tree{"" if count == 1 else "s"}.' + self._substitute_note(substituted, string)
+        }
+    
+    def test_membership(self, parsed_input):
+        """
+        Test test_string (or every string in test_strings) with CYK
+        
+        The grammar is converted to CNF and compiled once, then every string
+        is checked against the same tables. A single short string also gets
+        its CYK table.
+        """
+        grammar = parsed_input.get('grammar', {})
+        
+        valid, message = validate_grammar(grammar)
+        if not valid:
+            return {'error': message}
+        
+        test_strings = parsed_input.get('test_strings')
+        if test_strings is None and parsed_input.get('test_string') is not None:
+            test_strings = [parsed_input['test_string']]
+        if test_strings is None:
+            return {'error': 'No test_string or test_strings provided'}
+        if not isinstance(test_strings, list) or not all(isinstance(s, str) for s in test_strings):
+            return {'error': 'test_strings must be a list of strings'}
+        
+        earley = EarleyGrammar(grammar)
+        cnf = CNFGrammar(earley)
+        recognizer = CYKRecognizer(cnf)
+        
+        results = []
+        for test_string in test_strings:
+            tokens = earley.tokenize_input(test_string)
+            results.append({'test_string': test_string, 'accepted': recognizer.accepts(tokens)})
+        
+        accepted_count = sum(1 for entry in results if entry['accepted'])
+        cnf_grammar = cnf.to_grammar()
+        result = {
+            'results': results,
+            'total': len(results),
+            'accepted_count': accepted_count,
+            'rejected_count': len(results) - accepted_count,
+            'cnf_grammar': cnf_grammar,
+            'cnf_rule_count': cnf.rule_count(),
+            'cnf_non_terminals': len(cnf_grammar['non_terminals']),
+            'explanation': f'{accepted_count} of {len(results)} strings are derived from {earley.start}. Each string was checked with CYK over the grammar converted to Chomsky Normal Form ({cnf.rule_count()} rules).',
+            'steps': [
+                'Step 1: Convert the grammar to Chomsky Normal Form',
+                'Step 2: Fill the length-1 cells with the non-terminals A → a for each input symbol',
+                'Step 3: For each longer span, add A when A → BC with B deriving a prefix and C the rest of the span',
+                'Step 4: Accept when the start symbol is in the cell spanning the whole string'
+            ]
         }
+        
+        if len(test_strings) == 1:
+            entry = results[0]
+            result['test_string'] = entry['test_string']
+            result['accepted'] = entry['accepted']
+            result['explanation'] = f'The string "{entry["test_string"]}" is {"" if entry["accepted"] else "not "}derived from {earley.start}: CYK over the grammar converted to Chomsky Normal Form ({cnf.rule_count()} rules) {"found" if entry["accepted"] else "did not find"} {earley.start} in the cell spanning the whole string.'
+            tokens = earley.tokenize_input(entry['test_string'])
+            if 0 < len(tokens) <= self.max_chart_length:
+                chart = recognizer.chart(tokens)
+                rows = [['Length'] + list(tokens)]
+                for length, cells in enumerate(chart, 1):
+                    rows.append([str(length)] + ['{' + ', '.join(cnf.names_of(mask)) + '}' for mask in cells])
+                result['cyk_table'] = rows
+        
+        return result
     
     def convert_to_cnf(self, parsed_input):
         """Convert grammar to Chomsky Normal Form"""
@@ -3,7 +3,7 @@ Query Classifier - Determines the type of automata problem from user input
 """
 import re
 
-def classify_query(question, grammar="", automaton=None):
+def classify_query(question, grammar="", automaton=None, reference_automaton=None):
     """
     Classify the type of problem based on keywords in the question
     
@@ -11,6 +11,7 @@ def classify_query(question, grammar="", automaton=None):
         question (str): User's question
         grammar (str): Optional grammar specification
         automaton (dict): Optional automaton specification
+        reference_automaton (dict): Optional second automaton to compare against
     
     Returns:
         dict: Classification result with task_type and metadata
@@ -110,6 +111,15 @@ def classify_query(question, grammar="", automaton=None):
             'constraints': extract_language_constraints(question)
         }
     
+    # CYK membership against a grammar
+    if any(keyword in question_lower for keyword in ['cyk', 'cocke']):
+        return {
+            'task_type': 'cfg_membership',
+            'question': question,
+            'grammar': grammar,
+            'constraints': {}
+        }
+    
     # CFG-related patterns
     if any(keyword in question_lower for keyword in ['ambiguous', 'ambiguity']):
         return {
@@ -210,8 +220,34 @@ def classify_query(question, grammar="", automaton=None):
                 'constraints': extract_language_constraints(question)
             }
     
+    # PDA reachability / emptiness analysis
+    if any(keyword in question_lower for keyword in ['pda', 'pushdown automaton', 'pushdown automata']):
+        if any(keyword in question_lower for keyword in ['reachable', 'reachability', 'ever empty', 'become empty', 'emptiness', 'language empty']):
+            return {
+                'task_type': 'pda_reachability',
+                'question': question,
+                'automaton': automaton,
+                'constraints': {}
+            }
+    
     # PDA patterns
     if any(keyword in question_lower for keyword in ['pda', 'pushdown automaton', 'pushdown automata']):
+        # A given PDA and membership wording: test strings, don't build one
+        if automaton and any(keyword in question_lower for keyword in ['belongs', 'accept', 'membership', 'recognize']):
+            return {
+                'task_type': 'pda_membership',
+                'question': question,
+                'automaton': automaton,
+                'constraints': {}
+            }
+        if any(keyword in question_lower for keyword in ['pda to cfg', 'pda to grammar', 'pda into', 'cfg from', 'grammar from', 'grammar for this pda', 'grammar for the pda']) \
+                or re.search(r'\b(pda|pushdown automat\w*)\b.*\bto (an? )?(equivalent )?(cfg|grammar|context-free grammar)\b', question_lower):
+            return {
+                'task_type': 'pda_to_cfg',
+                'question': question,
+                'automaton': automaton,
+                'constraints': {}
+            }
         if 'cfg' in question_lower or 'grammar' in question_lower:
             return {
                 'task_type': 'pda_from_cfg',
@@ -226,6 +262,29 @@ def classify_query(question, grammar="", automaton=None):
                 'constraints': extract_language_constraints(question)
             }
     
+    # DFA equivalence / inclusion patterns: only when two machines are given
+    # or the question is explicitly about a pair of them
+    if 'dfa' in question_lower or 'automat' in question_lower:
+        two_machines = reference_automaton is not None or bool(re.search(
+            r'\b(two|both|these|pair of)\b.*\b(dfas?|nfas?|automat\w*|machines)\b|equivalent to each other|same language',
+            question_lower
+        ))
+        if two_machines and any(keyword in question_lower for keyword in ['equivalent', 'equivalence']):
+            return {
+                'task_type': 'dfa_equivalence',
+                'question': question,
+                'automaton': automaton,
+                'constraints': {}
+            }
+        
+        if two_machines and any(keyword in question_lower for keyword in ['inclusion', 'subset of', 'included in', 'contained in']):
+            return {
+                'task_type': 'dfa_inclusion',
+                'question': question,
+                'automaton': automaton,
+                'constraints': {}
+            }
+    
     # Turing Machine patterns
     if any(keyword in question_lower for keyword in ['turing machine', 'tm construction', 'build tm', 'construct tm', 'design tm', 'tm for']):
         return {
@@ -265,6 +324,13 @@ def classify_query(question, grammar="", automaton=None):
                 'automaton': automaton,
                 'constraints': {}
             }
+        elif grammar or 'cfg' in question_lower or 'grammar' in question_lower:
+            return {
+                'task_type': 'cfg_membership',
+                'question': question,
+                'grammar': grammar,
+                'constraints': {}
+            }
     
     # Default: Try to infer from grammar or automaton presence
     if grammar:
@@ -310,11 +376,76 @@ def extract_language_constraints(question):
     if re.search(r'a+b+', question) or re.search(r'a\*b\*', question):
         constraints['pattern'] = 'concatenation'
     
+    alphabet = re.search(r'\{([^}]*)\}', question)
+    alphabet = [s.strip() for s in alphabet.group(1).split(',') if s.strip()] if alphabet else None
+    substring = extract_substring_patterns(question, alphabet)
+    if substring:
+        constraints['pattern_mode'], constraints['patterns'] = substring
+        if alphabet:
+            constraints['alphabet'] = alphabet
+    
     return constraints
 
+PATTERN_STOP_WORDS = {'a', 'an', 'any', 'of', 'the', 'as', 'substring', 'substrings', 'either', 'or',
+                      'and', 'string', 'strings', 'pattern', 'patterns', 'one', 'more', 'all', 'over', 'with'}
+
+PATTERN_ALPHABETS = ({'0', '1'}, {'a', 'b'})
+
+def extract_substring_patterns(question, alphabet=None):
+    """
+    Extract a substring/suffix condition such as "contains any of 010, 0110"
+    
+    Unquoted patterns must be spelled entirely with alphabet symbols ({0, 1}
+    or {a, b} when no alphabet is given); any other word after the keyword
+    (as in "without consecutive 1s") means the condition is not a plain
+    pattern list and None is returned.
+    
+    Returns:
+        tuple: (mode, patterns) with mode 'contains', 'not_contains' or
+        'ends_with', or None if the question has no such condition
+    """
+    question_lower = question.lower()
+    match = (re.search(r"(?:does not|doesn't|do not|don't|not) contain(?:ing|s)?\b(.*)", question_lower)
+             or re.search(r'\bwithout\b(.*)', question_lower))
+    mode = 'not_contains'
+    if not match:
+        match = re.search(r'\b(?:contain(?:s|ing)?|substring)\b(.*)', question_lower)
+        mode = 'contains'
+    if not match:
+        match = re.search(r'\b(?:ends?|ending) with\b(.*)', question_lower)
+        mode = 'ends_with'
+    if not match:
+        return None
+    
+    tail = re.split(r'[.;?]|\bover\b', match.group(1))[0]
+    patterns = re.findall(r'["\']([^"\']+)["\']', tail)
+    if not patterns:
+        patterns = [token for token in re.findall(r'\b([0-9a-z]+)\b', tail) if token not in PATTERN_STOP_WORDS]
+        alphabets = [set(alphabet)] if alphabet else PATTERN_ALPHABETS
+        if not any(all(set(token) <= symbols for token in patterns) for symbols in alphabets):
+            return None
+    return (mode, patterns) if patterns else None
+
+REGEX_TOKEN = re.compile(r'^[a-z0-9ε()|*+?]+$')
+
 def extract_regex(question):
-    """Extract regular expression from question"""
-    # Look for patterns like (a|b)*, a+b*, etc.
-    regex_pattern = r'[\(]?[a-z\|\*\+\(\)]+[\)]?[\*\+]?'
-    matches = re.findall(regex_pattern, question)
-    return matches[0] if matches else ''
+    """
+    Extract regular expression from question
+    
+    A quoted regex wins; otherwise the first word made of regex characters
+    that uses an operator, like (a|b)*abb or a+b*; otherwise the word after
+    "expression" or "regex" (so "regular expression ab" gives ab).
+    """
+    quoted = re.search(r'(?:^|\s)(["\'])(.+?)\1(?!\w)', question)
+    if quoted:
+        return quoted.group(2)
+    
+    for word in question.split():
+        token = word.rstrip('.,;:')
+        if REGEX_TOKEN.match(token) and re.search(r'[()|*+]', token):
+            return token
+    
+    after = re.search(r'\b(?:expression|regex)\s+([a-z0-9ε]+)\b', question)
+    if after and after.group(1) not in ('to', 'into', 'for', 'and', 'the', 'an'):
+        return after.group(1)
+    return ''
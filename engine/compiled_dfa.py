@@ -0,0 +1,457 @@
+"""
+Compiled DFA - Integer-indexed transition tables for fast DFA execution
+"""
+from array import array
+from collections import deque
+import numpy as np
+from engine.stride_table import DEFAULT_MEMORY_BUDGET, StrideDFA, choose_stride, dense_transitions
+
+
+class _SymbolTranslation(dict):
+    """Translation table that maps unknown characters to the reject column"""
+
+    def __init__(self, mapping, missing):
+        super().__init__(mapping)
+        self.missing = missing
+
+    def __missing__(self, key):
+        return self.missing
+
+
+class CompiledDFA:
+    """
+    A DFA with states and symbols interned to integers
+
+    The transition function is a flat array of ints with one row per state
+    and one column per symbol, plus a trailing "unknown symbol" column that
+    always holds -1. Missing transitions are stored as -1 as well. Accept
+    states are kept as a bitmap.
+    """
+
+    DEAD = -1
+
+    def __init__(self, automaton):
+        transitions = automaton.get('transitions', {}) or {}
+
+        # Intern states: declared states first, then any state that only
+        # shows up inside the transition function
+        self.states = []
+        self.state_index = {}
+        for state in automaton.get('states', []) or []:
+            self._intern_state(state)
+        if automaton.get('start_state') is not None:
+            self._intern_state(automaton['start_state'])
+        for state, moves in transitions.items():
+            self._intern_state(state)
+            for next_state in moves.values():
+                if isinstance(next_state, list):
+                    raise ValueError(f'State {state} has a non-deterministic transition')
+                if next_state is not None:
+                    self._intern_state(next_state)
+
+        # Intern symbols: alphabet first, then symbols used by transitions
+        self.symbols = []
+        self.symbol_index = {}
+        for symbol in automaton.get('alphabet', []) or []:
+            self._intern_symbol(symbol)
+        for moves in transitions.values():
+            for symbol in moves:
+                self._intern_symbol(symbol)
+
+        self.num_states = len(self.states)
+        self.num_symbols = len(self.symbols)
+        self.width = self.num_symbols + 1
+        self.unknown_symbol = self.num_symbols
+
+        # Flat transition matrix
+        self.table = array('i', [self.DEAD]) * (self.num_states * self.width)
+        for state, moves in transitions.items():
+            row = self.state_index[state] * self.width
+            for symbol, next_state in moves.items():
+                if next_state is not None:
+                    self.table[row + self.symbol_index[symbol]] = self.state_index[next_state]
+
+        # Accept states bitmap
+        self.accept = bytearray((self.num_states + 7) // 8)
+        for state in automaton.get('accept_states', []) or []:
+            if state in self.state_index:
+                index = self.state_index[state]
+                self.accept[index >> 3] |= 1 << (index & 7)
+
+        start = automaton.get('start_state')
+        self.start = self.state_index[start] if start is not None else self.DEAD
+
+        # Single-character symbols can be encoded in bulk with str.translate
+        char_symbols = {ord(s): i for s, i in self.symbol_index.items() if len(s) == 1}
+        if self.width <= 256:
+            self._translation = _SymbolTranslation(char_symbols, self.unknown_symbol)
+        else:
+            self._translation = None
+        self._char_index = {chr(c): i for c, i in char_symbols.items()}
+        self._dense = None
+        self._strides = {}
+
+    def _intern_state(self, state):
+        if state not in self.state_index:
+            self.state_index[state] = len(self.states)
+            self.states.append(state)
+
+    def _intern_symbol(self, symbol):
+        if symbol not in self.symbol_index:
+            self.symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+    def encode(self, string):
+        """
+        Encode an input string as a sequence of symbol ids
+
+        Characters outside the alphabet are mapped to the unknown-symbol
+        column, which has no transitions.
+        """
+        if self._translation is not None:
+            return string.translate(self._translation).encode('latin-1')
+
+        char_index = self._char_index
+        unknown = self.unknown_symbol
+        return array('i', [char_index.get(c, unknown) for c in string])
+
+    def byte_table(self):
+        """
+        256-entry lookup table from input byte to symbol id
+
+        Single-character symbols below U+0100 match the byte with the same
+        value; every other byte maps to the unknown-symbol column.
+        """
+        if self.width > 256:
+            raise ValueError('Byte input needs an alphabet of at most 255 symbols')
+
+        table = bytearray([self.unknown_symbol]) * 256
+        for char, symbol in self._char_index.items():
+            if ord(char) < 256:
+                table[ord(char)] = symbol
+        return bytes(table)
+
+    def run_buffer(self, buffer, state=None, block_size=1 << 20, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Run the DFA over a bytes-like buffer (bytes, mmap, memoryview)
+
+        The buffer is translated to symbol ids one block at a time through
+        byte_table(), so no copy of the whole input is ever made. Blocks are
+        run with a stride table when one fits the memory budget.
+
+        Returns:
+            tuple: (last live state, number of bytes consumed)
+        """
+        lookup = self.byte_table()
+        runner = self.strided(len(buffer), memory_budget) or self
+        current = self.start if state is None else state
+        consumed = 0
+
+        for offset in range(0, len(buffer), block_size):
+            block = bytes(buffer[offset:offset + block_size]).translate(lookup)
+            current, count = runner.run(block, current)
+            consumed += count
+            if count < len(block):
+                break
+
+        return current, consumed
+
+    def is_accepting(self, state):
+        """Check the accept bitmap for a state id"""
+        return state >= 0 and bool(self.accept[state >> 3] >> (state & 7) & 1)
+
+    def accept_ids(self):
+        """List the ids of all accepting states"""
+        return [i for i in range(self.num_states) if self.is_accepting(i)]
+
+    def next_state(self, state, symbol):
+        """Look up a single transition by state id and symbol id"""
+        return self.table[state * self.width + symbol]
+
+    def run(self, symbols, state=None):
+        """
+        Run the DFA over a sequence of symbol ids
+
+        Returns:
+            tuple: (last live state, number of symbols consumed). If the run
+            hits a missing transition, the state is the one it got stuck in
+            and the count stops short of len(symbols).
+        """
+        table = self.table
+        width = self.width
+        current = self.start if state is None else state
+        consumed = 0
+
+        for symbol in symbols:
+            next_state = table[current * width + symbol]
+            if next_state < 0:
+                return current, consumed
+            current = next_state
+            consumed += 1
+
+        return current, consumed
+
+    def strided(self, input_length=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Stride runner sized for an input length and memory budget
+
+        Returns:
+            StrideDFA or None when single-symbol steps are the better choice
+        """
+        k = choose_stride(self.num_states + 1, self.width, input_length, memory_budget)
+        if k == 1:
+            return None
+        if k not in self._strides:
+            self._strides[k] = StrideDFA(self, k)
+        return self._strides[k]
+
+    def run_strided(self, symbols, state=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Like run(), but advance several symbols per lookup when a stride table fits"""
+        runner = self.strided(len(symbols), memory_budget)
+        if runner is None:
+            return self.run(symbols, state)
+        return runner.run(symbols, state)
+
+    def run_with_trace(self, symbols, state=None):
+        """Like run(), but also return the list of visited state ids"""
+        table = self.table
+        width = self.width
+        current = self.start if state is None else state
+        trace = [current]
+
+        for symbol in symbols:
+            next_state = table[current * width + symbol]
+            if next_state < 0:
+                break
+            current = next_state
+            trace.append(current)
+
+        return current, len(trace) - 1, trace
+
+    def accepts(self, string):
+        """Check whether the DFA accepts a string"""
+        symbols = self.encode(string)
+        state, consumed = self.run(symbols)
+        return consumed == len(symbols) and self.is_accepting(state)
+
+    def transition_rows(self, symbols=None, states=None):
+        """
+        Build display rows (state, targets..., accept mark)
+
+        Rows follow 'states' (default: every interned state) in the order
+        given; the compiled table is only used for the lookups.
+        """
+        if symbols is None:
+            symbols = self.symbols
+        if states is None:
+            states = self.states
+        columns = [self.symbol_index.get(symbol) for symbol in symbols]
+
+        rows = []
+        for state in states:
+            index = self.state_index[state]
+            row = [state]
+            base = index * self.width
+            for column in columns:
+                target = self.table[base + column] if column is not None else self.DEAD
+                row.append(self.states[target] if target >= 0 else '-')
+            row.append('✓' if self.is_accepting(index) else '')
+            rows.append(row)
+        return rows
+
+    def dense_table(self):
+        """
+        Return the transition function as a NumPy matrix
+
+        The matrix has an extra sink row at index num_states that every
+        missing transition points to, so runs never leave the array.
+        """
+        if self._dense is None:
+            self._dense = dense_transitions(self.table, self.width, self.num_states)
+        return self._dense
+
+    def accept_mask(self):
+        """Boolean vector of accepting states, including the sink (never accepting)"""
+        mask = np.zeros(self.num_states + 1, dtype=bool)
+        mask[self.accept_ids()] = True
+        return mask
+
+    def run_batch(self, strings, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Run the DFA over many strings at once
+
+        Strings of equal length are stacked into a matrix and advanced in
+        lockstep, one NumPy gather per input position, or per k positions
+        when a stride table fits the memory budget.
+
+        Returns:
+            tuple: (final state ids, accepted flags) as NumPy arrays aligned
+            with the input list. A final state of num_states means the run
+            hit a missing transition.
+        """
+        dense = self.dense_table()
+        accepting = self.accept_mask()
+        dtype = np.uint8 if self._translation is not None else np.int32
+
+        runner = self.strided(sum(len(string) for string in strings), memory_budget)
+        k = runner.k if runner else 1
+        powers = self.width ** np.arange(k - 1, -1, -1, dtype=np.int32)
+
+        finals = np.empty(len(strings), dtype=np.int32)
+
+        by_length = {}
+        for index, string in enumerate(strings):
+            by_length.setdefault(len(string), []).append(index)
+
+        for length, indices in by_length.items():
+            current = np.full(len(indices), self.start, dtype=np.int32)
+
+            if length:
+                encoded = self.encode(''.join(strings[i] for i in indices))
+                symbols = np.frombuffer(encoded, dtype=dtype).reshape(len(indices), length)
+                covered = length - length % k if runner else 0
+                for position in range(0, covered, k):
+                    grams = symbols[:, position:position + k].astype(np.int32) @ powers
+                    current = runner.dense[current, grams]
+                for position in range(covered, length):
+                    current = dense[current, symbols[:, position]]
+
+            finals[indices] = current
+
+        return finals, accepting[finals]
+
+    def reachable_states(self):
+        """List the ids of states reachable from the start state, in BFS order"""
+        if self.start < 0:
+            return []
+
+        table = self.table
+        width = self.width
+        seen = bytearray(self.num_states)
+        seen[self.start] = 1
+        order = [self.start]
+        queue = deque(order)
+
+        while queue:
+            base = queue.popleft() * width
+            for symbol in range(self.num_symbols):
+                target = table[base + symbol]
+                if target >= 0 and not seen[target]:
+                    seen[target] = 1
+                    order.append(target)
+                    queue.append(target)
+
+        return order
+
+    def minimal_partition(self, states=None):
+        """
+        Partition states into Myhill-Nerode classes with Hopcroft's algorithm
+
+        Missing transitions go to an implicit sink state with id num_states.
+        Blocks are kept as contiguous slices of one permutation array, and
+        a worklist of (block, symbol) splitters drives refinement until a
+        fixpoint is reached.
+
+        Args:
+            states: State ids to partition (default: all states). Every
+                transition out of these states must stay inside the set.
+
+        Returns:
+            tuple: (block id per state id, number of blocks, splitters
+            processed). Ids for states outside the set are -1; the sink's
+            block is stored at index num_states.
+        """
+        if states is None:
+            states = list(range(self.num_states))
+
+        sink = self.num_states
+        members = list(states) + [sink]
+        table = self.table
+        width = self.width
+        num_symbols = self.num_symbols
+
+        # Inverse transitions: inverse[symbol][target] -> list of sources
+        inverse = [{} for _ in range(num_symbols)]
+        for state in members:
+            base = state * width
+            for symbol in range(num_symbols):
+                target = table[base + symbol] if state != sink else sink
+                if target < 0:
+                    target = sink
+                inverse[symbol].setdefault(target, []).append(state)
+
+        # Refinable partition: elements of block b are elems[first[b]:end[b]]
+        accepting = [s for s in members if s != sink and self.is_accepting(s)]
+        rejecting = [s for s in members if s == sink or not self.is_accepting(s)]
+        elems = rejecting + accepting
+        # Indexed by state id; the sink is id num_states
+        block_of = [-1] * (sink + 1)
+        loc = [0] * (sink + 1)
+        for position, state in enumerate(elems):
+            loc[state] = position
+            block_of[state] = 0
+        first = [0]
+        end = [len(rejecting)]
+        if accepting:
+            for state in accepting:
+                block_of[state] = 1
+            first.append(len(rejecting))
+            end.append(len(elems))
+        marked = [0] * len(first)
+
+        worklist = deque()
+        pending = set()
+        if len(first) == 2:
+            smaller = 0 if end[0] - first[0] <= end[1] - first[1] else 1
+            for symbol in range(num_symbols):
+                worklist.append((smaller, symbol))
+                pending.add((smaller, symbol))
+
+        splitters = 0
+        while worklist:
+            splitter, symbol = worklist.popleft()
+            pending.discard((splitter, symbol))
+            splitters += 1
+
+            # Mark every predecessor by moving it to the front of its block
+            touched = []
+            predecessors = inverse[symbol]
+            for target in elems[first[splitter]:end[splitter]]:
+                for state in predecessors.get(target, ()):
+                    b = block_of[state]
+                    front = first[b] + marked[b]
+                    position = loc[state]
+                    if position < front:
+                        continue
+                    other = elems[front]
+                    elems[front], elems[position] = state, other
+                    loc[state], loc[other] = front, position
+                    if marked[b] == 0:
+                        touched.append(b)
+                    marked[b] += 1
+
+            # Split every block that was only partly marked
+            for b in touched:
+                count = marked[b]
+                marked[b] = 0
+                if count == end[b] - first[b]:
+                    continue
+
+                new_block = len(first)
+                first.append(first[b])
+                end.append(first[b] + count)
+                marked.append(0)
+                first[b] += count
+                for state in elems[first[new_block]:end[new_block]]:
+                    block_of[state] = new_block
+
+                smaller = new_block if count <= end[b] - first[b] else b
+                for c in range(num_symbols):
+                    if (b, c) in pending:
+                        worklist.append((new_block, c))
+                        pending.add((new_block, c))
+                    else:
+                        worklist.append((smaller, c))
+                        pending.add((smaller, c))
+
+        return block_of, len(first), splitters
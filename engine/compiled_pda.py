@@ -0,0 +1,199 @@
+"""
+Compiled PDA - Indexed transitions and shared stacks for pushdown automata
+"""
+
+EPSILON = 'ε'
+
+
+class StackNode:
+    """One cell of an immutable stack: a symbol on top of the stack below it"""
+
+    __slots__ = ('symbol', 'below', 'id', 'depth')
+
+    def __init__(self, symbol, below, node_id):
+        self.symbol = symbol
+        self.below = below
+        self.id = node_id
+        self.depth = below.depth + 1 if below is not None else 0
+
+    def to_list(self):
+        """Stack contents from bottom to top"""
+        symbols = []
+        node = self
+        while node.below is not None:
+            symbols.append(node.symbol)
+            node = node.below
+        symbols.reverse()
+        return symbols
+
+
+class StackPool:
+    """
+    Hash-consed stacks built from shared cons cells
+
+    A (symbol, stack below) pair always maps to the same node, so equal
+    stacks are the same object, push and pop are O(1), and a stack can be
+    identified by its node id alone.
+    """
+
+    def __init__(self):
+        self.empty = StackNode(None, None, 0)
+        self._nodes = {}
+
+    def push(self, symbol, below):
+        key = (symbol, below.id)
+        node = self._nodes.get(key)
+        if node is None:
+            node = StackNode(symbol, below, len(self._nodes) + 1)
+            self._nodes[key] = node
+        return node
+
+    def push_all(self, symbols, below):
+        """Push a sequence given top-first (the order of a stack_push string)"""
+        node = below
+        for symbol in reversed(symbols):
+            node = self.push(symbol, node)
+        return node
+
+    def from_list(self, symbols):
+        """Build a stack from a bottom-to-top list"""
+        node = self.empty
+        for symbol in symbols:
+            node = self.push(symbol, node)
+        return node
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+class PDAConfig:
+    """A PDA configuration: state id, input position and stack node"""
+
+    __slots__ = ('state', 'position', 'stack')
+
+    def __init__(self, state, position, stack):
+        self.state = state
+        self.position = position
+        self.stack = stack
+
+    def key(self):
+        return (self.state, self.position, self.stack.id)
+
+
+def symbol_lengths(symbols):
+    """Distinct stack symbol lengths, longest first"""
+    return sorted({len(symbol) for symbol in symbols if symbol}, reverse=True)
+
+
+def split_stack_string(string, symbols, lengths=None):
+    """
+    Split a stack_push string like 'AZ0' into stack symbols, top first
+
+    Uses the longest known stack symbol at each position, falling back to
+    single characters; 'ε' marks an empty push. Pass 'lengths' from
+    symbol_lengths() when splitting many strings over the same symbols.
+    """
+    if not string or string == EPSILON:
+        return ()
+    if lengths is None:
+        lengths = symbol_lengths(symbols)
+    result = []
+    i = 0
+    while i < len(string):
+        for length in lengths:
+            if string[i:i + length] in symbols:
+                break
+        else:
+            length = 1
+        piece = string[i:i + length]
+        if piece != EPSILON:
+            result.append(piece)
+        i += length
+    return tuple(result)
+
+
+class CompiledPDA:
+    """
+    A PDA with interned states and transitions indexed by
+    (state id, input symbol, stack top)
+
+    Each index entry is a tuple of moves (target state id, symbols to push
+    top first, whether input is consumed, original transition). The entry
+    for an input symbol already includes the ε-moves of the same state and
+    stack top, merged back into the order they were declared in, so the
+    applicable moves for a configuration take at most two dict lookups: the
+    symbol under the input head, then ε.
+    """
+
+    def __init__(self, pda):
+        self.pda = pda
+        self.transitions = pda.get('transitions', []) or []
+
+        self.states = []
+        self.state_index = {}
+        for state in pda.get('states', []) or []:
+            self._intern(state)
+        if pda.get('start_state') is not None:
+            self._intern(pda['start_state'])
+        for transition in self.transitions:
+            self._intern(transition['from'])
+            self._intern(transition['to'])
+
+        self.start_stack_symbol = pda.get('start_stack_symbol', 'Z0')
+        self.stack_symbols = set(pda.get('stack_alphabet', []) or [])
+        self.stack_symbols.add(self.start_stack_symbol)
+        self.stack_symbols.update(t['stack_top'] for t in self.transitions)
+
+        self.start = self.state_index.get(pda.get('start_state'), -1)
+        self.accepting = {self.state_index[s] for s in pda.get('accept_states', []) or [] if s in self.state_index}
+
+        # Every transition as ((state id, input, top), move), in declaration order
+        self.rules = []
+        lengths = symbol_lengths(self.stack_symbols)
+        by_key = {}
+        for order, transition in enumerate(self.transitions):
+            move = (
+                self.state_index[transition['to']],
+                split_stack_string(transition.get('stack_push', ''), self.stack_symbols, lengths),
+                transition['input'] != EPSILON,
+                transition
+            )
+            key = (self.state_index[transition['from']], transition['input'], transition['stack_top'])
+            by_key.setdefault(key, []).append((order, move))
+            self.rules.append((key, move))
+
+        epsilon_moves = {
+            (state, top): moves for (state, symbol, top), moves in by_key.items() if symbol == EPSILON
+        }
+
+        # Deterministic: at most one move per (state, input, top), and no
+        # input move where an ε-move exists for the same state and top
+        self.deterministic = all(len(moves) == 1 for moves in by_key.values()) and not any(
+            symbol != EPSILON and (state, top) in epsilon_moves for state, symbol, top in by_key
+        )
+
+        self.index = {}
+        for (state, symbol, top), moves in by_key.items():
+            if symbol != EPSILON:
+                moves = sorted(moves + epsilon_moves.get((state, top), []), key=lambda move: move[0])
+            self.index[(state, symbol, top)] = tuple(move for _, move in moves)
+
+    def _intern(self, state):
+        if state not in self.state_index:
+            self.state_index[state] = len(self.states)
+            self.states.append(state)
+
+    def moves(self, state, symbol, top):
+        """
+        Moves applicable in a configuration, in declaration order
+
+        Args:
+            state: State id
+            symbol: Input symbol under the head, or None at the end of input
+            top: Stack top symbol
+        """
+        if symbol is not None:
+            found = self.index.get((state, symbol, top))
+            if found is not None:
+                return found
+        return self.index.get((state, EPSILON, top), ())
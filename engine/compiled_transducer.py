@@ -0,0 +1,145 @@
+"""
+Compiled Transducer - Integer-indexed tables for Moore and Mealy machines
+"""
+from array import array
+from engine.stride_table import DEFAULT_MEMORY_BUDGET, StrideTransducer, choose_stride
+
+
+class CompiledTransducer:
+    """
+    A Moore or Mealy machine with states, inputs and outputs interned to ints
+
+    The transition function is a flat array with one row per state and one
+    column per input symbol plus an "unknown symbol" column; missing
+    transitions hold -1. Outputs are stored per state for Moore machines and
+    per table cell for Mealy machines.
+    """
+
+    DEAD = -1
+
+    def __init__(self, machine, machine_type):
+        if machine_type not in ('moore', 'mealy'):
+            raise ValueError(f'Unsupported machine type: {machine_type}')
+        self.machine_type = machine_type
+
+        self.states = list(machine.get('states', []))
+        self.state_index = {state: i for i, state in enumerate(self.states)}
+        self.symbols = list(machine.get('input_alphabet', []))
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.output_symbols = list(machine.get('output_alphabet', []))
+        self.output_index = {symbol: i for i, symbol in enumerate(self.output_symbols)}
+
+        transitions = machine.get('transitions', [])
+        for trans in transitions:
+            self._intern(self.states, self.state_index, trans['from'])
+            self._intern(self.states, self.state_index, trans['to'])
+            self._intern(self.symbols, self.symbol_index, trans['input'])
+            if machine_type == 'mealy':
+                self._intern(self.output_symbols, self.output_index, trans['output'])
+        if machine_type == 'moore':
+            for output in machine.get('outputs', {}).values():
+                self._intern(self.output_symbols, self.output_index, output)
+
+        self.num_states = len(self.states)
+        self.num_symbols = len(self.symbols)
+        self.width = self.num_symbols + 1
+        self.unknown_symbol = self.num_symbols
+
+        self.table = array('i', [self.DEAD]) * (self.num_states * self.width)
+        if machine_type == 'mealy':
+            self.outputs = array('i', [self.DEAD]) * (self.num_states * self.width)
+        else:
+            outputs = machine.get('outputs', {})
+            self.outputs = array('i', [
+                self.output_index[outputs[state]] if state in outputs else self.DEAD
+                for state in self.states
+            ])
+
+        for trans in transitions:
+            cell = self.state_index[trans['from']] * self.width + self.symbol_index[trans['input']]
+            self.table[cell] = self.state_index[trans['to']]
+            if machine_type == 'mealy':
+                self.outputs[cell] = self.output_index[trans['output']]
+
+        start = machine.get('start_state')
+        self.start = self.state_index[start] if start in self.state_index else self.DEAD
+
+        self._char_index = {s: i for s, i in self.symbol_index.items() if len(s) == 1}
+        self._strides = {}
+
+    @staticmethod
+    def _intern(items, index, value):
+        if value not in index:
+            index[value] = len(items)
+            items.append(value)
+
+    def encode(self, string):
+        """Encode an input string as symbol ids"""
+        char_index = self._char_index
+        unknown = self.unknown_symbol
+        return array('i', [char_index.get(c, unknown) for c in string])
+
+    def byte_table(self):
+        """256-entry lookup table from input byte to symbol id"""
+        if self.width > 256:
+            raise ValueError('Byte input needs an alphabet of at most 255 symbols')
+
+        table = bytearray([self.unknown_symbol]) * 256
+        for char, symbol in self._char_index.items():
+            if ord(char) < 256:
+                table[ord(char)] = symbol
+        return bytes(table)
+
+    def initial_output(self):
+        """Output emitted before any input (Moore machines only)"""
+        if self.machine_type == 'moore' and self.start >= 0:
+            return self.outputs[self.start]
+        return self.DEAD
+
+    def strided(self, input_length=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Stride runner sized for an input length and memory budget
+
+        Returns:
+            StrideTransducer or None when single-symbol steps are the better choice
+        """
+        k = choose_stride(self.num_states, self.width, input_length, memory_budget, bytes_per_cell=12)
+        if k == 1:
+            return None
+        if k not in self._strides:
+            self._strides[k] = StrideTransducer(self, k)
+        return self._strides[k]
+
+    def run(self, symbols, state=None, counts=None, out=None):
+        """
+        Run the machine over symbol ids, collecting output ids
+
+        Args:
+            counts: Optional list indexed by output id, incremented per output
+            out: Optional list/array that output ids are appended to
+
+        Returns:
+            tuple: (last live state, number of symbols consumed)
+        """
+        table = self.table
+        outputs = self.outputs
+        width = self.width
+        mealy = self.machine_type == 'mealy'
+        current = self.start if state is None else state
+        consumed = 0
+
+        for symbol in symbols:
+            cell = current * width + symbol
+            next_state = table[cell]
+            if next_state < 0:
+                break
+            output = outputs[cell] if mealy else outputs[next_state]
+            if output >= 0:
+                if counts is not None:
+                    counts[output] += 1
+                if out is not None:
+                    out.append(output)
+            current = next_state
+            consumed += 1
+
+        return current, consumed
@@ -0,0 +1,339 @@
+"""
+CYK - Bitset CYK recognition over a grammar compiled to Chomsky Normal Form
+"""
+import numpy as np
+from engine.earley import EarleyGrammar, EPSILON
+from engine.utils import EpsilonClosureIndex
+
+WORD = np.dtype('<u8').type
+WORD_BITS = 64
+
+
+class CNFGrammar:
+    """
+    A grammar converted to Chomsky Normal Form with non-terminals interned
+    to bit positions
+
+    The conversion is the textbook one: terminals inside longer right-hand
+    sides get proxy non-terminals (T_a), long right-hand sides are split
+    into chains of binary rules, ε-rules are dropped (the start symbol's
+    nullability is kept as accepts_empty) and unit rules are folded into
+    the rules they lead to. Non-terminals that derive no terminal string are
+    left out.
+
+    A set of non-terminals is an int with bit i set for names[i].
+    terminal_masks maps a terminal to the non-terminals that derive it;
+    pairs[B][C] is the set of A with A → B C.
+    """
+
+    def __init__(self, grammar):
+        earley = grammar if isinstance(grammar, EarleyGrammar) else EarleyGrammar(grammar)
+        self.grammar = earley
+        self.start = earley.start
+
+        productive = self._productive(earley)
+        rules = [
+            (lhs, rhs) for lhs, rhs in earley.rules
+            if lhs in productive and all(symbol in productive or symbol not in earley.non_terminals for symbol in rhs)
+        ]
+
+        self.names = []
+        self.index = {}
+        used = earley.non_terminals | earley.terminals
+        for lhs in [self.start] + [lhs for lhs, _ in rules]:
+            if lhs in productive:
+                self._intern(lhs)
+
+        proxies = {}
+
+        def proxy(symbol):
+            if symbol in self.index:
+                return symbol
+            if symbol not in proxies:
+                proxies[symbol] = self._fresh(f'T_{symbol}', used)
+                terminal_rules.append((proxies[symbol], symbol))
+            return proxies[symbol]
+
+        terminal_rules = []
+        unit_rules = []
+        binary_rules = []
+        empty = set()
+        for lhs, rhs in rules:
+            if not rhs:
+                empty.add(lhs)
+            elif len(rhs) == 1 and rhs[0] in self.index:
+                unit_rules.append((lhs, rhs[0]))
+            elif len(rhs) == 1:
+                terminal_rules.append((lhs, rhs[0]))
+            else:
+                body = [proxy(symbol) for symbol in rhs]
+                head = lhs
+                for symbol in body[:-2]:
+                    chain = self._fresh(f'{lhs}_{len(self.names)}', used)
+                    binary_rules.append((head, symbol, chain))
+                    head = chain
+                binary_rules.append((head, body[-2], body[-1]))
+
+        # ε-rules: A → B C also gives A → B when C is nullable, and vice versa
+        nullable = set(empty)
+        changed = True
+        while changed:
+            changed = False
+            for lhs, left, right in binary_rules:
+                if lhs not in nullable and left in nullable and right in nullable:
+                    nullable.add(lhs)
+                    changed = True
+            for lhs, child in unit_rules:
+                if lhs not in nullable and child in nullable:
+                    nullable.add(lhs)
+                    changed = True
+        for lhs, left, right in binary_rules:
+            if right in nullable:
+                unit_rules.append((lhs, left))
+            if left in nullable:
+                unit_rules.append((lhs, right))
+        self.accepts_empty = self.start in nullable
+
+        # Unit rules: up[X] holds every A with A ⇒* X through unit rules
+        parents = {}
+        for lhs, child in unit_rules:
+            if lhs != child:
+                parents.setdefault(child, {EPSILON: []})[EPSILON].append(lhs)
+        up = EpsilonClosureIndex(parents, self.names).masks
+
+        self.terminal_masks = {}
+        for lhs, symbol in terminal_rules:
+            self.terminal_masks[symbol] = self.terminal_masks.get(symbol, 0) | up[self.index[lhs]]
+
+        self.pairs = [{} for _ in self.names]
+        for lhs, left, right in binary_rules:
+            b, c = self.index[left], self.index[right]
+            self.pairs[b][c] = self.pairs[b].get(c, 0) | up[self.index[lhs]]
+
+        self.start_mask = 1 << self.index[self.start] if self.start in self.index else 0
+
+    def _intern(self, name):
+        if name not in self.index:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        return name
+
+    def _fresh(self, base, used):
+        name = base
+        while name in used:
+            name += "'"
+        used.add(name)
+        return self._intern(name)
+
+    @staticmethod
+    def _productive(grammar):
+        """Non-terminals that derive some terminal string"""
+        productive = set()
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in grammar.rules:
+                if lhs not in productive and all(
+                    symbol in productive or symbol not in grammar.non_terminals for symbol in rhs
+                ):
+                    productive.add(lhs)
+                    changed = True
+        return productive
+
+    def names_of(self, mask):
+        """Decode a bitmask into non-terminal names"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    def rule_count(self):
+        return (
+            sum(bin(mask).count('1') for mask in self.terminal_masks.values())
+            + sum(bin(lhs).count('1') for row in self.pairs for lhs in row.values())
+            + (1 if self.accepts_empty else 0)
+        )
+
+    def to_grammar(self):
+        """
+        Returns:
+            dict: the CNF grammar in parse_grammar form
+        """
+        rules = {name: [] for name in self.names}
+        if self.accepts_empty:
+            rules[self.start].append(EPSILON)
+        for symbol, mask in self.terminal_masks.items():
+            for name in self.names_of(mask):
+                rules[name].append(symbol)
+        for b, row in enumerate(self.pairs):
+            for c, mask in row.items():
+                for name in self.names_of(mask):
+                    rules[name].append(self.names[b] + self.names[c])
+        rules = {name: productions for name, productions in rules.items() if productions}
+        return {
+            'rules': rules,
+            'start_symbol': self.start,
+            'terminals': sorted(self.terminal_masks),
+            'non_terminals': list(rules)
+        }
+
+
+class CYKRecognizer:
+    """
+    CYK membership over a CNFGrammar, one span length at a time with NumPy
+
+    The chart is kept as bit planes: spans[L, :, A] is a bitset (uint64
+    words along the middle axis) with bit i set when A derives
+    tokens[i:i + L], and ends[L, :, A] is the same set indexed by end
+    position (spans[L, :, A] << L). Non-terminals are the last axis so the
+    per-rule gathers read contiguous rows. A rule A → B C then covers every
+    start i of length L at once:
+
+        OR over l of spans[l, :, B] & (ends[L - l, :, C] >> L)
+
+    so each length is a gather, an AND and two OR-reductions over the
+    binary rules, restricted to the rules and split lengths whose children
+    occur at all. Only the words that can hold a start of length L are
+    touched. Cells are turned back into int bitmasks of non-terminals by
+    chart().
+
+    The rule arrays are compiled once, so one recognizer can check any
+    number of strings against the same grammar.
+    """
+
+    def __init__(self, grammar):
+        self.cnf = grammar if isinstance(grammar, CNFGrammar) else CNFGrammar(grammar)
+        cnf = self.cnf
+        size = max(len(cnf.names), 1)
+
+        self.terminal_ids = {symbol: number + 1 for number, symbol in enumerate(cnf.terminal_masks)}
+        # Row 0 is for symbols no rule produces
+        self.terminal_rows = np.zeros((len(self.terminal_ids) + 1, size), dtype=bool)
+        for symbol, number in self.terminal_ids.items():
+            self.terminal_rows[number, _bits(cnf.terminal_masks[symbol])] = True
+
+        lefts, rights, parents = [], [], []
+        for b, row in enumerate(cnf.pairs):
+            for c, mask in row.items():
+                lefts.append(b)
+                rights.append(c)
+                parents.append(mask)
+        self.lefts = np.array(lefts, dtype=np.intp)
+        self.rights = np.array(rights, dtype=np.intp)
+
+        # (parent, rule) pairs sorted by parent, for the per-parent OR-reduce
+        expanded = sorted((a, rule) for rule, mask in enumerate(parents) for a in _bits(mask))
+        self.expanded_rules = np.array([rule for _, rule in expanded], dtype=np.intp)
+        self.parents, self.parent_starts = np.unique(
+            np.array([a for a, _ in expanded], dtype=np.intp), return_index=True
+        )
+
+    def _fill(self, tokens):
+        """Bit planes spans[L, word, A] for every length L, as described above"""
+        n = len(tokens)
+        size = self.terminal_rows.shape[1]
+        words = n // WORD_BITS + 1
+        end_words = words + 2
+        spans = np.zeros((n + 1, words, size), dtype=WORD)
+        ends = np.zeros((n + 1, end_words, size), dtype=WORD)
+        present = np.zeros((n + 1, size), dtype=bool)
+
+        ids = np.array([self.terminal_ids.get(token, 0) for token in tokens], dtype=np.intp)
+        spans[1] = _pack(self.terminal_rows[ids], words)
+        present[1] = spans[1].any(axis=0)
+        ends[1] = _shift_left(spans[1], 1, end_words)
+
+        if not len(self.lefts):
+            return spans
+
+        for length in range(2, n + 1):
+            # Words holding the starts 0..n-length
+            used = (n - length) // WORD_BITS + 1
+            left_lengths = np.arange(1, length)
+            active = present[left_lengths][:, self.lefts] & present[length - left_lengths][:, self.rights]
+            if not active.any():
+                continue
+            rules = np.flatnonzero(active.any(axis=0))
+            left_lengths = left_lengths[active[:, rules].any(axis=1)]
+
+            shift, offset = divmod(length, WORD_BITS)
+            window = ends[length - left_lengths, shift:shift + used + 1]
+            right = window[:, :used] >> WORD(offset)
+            if offset:
+                right |= window[:, 1:used + 1] << WORD(WORD_BITS - offset)
+
+            # Indices are known to be in range; 'clip' skips the bounds check
+            pairs = np.take(spans[left_lengths, :used], self.lefts[rules], axis=2, mode='clip')
+            pairs &= np.take(right, self.rights[rules], axis=2, mode='clip')
+
+            by_rule = np.zeros((used, len(self.lefts)), dtype=WORD)
+            by_rule[:, rules] = np.bitwise_or.reduce(pairs, axis=0)
+            found = np.bitwise_or.reduceat(by_rule[:, self.expanded_rules], self.parent_starts, axis=1)
+            spans[length, :used, self.parents] = found.T
+            present[length, self.parents] = found.any(axis=0)
+            ends[length] = _shift_left(spans[length], length, end_words)
+
+        return spans
+
+    def chart(self, tokens):
+        """
+        Returns:
+            list: chart[length - 1][i] is the int bitmask of non-terminals
+            that derive tokens[i:i + length]
+        """
+        n = len(tokens)
+        spans = self._fill(tokens)
+        chart = []
+        for length in range(1, n + 1):
+            planes = np.ascontiguousarray(spans[length].T)
+            bits = np.unpackbits(planes.view(np.uint8), axis=1, bitorder='little')[:, :n - length + 1]
+            cells = np.packbits(bits.T, axis=1, bitorder='little')
+            chart.append([int.from_bytes(cell.tobytes(), 'little') for cell in cells])
+        return chart
+
+    def accepts(self, tokens):
+        """Whether the grammar derives tokens"""
+        cnf = self.cnf
+        if not tokens:
+            return cnf.accepts_empty
+        if not cnf.start_mask:
+            return False
+        spans = self._fill(tokens)
+        return bool(spans[len(tokens), 0, cnf.index[cnf.start]] & WORD(1))
+
+    def accepts_batch(self, token_lists):
+        """Membership of each token sequence, reusing the compiled rule arrays"""
+        return [self.accepts(tokens) for tokens in token_lists]
+
+
+def _bits(mask):
+    """Positions of the set bits of an int"""
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
+
+
+def _pack(rows, words):
+    """Pack a (positions, columns) bool array into (words, columns) uint64 bitsets"""
+    packed = np.packbits(rows.T, axis=1, bitorder='little')
+    padded = np.zeros((rows.shape[1], words * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view(WORD).T
+
+
+def _shift_left(planes, amount, words):
+    """Shift (words, columns) bitsets left by 'amount' bits, widened to 'words' words"""
+    shift, offset = divmod(amount, WORD_BITS)
+    count = min(planes.shape[0], words - shift)
+    result = np.zeros((words,) + planes.shape[1:], dtype=WORD)
+    result[shift:shift + count] = planes[:count] << WORD(offset)
+    if offset:
+        result[shift + 1:shift + count] |= planes[:count - 1] >> WORD(WORD_BITS - offset)
+        if shift + count < words:
+            result[shift + count] |= planes[count - 1] >> WORD(WORD_BITS - offset)
+    return result
@@ -0,0 +1,150 @@
+"""
+DAWG - Incremental minimal acyclic DFA construction for finite word sets
+"""
+from collections import deque
+from engine.compiled_dfa import CompiledDFA
+
+
+class DawgBuilder:
+    """
+    Build the minimal DFA of a sorted word list one word at a time
+
+    This is the sorted-input algorithm of Daciuk, Mihov, Watson and Watson.
+    Only the path of the most recently added word is left unminimized; once
+    a new word diverges from it, the abandoned suffix is folded into a
+    register of already-minimal states (keyed by finality and outgoing
+    transitions), so the full trie is never held in memory. State ids freed
+    by merges are reused.
+    """
+
+    def __init__(self):
+        self.transitions = [{}]
+        self.final = [False]
+        self.register = {}
+        self.unchecked = []
+        self.free = []
+        self.previous = None
+        self.word_count = 0
+
+    def _new_state(self):
+        if self.free:
+            state = self.free.pop()
+            self.transitions[state] = {}
+            self.final[state] = False
+            return state
+        self.transitions.append({})
+        self.final.append(False)
+        return len(self.transitions) - 1
+
+    def add(self, word):
+        """Add a word; words must arrive in sorted order (duplicates are ignored)"""
+        previous = self.previous
+        if previous is not None:
+            if word == previous:
+                return
+            if word < previous:
+                raise ValueError(f'Words must be sorted: "{word}" comes after "{previous}"')
+
+            common = 0
+            limit = min(len(word), len(previous))
+            while common < limit and word[common] == previous[common]:
+                common += 1
+        else:
+            common = 0
+
+        self._minimize(common)
+
+        state = self.unchecked[-1][2] if self.unchecked else 0
+        for symbol in word[common:]:
+            child = self._new_state()
+            self.transitions[state][symbol] = child
+            self.unchecked.append((state, symbol, child))
+            state = child
+
+        self.final[state] = True
+        self.previous = word
+        self.word_count += 1
+
+    def _minimize(self, depth):
+        """Replace or register the unchecked states below the given depth"""
+        transitions = self.transitions
+        while len(self.unchecked) > depth:
+            parent, symbol, child = self.unchecked.pop()
+            # Children were added in sorted order, so the items are canonical
+            key = (self.final[child], tuple(transitions[child].items()))
+            existing = self.register.get(key)
+            if existing is None:
+                self.register[key] = child
+            else:
+                transitions[parent][symbol] = existing
+                transitions[child] = None
+                self.free.append(child)
+
+    def add_all(self, words):
+        """Add every word from an iterable"""
+        for word in words:
+            self.add(word)
+        return self
+
+    def finish(self):
+        """Minimize the last word's path; call once after the final add()"""
+        self._minimize(0)
+        return self
+
+    def _ordered_states(self):
+        order = [0]
+        seen = {0}
+        queue = deque(order)
+        while queue:
+            for child in self.transitions[queue.popleft()].values():
+                if child not in seen:
+                    seen.add(child)
+                    order.append(child)
+                    queue.append(child)
+        return order
+
+    def to_automaton(self):
+        """
+        Export the DFA in the usual dict format
+
+        States are named q0, q1, ... in breadth-first order. Missing
+        transitions reject, so no dead state is listed.
+        """
+        self.finish()
+        order = self._ordered_states()
+        names = {state: f'q{i}' for i, state in enumerate(order)}
+
+        alphabet = set()
+        transitions = {}
+        for state in order:
+            moves = self.transitions[state]
+            alphabet.update(moves)
+            transitions[names[state]] = {symbol: names[child] for symbol, child in moves.items()}
+
+        return {
+            'states': [names[state] for state in order],
+            'alphabet': sorted(alphabet),
+            'transitions': transitions,
+            'start_state': 'q0',
+            'accept_states': [names[state] for state in order if self.final[state]]
+        }
+
+    def to_compiled(self):
+        """Export the DFA as a CompiledDFA"""
+        return CompiledDFA(self.to_automaton())
+
+
+def read_words(path, encoding='utf-8'):
+    """Yield one word per line of a file, skipping blank lines"""
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            word = line.rstrip('\r\n')
+            if word:
+                yield word
+
+
+def build_dawg(words=None, path=None):
+    """Build a finished DawgBuilder from a sorted iterable of words or a word file"""
+    builder = DawgBuilder()
+    builder.add_all(read_words(path) if path is not None else words or [])
+    return builder.finish()
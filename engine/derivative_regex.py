@@ -0,0 +1,223 @@
+"""
+Derivative Regex - Brzozowski-derivative regex matching with a memoized DFA
+"""
+from functools import lru_cache
+import threading
+from engine.parser import tokenize_regex
+from engine.regex_engine import RegexParser
+
+
+class Term:
+    """
+    A hash-consed regex term
+
+    Terms are only created through a TermFactory, which guarantees that
+    structurally equal terms are the same object. Equality is therefore
+    identity and each term can memoize its own derivatives.
+    """
+
+    __slots__ = ('kind', 'args', 'id', 'nullable', 'derivatives')
+
+    def __init__(self, kind, args, term_id, nullable):
+        self.kind = kind
+        self.args = args
+        self.id = term_id
+        self.nullable = nullable
+        self.derivatives = {}
+
+
+class TermFactory:
+    """
+    Build regex terms in canonical form
+
+    Unions are flattened, deduplicated and sorted by term id (ACI
+    normalization), concatenation is kept right-associated, and the usual
+    identities for ∅, ε and nested stars are applied. This keeps the set of
+    derivatives of any regex finite and small.
+    """
+
+    def __init__(self):
+        self._table = {}
+        self.empty = self._make('empty', (), (), False)
+        self.epsilon = self._make('eps', (), (), True)
+
+    def _make(self, kind, key, args, nullable):
+        term = self._table.get((kind, key))
+        if term is None:
+            term = Term(kind, args, len(self._table), nullable)
+            self._table[(kind, key)] = term
+        return term
+
+    def size(self):
+        return len(self._table)
+
+    def symbol(self, value):
+        return self._make('sym', (value,), (value,), False)
+
+    def cat(self, first, second):
+        if first is self.empty or second is self.empty:
+            return self.empty
+        if first is self.epsilon:
+            return second
+        if second is self.epsilon:
+            return first
+        if first.kind == 'cat':
+            return self.cat(first.args[0], self.cat(first.args[1], second))
+        return self._make('cat', (first.id, second.id), (first, second),
+                          first.nullable and second.nullable)
+
+    def alt(self, items):
+        members = {}
+        for item in items:
+            if item.kind == 'alt':
+                for member in item.args:
+                    members[member.id] = member
+            elif item is not self.empty:
+                members[item.id] = item
+
+        if not members:
+            return self.empty
+        if len(members) == 1:
+            return next(iter(members.values()))
+
+        ordered = tuple(members[i] for i in sorted(members))
+        return self._make('alt', tuple(t.id for t in ordered), ordered,
+                          any(t.nullable for t in ordered))
+
+    def star(self, inner):
+        if inner is self.empty or inner is self.epsilon:
+            return self.epsilon
+        if inner.kind == 'star':
+            return inner
+        return self._make('star', (inner.id,), (inner,), True)
+
+    def from_ast(self, node):
+        """Convert a RegexParser AST into a canonical term"""
+        kind = node[0]
+        if kind == 'sym':
+            return self.symbol(node[1])
+        if kind == 'eps':
+            return self.epsilon
+        if kind == 'cat':
+            result = self.epsilon
+            for item in reversed(node[1]):
+                result = self.cat(self.from_ast(item), result)
+            return result
+        if kind == 'alt':
+            return self.alt([self.from_ast(item) for item in node[1]])
+
+        inner = self.from_ast(node[1])
+        if kind == 'star':
+            return self.star(inner)
+        if kind == 'plus':
+            return self.cat(inner, self.star(inner))
+        return self.alt([inner, self.epsilon])
+
+    def derive(self, term, symbol):
+        """Brzozowski derivative of a term by one symbol, memoized on the term"""
+        result = term.derivatives.get(symbol)
+        if result is not None:
+            return result
+
+        kind = term.kind
+        if kind in ('empty', 'eps'):
+            result = self.empty
+        elif kind == 'sym':
+            result = self.epsilon if term.args[0] == symbol else self.empty
+        elif kind == 'cat':
+            first, second = term.args
+            result = self.cat(self.derive(first, symbol), second)
+            if first.nullable:
+                result = self.alt([result, self.derive(second, symbol)])
+        elif kind == 'alt':
+            result = self.alt([self.derive(item, symbol) for item in term.args])
+        else:
+            result = self.cat(self.derive(term.args[0], symbol), term)
+
+        term.derivatives[symbol] = result
+        return result
+
+
+class DerivativeRegex:
+    """
+    A regex matched through its derivative DFA
+
+    Each distinct derivative is one DFA state. States and their transitions
+    are only materialized when an input reaches them, and stay memoized for
+    later inputs.
+    """
+
+    def __init__(self, regex):
+        self.regex = regex
+        self.factory = TermFactory()
+        self.root = self.factory.from_ast(RegexParser(tokenize_regex(regex)).parse())
+        self.alphabet = sorted(self._symbols(self.root))
+        self._lock = threading.Lock()
+
+    def _symbols(self, root):
+        symbols = set()
+        stack = [root]
+        seen = set()
+        while stack:
+            term = stack.pop()
+            if term.id in seen:
+                continue
+            seen.add(term.id)
+            if term.kind == 'sym':
+                symbols.add(term.args[0])
+            else:
+                stack.extend(term.args)
+        return symbols
+
+    def matches(self, string):
+        """Check whether the whole string matches the regex"""
+        factory = self.factory
+        with self._lock:
+            term = self.root
+            for char in string:
+                term = term.derivatives.get(char) or factory.derive(term, char)
+                if term is factory.empty:
+                    return False
+            return term.nullable
+
+    def to_dfa(self, max_states=10000):
+        """
+        Materialize the full derivative DFA over the regex's alphabet
+
+        The dead state (∅) is left out, so missing transitions reject.
+        """
+        factory = self.factory
+        with self._lock:
+            names = {self.root.id: 'd0'}
+            order = [self.root]
+            transitions = {}
+            i = 0
+            while i < len(order):
+                term = order[i]
+                i += 1
+                moves = {}
+                for symbol in self.alphabet:
+                    target = factory.derive(term, symbol)
+                    if target is factory.empty:
+                        continue
+                    if target.id not in names:
+                        if len(order) >= max_states:
+                            raise ValueError(f'Derivative DFA exceeds {max_states} states')
+                        names[target.id] = f'd{len(names)}'
+                        order.append(target)
+                    moves[symbol] = names[target.id]
+                transitions[names[term.id]] = moves
+
+        return {
+            'states': [names[t.id] for t in order],
+            'alphabet': list(self.alphabet),
+            'transitions': transitions,
+            'start_state': 'd0',
+            'accept_states': [names[t.id] for t in order if t.nullable]
+        }
+
+
+@lru_cache(maxsize=256)
+def compile_derivative_regex(regex):
+    """Compile a regex for derivative matching, reusing earlier compilations"""
+    return DerivativeRegex(regex)
@@ -1,14 +1,48 @@
 """
 DFA/NFA Engine - Handles finite automata problems
 """
-from engine.utils import epsilon_closure, move, format_state_name
+from engine.utils import EpsilonClosureIndex, format_state_name
+from engine.compiled_dfa import CompiledDFA
+from engine.lazy_dfa import LazyDFA
+from engine.regex_engine import compile_regex
+from engine.derivative_regex import compile_derivative_regex
+from engine.dfa_stream import MembershipSession
+from engine.mapped_input import run_dfa_file
+from engine.parallel_dfa import DEFAULT_CHUNK_SIZE, file_tasks, parallel_run, string_tasks
+from engine.stride_table import DEFAULT_MEMORY_BUDGET
+from engine.dawg import build_dawg
+from engine.pattern_dfa import pattern_dfa
+from engine.shift_and import ShiftAndMatcher
+from engine.dfa_equivalence import hopcroft_karp_equivalent, shortest_difference
+from collections import deque
 import copy
+import time
 
 class DFAEngine:
     """Engine for DFA/NFA-related problems"""
     
+    # Larger automata (e.g. dictionary DFAs) are returned without a transition table
+    MAX_TABLE_STATES = 200
+    
     def __init__(self):
         self.state_counter = 0
+        self._compiled = {}
+    
+    def compile(self, automaton):
+        """
+        Compile a DFA into its integer-indexed form
+        
+        The compiled form is cached per automaton object, so every algorithm
+        run by this engine on the same automaton shares one compilation.
+        """
+        key = id(automaton)
+        cached = self._compiled.get(key)
+        if cached is not None and cached[0] is automaton:
+            return cached[1]
+        
+        compiled = CompiledDFA(automaton)
+        self._compiled[key] = (automaton, compiled)
+        return compiled
     
     def solve(self, task_type, parsed_input):
         """Main solver dispatcher"""
@@ -31,6 +65,12 @@ class DFAEngine:
         elif task_type == 'dfa_membership':
             return self.test_membership(parsed_input)
         
+        elif task_type == 'dfa_equivalence':
+            return self.check_equivalence(parsed_input)
+        
+        elif task_type == 'dfa_inclusion':
+            return self.check_inclusion(parsed_input)
+        
         else:
             return {'error': f'Unsupported DFA task: {task_type}'}
     
@@ -39,6 +79,17 @@ class DFAEngine:
         question = parsed_input.get('question', '')
         constraints = parsed_input.get('constraints', {})
         
+        # A finite word list (inline or from a file) gets a minimal acyclic DFA
+        if parsed_input.get('words') is not None or parsed_input.get('words_path'):
+            return self._construct_dfa_for_words(parsed_input.get('words'), parsed_input.get('words_path'))
+        
+        # Substring / suffix conditions are built directly with KMP or Aho-Corasick
+        patterns = parsed_input.get('patterns') or constraints.get('patterns')
+        if patterns:
+            mode = parsed_input.get('pattern_mode') or constraints.get('pattern_mode', 'contains')
+            alphabet = parsed_input.get('alphabet') or constraints.get('alphabet')
+            return self._construct_dfa_for_patterns(patterns, mode, alphabet)
+        
         # Check if it's a specific string acceptance problem
         specific_string = self._extract_specific_string(question)
         
@@ -188,6 +239,73 @@ class DFAEngine:
             'accept_states': [f'q{num_states - 1}']
         }
     
+    def _construct_dfa_for_patterns(self, patterns, mode='contains', alphabet=None):
+        """
+        Construct a DFA for "contains", "ends with" or "does not contain" conditions
+        
+        Args:
+            patterns: List of pattern strings
+            mode: 'contains', 'ends_with' or 'not_contains'
+            alphabet: Input alphabet; defaults to {0, 1} or {a, b} when the
+                patterns only use those symbols
+        """
+        if not alphabet:
+            chars = set(''.join(patterns))
+            if chars <= {'0', '1'}:
+                alphabet = ['0', '1']
+            elif chars <= {'a', 'b'}:
+                alphabet = ['a', 'b']
+        
+        try:
+            dfa, construction = pattern_dfa(patterns, mode, alphabet)
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        quoted = ', '.join(f'"{p}"' for p in patterns)
+        condition = {
+            'contains': f'contain {"one of " if len(patterns) > 1 else ""}{quoted}',
+            'ends_with': f'end with {"one of " if len(patterns) > 1 else ""}{quoted}',
+            'not_contains': f'do not contain {"any of " if len(patterns) > 1 else ""}{quoted}'
+        }[mode]
+        method = 'the KMP failure function' if construction == 'kmp' else 'an Aho-Corasick automaton'
+        
+        result = {
+            'dfa': dfa,
+            'construction': construction,
+            'explanation': f'DFA that accepts strings that {condition}, built directly from {method} with {len(dfa["states"])} states. Each state records the longest suffix of the input read so far that is a prefix of a pattern.' + (' Accept states are flipped from the "contains" DFA.' if mode == 'not_contains' else ''),
+            'diagram_filename': 'dfa_construction.png'
+        }
+        if len(dfa['states']) <= self.MAX_TABLE_STATES:
+            result['transition_table'] = self._generate_transition_table(dfa)
+        return result
+    
+    def _construct_dfa_for_words(self, words=None, path=None):
+        """
+        Construct the minimal DFA accepting exactly a sorted list of words
+        
+        Args:
+            words: Sorted list of strings
+            path: File with one word per line, in sorted order (streamed)
+        """
+        try:
+            if path is None and (not isinstance(words, list) or not all(isinstance(w, str) for w in words)):
+                return {'error': 'words must be a list of strings'}
+            builder = build_dawg(words, path)
+        except (ValueError, OSError, UnicodeDecodeError) as e:
+            return {'error': str(e)}
+        
+        dfa = builder.to_automaton()
+        result = {
+            'dfa': dfa,
+            'word_count': builder.word_count,
+            'state_count': len(dfa['states']),
+            'explanation': f'Minimal DFA accepting exactly {builder.word_count} words, built incrementally from the sorted list. It has {len(dfa["states"])} states; common prefixes and common suffixes share states, and any other input has no transition and is rejected.',
+            'diagram_filename': 'dfa_construction.png'
+        }
+        if len(dfa['states']) <= self.MAX_TABLE_STATES:
+            result['transition_table'] = self._generate_transition_table(dfa)
+        return result
+    
     def construct_nfa(self, parsed_input):
         """Construct an NFA from language description"""
         question = parsed_input.get('question', '').lower()
@@ -201,12 +319,13 @@ class DFAEngine:
             if substring_match:
                 substring = substring_match.group(1)
                 nfa = self._construct_nfa_for_substring(substring)
-                return {
+                result = {
                     'nfa': nfa,
                     'explanation': f'NFA constructed to accept strings containing the substring "{substring}".\n\nThe NFA has {len(substring) + 1} states. It non-deterministically guesses where the substring begins and verifies the pattern. Once the full substring is matched, it stays in the accept state.',
                     'transition_table': self._generate_transition_table(nfa),
                     'diagram_filename': 'nfa_construction.png'
                 }
+                return self._add_chain_matches(result, nfa, parsed_input)
         
         # Check for epsilon/lambda transitions
         if 'epsilon' in question or 'lambda' in question or 'ε' in question:
@@ -268,6 +387,28 @@ class DFAEngine:
             'diagram_filename': 'nfa_construction.png'
         }
     
+    def _add_chain_matches(self, result, nfa, parsed_input):
+        """Run any test strings from the request through a Shift-And matcher for a chain NFA"""
+        matcher = ShiftAndMatcher.from_nfa(nfa)
+        if matcher is None:
+            return result
+        
+        result['simulation_mode'] = 'shift_and'
+        test_strings = parsed_input.get('test_strings')
+        if test_strings is None and parsed_input.get('test_string') is not None:
+            test_strings = [parsed_input['test_string']]
+        if test_strings is not None:
+            result['matches'] = []
+            for test_string in test_strings:
+                run = matcher.run(test_string)
+                result['matches'].append({
+                    'test_string': test_string,
+                    'accepted': run['accepted'],
+                    'match_ends': run['match_ends']
+                })
+        
+        return result
+    
     def _construct_nfa_for_substring(self, substring):
         """Construct an NFA that accepts strings containing a specific substring"""
         # Determine alphabet from the substring
@@ -330,57 +471,7 @@ class DFAEngine:
                 'accept_states': ['q2']
             }
         
-        # Subset construction algorithm
-        dfa_states = []
-        dfa_transitions = {}
-        dfa_accept_states = []
-        
-        # Start with epsilon closure of start state
-        start_closure = epsilon_closure(nfa['start_state'], nfa.get('transitions', {}))
-        start_state_name = format_state_name(start_closure)
-        
-        dfa_states.append(start_state_name)
-        queue = [start_closure]
-        processed = set()
-        
-        while queue:
-            current_set = queue.pop(0)
-            current_name = format_state_name(current_set)
-            
-            if current_name in processed:
-                continue
-            processed.add(current_name)
-            
-            # Check if this is an accept state
-            if any(state in nfa.get('accept_states', []) for state in current_set):
-                dfa_accept_states.append(current_name)
-            
-            dfa_transitions[current_name] = {}
-            
-            # For each symbol in alphabet
-            for symbol in nfa.get('alphabet', []):
-                # Compute move and epsilon closure
-                next_set = set()
-                for state in current_set:
-                    moved = move({state}, symbol, nfa.get('transitions', {}))
-                    for moved_state in moved:
-                        next_set.update(epsilon_closure(moved_state, nfa.get('transitions', {})))
-                
-                if next_set:
-                    next_name = format_state_name(next_set)
-                    dfa_transitions[current_name][symbol] = next_name
-                    
-                    if next_name not in dfa_states:
-                        dfa_states.append(next_name)
-                        queue.append(next_set)
-        
-        dfa = {
-            'states': dfa_states,
-            'alphabet': nfa.get('alphabet', []),
-            'transitions': dfa_transitions,
-            'start_state': start_state_name,
-            'accept_states': dfa_accept_states
-        }
+        dfa = self._subset_construction(nfa)
         
         return {
             'original_nfa': nfa,
@@ -396,126 +487,152 @@ class DFAEngine:
             'diagram_filename': 'nfa_to_dfa.png'
         }
     
+    def _subset_construction(self, nfa):
+        """
+        Determinize an NFA with subsets stored as integer bitmasks
+        
+        Each NFA state gets one bit. The ε-closure of every state (from an
+        EpsilonClosureIndex) and the closed move of every (state, symbol)
+        pair are computed once up front, so expanding a subset is just an OR
+        over its bits. Subsets are keyed by mask in a dict and explored from
+        a deque; readable names are only built for the final DFA.
+        """
+        transitions = nfa.get('transitions', {})
+        alphabet = [symbol for symbol in nfa.get('alphabet', []) if symbol != 'ε']
+        
+        # Intern NFA states to bit positions and precompute closures
+        closures = EpsilonClosureIndex(transitions, nfa.get('states', []) + [nfa['start_state']])
+        
+        # move_mask[symbol][i] is the ε-closure of δ(state i, symbol)
+        move_mask = [closures.closed_move_row(symbol) for symbol in alphabet]
+        
+        accept_mask = closures.mask_of(s for s in nfa.get('accept_states', []) if s in closures.index)
+        
+        start_mask = closures.closure_mask(nfa['start_state'])
+        subset_id = {start_mask: 0}
+        subsets = [start_mask]
+        edges = []
+        queue = deque([start_mask])
+        
+        while queue:
+            current = queue.popleft()
+            
+            out = []
+            for row in move_mask:
+                next_mask = 0
+                bits = current
+                while bits:
+                    low = bits & -bits
+                    next_mask |= row[low.bit_length() - 1]
+                    bits ^= low
+                
+                if next_mask:
+                    if next_mask not in subset_id:
+                        subset_id[next_mask] = len(subsets)
+                        subsets.append(next_mask)
+                        queue.append(next_mask)
+                    out.append(subset_id[next_mask])
+                else:
+                    out.append(-1)
+            edges.append(out)
+        
+        # Generate readable names only now
+        dfa_states = [format_state_name(set(closures.states_of(mask))) for mask in subsets]
+        dfa_transitions = {}
+        for i, out in enumerate(edges):
+            dfa_transitions[dfa_states[i]] = {
+                symbol: dfa_states[target]
+                for symbol, target in zip(alphabet, out) if target >= 0
+            }
+        
+        return {
+            'states': dfa_states,
+            'alphabet': nfa.get('alphabet', []),
+            'transitions': dfa_transitions,
+            'start_state': dfa_states[0],
+            'accept_states': [dfa_states[i] for i, mask in enumerate(subsets) if mask & accept_mask]
+        }
+    
     def minimize_dfa(self, parsed_input):
-        """Minimize a DFA using table-filling algorithm"""
+        """Minimize a DFA using Hopcroft's partition refinement algorithm"""
         dfa = parsed_input.get('automaton', {})
         
         if not dfa or 'states' not in dfa:
             return {'error': 'Invalid DFA specification'}
         
-        # Simplified minimization (partition refinement)
         states = dfa['states']
+        compiled = self.compile(dfa)
         
-        # Initial partition: accepting vs non-accepting
-        accept_states = set(dfa.get('accept_states', []))
-        non_accept_states = set(states) - accept_states
+        if compiled.start < 0:
+            return {'error': 'DFA has no start state'}
         
-        partitions = []
-        if non_accept_states:
-            partitions.append(non_accept_states)
-        if accept_states:
-            partitions.append(accept_states)
+        started = time.perf_counter()
         
-        # Refine partitions
-        changed = True
-        iterations = 0
+        # Trim unreachable states first
+        reachable = compiled.reachable_states()
+        unreachable_count = compiled.num_states - len(reachable)
         
-        while changed and iterations < 10:
-            changed = False
-            iterations += 1
-            new_partitions = []
-            
-            for partition in partitions:
-                if len(partition) <= 1:
-                    new_partitions.append(partition)
-                    continue
-                
-                # Try to split this partition
-                sub_partitions = self._split_partition(partition, partitions, dfa)
-                
-                if len(sub_partitions) > 1:
-                    changed = True
-                    new_partitions.extend(sub_partitions)
-                else:
-                    new_partitions.append(partition)
-            
-            partitions = new_partitions
+        # Refine accepting/non-accepting partition to a fixpoint
+        block, _, splitters = compiled.minimal_partition(reachable)
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
         
         # Build minimized DFA
-        minimized_dfa = self._build_minimized_dfa(dfa, partitions)
+        minimized_dfa = self._build_minimized_dfa(compiled, block, dfa.get('alphabet', []), reachable)
+        
+        explanation = f'DFA minimized from {len(states)} states to {len(minimized_dfa["states"])} states using Hopcroft\'s algorithm.'
+        if unreachable_count:
+            explanation += f' {unreachable_count} unreachable state(s) were removed first.'
         
         return {
             'original_dfa': dfa,
             'minimized_dfa': minimized_dfa,
             'original_state_count': len(states),
             'minimized_state_count': len(minimized_dfa['states']),
-            'explanation': f'DFA minimized from {len(states)} states to {len(minimized_dfa["states"])} states using partition refinement.',
+            'unreachable_state_count': unreachable_count,
+            'splitters_processed': splitters,
+            'minimization_time_ms': round(elapsed_ms, 3),
+            'explanation': explanation,
+            'steps': [
+                'Step 1: Remove states unreachable from the start state',
+                'Step 2: Split states into accepting and non-accepting blocks',
+                'Step 3: Use each (block, symbol) pair as a splitter and split blocks by their predecessors',
+                'Step 4: Repeat until no block can be split, then merge each block into one state'
+            ],
             'transition_table': self._generate_transition_table(minimized_dfa),
             'diagram_filename': 'dfa_minimized.png'
         }
     
-    def _split_partition(self, partition, all_partitions, dfa):
-        """Try to split a partition based on transition behavior"""
-        if len(partition) <= 1:
-            return [partition]
-        
-        transitions = dfa.get('transitions', {})
-        alphabet = dfa.get('alphabet', [])
+    def _build_minimized_dfa(self, compiled, block, alphabet, states):
+        """Build minimized DFA from a block id per compiled state"""
+        # Name blocks in order of first appearance, starting from the start state
+        names = {}
+        for state in states:
+            if block[state] not in names:
+                names[block[state]] = f"q{len(names)}"
         
-        # Group states by their transition signatures
-        signatures = {}
+        new_states = list(names.values())
+        new_transitions = {name: {} for name in new_states}
+        new_accept = []
+        seen_accept = set()
         
-        for state in partition:
-            sig = []
-            for symbol in alphabet:
-                if state in transitions and symbol in transitions[state]:
-                    next_state = transitions[state][symbol]
-                    # Find which partition next_state belongs to
-                    for i, part in enumerate(all_partitions):
-                        if next_state in part:
-                            sig.append(i)
-                            break
-                else:
-                    sig.append(-1)
+        for state in states:
+            name = names[block[state]]
+            base = state * compiled.width
+            for symbol_id, symbol in enumerate(compiled.symbols):
+                target = compiled.table[base + symbol_id]
+                if target >= 0:
+                    new_transitions[name][symbol] = names[block[target]]
             
-            sig_tuple = tuple(sig)
-            if sig_tuple not in signatures:
-                signatures[sig_tuple] = set()
-            signatures[sig_tuple].add(state)
-        
-        return list(signatures.values())
-    
-    def _build_minimized_dfa(self, original_dfa, partitions):
-        """Build minimized DFA from partitions"""
-        # Map each state to its partition representative
-        state_map = {}
-        new_states = []
-        
-        for i, partition in enumerate(partitions):
-            representative = f"q{i}"
-            new_states.append(representative)
-            for state in partition:
-                state_map[state] = representative
-        
-        # Build transitions
-        new_transitions = {}
-        for state in new_states:
-            new_transitions[state] = {}
-        
-        for old_state, representative in state_map.items():
-            if old_state in original_dfa.get('transitions', {}):
-                for symbol, next_state in original_dfa['transitions'][old_state].items():
-                    new_transitions[representative][symbol] = state_map[next_state]
-        
-        # Map start state and accept states
-        new_start = state_map[original_dfa['start_state']]
-        new_accept = list(set(state_map[s] for s in original_dfa.get('accept_states', [])))
+            if compiled.is_accepting(state) and name not in seen_accept:
+                seen_accept.add(name)
+                new_accept.append(name)
         
         return {
             'states': new_states,
-            'alphabet': original_dfa.get('alphabet', []),
+            'alphabet': alphabet,
             'transitions': new_transitions,
-            'start_state': new_start,
+            'start_state': names[block[compiled.start]],
             'accept_states': new_accept
         }
     
@@ -523,22 +640,21 @@ class DFAEngine:
         """Convert regular expression to NFA using Thompson's construction"""
         regex = parsed_input.get('regex', '')
         
-        # Simplified Thompson's construction
-        nfa = {
-            'states': ['q0', 'q1'],
-            'alphabet': list(set(c for c in regex if c.isalnum())),
-            'transitions': {
-                'q0': {},
-                'q1': {}
-            },
-            'start_state': 'q0',
-            'accept_states': ['q1']
-        }
+        if parsed_input.get('regex_backend') == 'derivative':
+            return self._regex_to_derivative_dfa(parsed_input)
         
-        return {
+        try:
+            compiled = compile_regex(regex)
+        except ValueError as e:
+            return {'error': f'Invalid regular expression "{regex}": {e}'}
+        
+        nfa = compiled.nfa
+        
+        result = {
             'regex': regex,
             'nfa': nfa,
-            'explanation': "NFA constructed using Thompson's construction algorithm.",
+            'epsilon_free_nfa': compiled.epsilon_free_nfa,
+            'explanation': f"NFA constructed using Thompson's construction algorithm. It has {len(nfa['states'])} states; removing ε-transitions leaves {len(compiled.epsilon_free_nfa['states'])} reachable states.",
             'steps': [
                 'Step 1: Create NFA fragments for each symbol',
                 'Step 2: Connect fragments for concatenation',
@@ -548,46 +664,422 @@ class DFAEngine:
             'transition_table': self._generate_transition_table(nfa),
             'diagram_filename': 're_to_nfa.png'
         }
+        
+        return self._add_regex_matches(result, compiled, parsed_input)
+    
+    def _regex_to_derivative_dfa(self, parsed_input):
+        """Build the automaton for a regex from Brzozowski derivatives"""
+        regex = parsed_input.get('regex', '')
+        
+        try:
+            compiled = compile_derivative_regex(regex)
+            dfa = compiled.to_dfa()
+        except ValueError as e:
+            return {'error': f'Invalid regular expression "{regex}": {e}'}
+        
+        result = {
+            'regex': regex,
+            'nfa': dfa,
+            'regex_backend': 'derivative',
+            'explanation': f'Automaton built directly from Brzozowski derivatives of the regular expression. Each state is a distinct derivative, so the result is already deterministic ({len(dfa["states"])} states) and no subset construction is needed.',
+            'steps': [
+                'Step 1: Put the regular expression in canonical form',
+                'Step 2: Take the derivative with respect to each symbol',
+                'Step 3: Each new canonical derivative becomes a new state',
+                'Step 4: States whose derivative accepts ε are accepting'
+            ],
+            'transition_table': self._generate_transition_table(dfa),
+            'diagram_filename': 're_to_nfa.png'
+        }
+        
+        return self._add_regex_matches(result, compiled, parsed_input)
+    
+    def _add_regex_matches(self, result, compiled, parsed_input):
+        """Match any test strings from the request against a compiled regex"""
+        test_strings = parsed_input.get('test_strings')
+        if test_strings is None and parsed_input.get('test_string') is not None:
+            test_strings = [parsed_input['test_string']]
+        if test_strings is not None:
+            result['matches'] = [
+                {'test_string': s, 'accepted': compiled.matches(s)} for s in test_strings
+            ]
+        
+        return result
     
     def test_membership(self, parsed_input):
         """Test if a string is accepted by the automaton"""
+        if parsed_input.get('test_strings') is not None:
+            return self.batch_membership(parsed_input)
+        
         automaton = parsed_input.get('automaton', {})
         test_string = parsed_input.get('test_string', '')
+        include_trace = parsed_input.get('trace', True)
         
         if not automaton:
             return {'error': 'No automaton provided'}
         
+        if not self._is_deterministic(automaton):
+            return self._nfa_membership(automaton, test_string, parsed_input.get('cache_bytes'))
+        
+        try:
+            compiled = self.compile(automaton)
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        if compiled.start < 0:
+            return {'error': 'Automaton has no start state'}
+        
         # Simulate DFA
-        current_state = automaton['start_state']
-        trace = [current_state]
-        
-        for symbol in test_string:
-            if current_state in automaton['transitions']:
-                if symbol in automaton['transitions'][current_state]:
-                    current_state = automaton['transitions'][current_state][symbol]
-                    trace.append(current_state)
-                else:
-                    return {
-                        'accepted': False,
-                        'reason': f'No transition for symbol "{symbol}" from state {current_state}',
-                        'trace': trace
-                    }
+        symbols = compiled.encode(test_string)
+        if include_trace:
+            state, consumed, trace_ids = compiled.run_with_trace(symbols)
+            trace = [compiled.states[i] for i in trace_ids]
+        else:
+            state, consumed = compiled.run_strided(symbols, memory_budget=parsed_input.get('stride_budget', DEFAULT_MEMORY_BUDGET))
+            trace = None
+        
+        current_state = compiled.states[state]
+        
+        if consumed < len(symbols):
+            if current_state in automaton.get('transitions', {}):
+                reason = f'No transition for symbol "{test_string[consumed]}" from state {current_state}'
             else:
-                return {
-                    'accepted': False,
-                    'reason': f'State {current_state} has no transitions',
-                    'trace': trace
-                }
+                reason = f'State {current_state} has no transitions'
+            
+            result = {
+                'accepted': False,
+                'reason': reason,
+            }
+            if include_trace:
+                result['trace'] = trace
+            return result
         
-        accepted = current_state in automaton.get('accept_states', [])
+        accepted = compiled.is_accepting(state)
         
-        return {
+        result = {
             'test_string': test_string,
             'accepted': accepted,
             'final_state': current_state,
-            'trace': trace,
             'explanation': f'String "{test_string}" is {"accepted" if accepted else "rejected"}.'
         }
+        if include_trace:
+            result['trace'] = trace
+        return result
+    
+    def _nfa_membership(self, nfa, test_string, cache_bytes=None):
+        """Test NFA membership by determinizing lazily along the input"""
+        if nfa.get('start_state') is None:
+            return {'error': 'Automaton has no start state'}
+        
+        matcher = ShiftAndMatcher.from_nfa(nfa)
+        if matcher is not None:
+            return self._chain_membership(matcher, test_string)
+        
+        lazy = LazyDFA(nfa, cache_bytes)
+        final_mask, mode = lazy.run(test_string)
+        accepted = bool(final_mask & lazy.accept_mask)
+        
+        final_states = format_state_name(set(lazy.closures.states_of(final_mask)))
+        
+        return {
+            'test_string': test_string,
+            'accepted': accepted,
+            'final_state': final_states,
+            'simulation_mode': mode,
+            'cache_stats': lazy.stats(),
+            'explanation': f'String "{test_string}" is {"accepted" if accepted else "rejected"}. The NFA was determinized on the fly while reading the input, so only the subsets the input reaches were built.'
+        }
+    
+    def _chain_membership(self, matcher, test_string):
+        """Test membership of a chain-shaped NFA with bit-parallel Shift-And"""
+        run = matcher.run(test_string)
+        accepted = run['accepted']
+        
+        return {
+            'test_string': test_string,
+            'accepted': accepted,
+            'final_state': format_state_name(set(run['active_states'])),
+            'simulation_mode': 'shift_and',
+            'match_ends': run['match_ends'],
+            'match_count': run['match_count'],
+            'explanation': f'String "{test_string}" is {"accepted" if accepted else "rejected"}. The NFA is a chain of {matcher.length + 1} states, so all of its states were tracked at once as bits of one integer (Shift-And), one shift and mask per symbol.'
+        }
+    
+    def batch_membership(self, parsed_input):
+        """
+        Test many strings against one automaton in a single call
+        
+        The automaton is compiled once and all strings are run together.
+        Final states and traces are only reported when requested with the
+        'final_states' and 'trace' flags. 'stride_budget' caps the memory of
+        the multi-symbol stride table (0 disables it). NFAs are run through
+        one shared lazy determinizer (or Shift-And for chains) instead.
+        """
+        automaton = parsed_input.get('automaton', {})
+        test_strings = parsed_input.get('test_strings', [])
+        include_finals = parsed_input.get('final_states', False)
+        include_trace = parsed_input.get('trace', False)
+        
+        if not automaton:
+            return {'error': 'No automaton provided'}
+        
+        if not isinstance(test_strings, list) or not all(isinstance(s, str) for s in test_strings):
+            return {'error': 'test_strings must be a list of strings'}
+        
+        if not self._is_deterministic(automaton):
+            return self._nfa_batch_membership(automaton, test_strings, include_finals, parsed_input.get('cache_bytes'))
+        
+        try:
+            compiled = self.compile(automaton)
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        if compiled.start < 0:
+            return {'error': 'Automaton has no start state'}
+        
+        finals, accepted = compiled.run_batch(test_strings, parsed_input.get('stride_budget', DEFAULT_MEMORY_BUDGET))
+        
+        results = []
+        for index, test_string in enumerate(test_strings):
+            entry = {
+                'test_string': test_string,
+                'accepted': bool(accepted[index])
+            }
+            
+            if include_finals:
+                final = int(finals[index])
+                entry['final_state'] = compiled.states[final] if final < compiled.num_states else None
+            
+            if include_trace:
+                _, _, trace_ids = compiled.run_with_trace(compiled.encode(test_string))
+                entry['trace'] = [compiled.states[i] for i in trace_ids]
+            
+            results.append(entry)
+        
+        accepted_count = int(accepted.sum())
+        
+        return {
+            'results': results,
+            'total': len(test_strings),
+            'accepted_count': accepted_count,
+            'rejected_count': len(test_strings) - accepted_count,
+            'explanation': f'{accepted_count} of {len(test_strings)} strings are accepted.'
+        }
+    
+    def _nfa_batch_membership(self, nfa, test_strings, include_finals, cache_bytes=None):
+        """Batch membership for an NFA; the subset cache is shared by all strings"""
+        if nfa.get('start_state') is None:
+            return {'error': 'Automaton has no start state'}
+        
+        matcher = ShiftAndMatcher.from_nfa(nfa)
+        lazy = None if matcher is not None else LazyDFA(nfa, cache_bytes)
+        mode = 'shift_and' if matcher is not None else 'lazy_dfa'
+        
+        results = []
+        for test_string in test_strings:
+            if matcher is not None:
+                run = matcher.run(test_string)
+                entry = {'test_string': test_string, 'accepted': run['accepted']}
+                if include_finals:
+                    entry['final_state'] = format_state_name(set(run['active_states']))
+            else:
+                final_mask, run_mode = lazy.run(test_string)
+                if run_mode != 'lazy_dfa':
+                    mode = run_mode
+                entry = {'test_string': test_string, 'accepted': bool(final_mask & lazy.accept_mask)}
+                if include_finals:
+                    entry['final_state'] = format_state_name(set(lazy.closures.states_of(final_mask)))
+            results.append(entry)
+        
+        accepted_count = sum(1 for entry in results if entry['accepted'])
+        
+        result = {
+            'results': results,
+            'total': len(test_strings),
+            'accepted_count': accepted_count,
+            'rejected_count': len(test_strings) - accepted_count,
+            'simulation_mode': mode,
+            'explanation': f'{accepted_count} of {len(test_strings)} strings are accepted.'
+        }
+        if lazy is not None:
+            result['cache_stats'] = lazy.stats()
+        return result
+    
+    def stream_membership(self, automaton, chunks):
+        """
+        Test membership over input supplied as an iterator of chunks
+        
+        Chunks may be str or UTF-8 bytes. Memory stays constant regardless of
+        the total input length.
+        """
+        try:
+            session = MembershipSession(automaton, self.compile(automaton))
+        except ValueError as e:
+            return {'error': str(e)}
+        
+        status = session.feed_all(chunks)
+        status['explanation'] = f'Input of {status["symbols_read"]} symbols is {"accepted" if status["accepted"] else "rejected"}.'
+        return status
+    
+    def file_membership(self, automaton, path):
+        """
+        Test membership of a file's contents by memory-mapping it
+        
+        Every byte is one input symbol, looked up through a byte-to-symbol
+        table, so the file is never decoded into a string.
+        """
+        try:
+            compiled = self.compile(automaton)
+            if compiled.start < 0:
+                return {'error': 'Automaton has no start state'}
+            run = run_dfa_file(compiled, path)
+        except (ValueError, OSError) as e:
+            return {'error': str(e)}
+        
+        complete = run['consumed'] == run['size']
+        accepted = complete and compiled.is_accepting(run['state'])
+        
+        result = {
+            'accepted': accepted,
+            'final_state': compiled.states[run['state']] if complete else None,
+            'symbols_read': run['consumed'],
+            'file_size': run['size'],
+            'explanation': f'Input file of {run["size"]} bytes is {"accepted" if accepted else "rejected"}.'
+        }
+        if not complete:
+            result['reason'] = f'No transition from state {compiled.states[run["state"]]} at byte offset {run["consumed"]}'
+        return result
+    
+    def parallel_membership(self, automaton, test_string=None, path=None, workers=None,
+                            chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Test membership of one long input split across worker processes
+        
+        Each chunk's transfer function (entry state -> exit state) is computed
+        independently and the results are composed in order, so chunks do not
+        wait on each other. Inputs of at most one chunk run in-process.
+        
+        Args:
+            test_string: Input string (ignored if path is given)
+            path: File whose bytes are the input
+            workers: Process count (defaults to the CPU count)
+            chunk_size: Symbols (or bytes) per chunk
+        """
+        try:
+            compiled = self.compile(automaton)
+            if compiled.start < 0:
+                return {'error': 'Automaton has no start state'}
+            
+            if path is not None:
+                tasks = file_tasks(path, chunk_size)
+                size = sum(task[1][2] for task in tasks)
+            else:
+                tasks = string_tasks(compiled, test_string or '', chunk_size)
+                size = len(test_string or '')
+            
+            if len(tasks) <= 1:
+                result = self.file_membership(automaton, path) if path is not None \
+                    else self.test_membership({'automaton': automaton, 'test_string': test_string or '', 'trace': False})
+                result['chunks'] = len(tasks)
+                return result
+            
+            state = parallel_run(compiled, tasks, workers)
+        except (ValueError, OSError) as e:
+            return {'error': str(e)}
+        
+        accepted = compiled.is_accepting(state)
+        result = {
+            'accepted': accepted,
+            'final_state': compiled.states[state] if state >= 0 else None,
+            'symbols_read': size,
+            'chunks': len(tasks),
+            'explanation': f'Input of {size} symbols is {"accepted" if accepted else "rejected"}.'
+        }
+        if state < 0:
+            result['reason'] = 'Input reaches a missing transition'
+        return result
+    
+    def _compile_pair(self, parsed_input):
+        """Compile the submitted automaton and the reference automaton"""
+        automaton = parsed_input.get('automaton') or {}
+        reference = parsed_input.get('reference_automaton') or {}
+        
+        if not automaton or not reference:
+            return None, None, {'error': 'Both automaton and reference_automaton are required'}
+        
+        try:
+            first = self.compile(automaton)
+            second = self.compile(reference)
+        except ValueError as e:
+            return None, None, {'error': str(e)}
+        
+        if first.start < 0 or second.start < 0:
+            return None, None, {'error': 'Both automata need a start state'}
+        
+        return first, second, None
+    
+    def check_equivalence(self, parsed_input):
+        """Check whether two DFAs accept the same language"""
+        first, second, error = self._compile_pair(parsed_input)
+        if error:
+            return error
+        
+        equivalent, unions = hopcroft_karp_equivalent(first, second)
+        
+        result = {
+            'equivalent': equivalent,
+            'union_count': unions,
+            'steps': [
+                'Step 1: Merge the start states of both DFAs into one class',
+                'Step 2: For each merged pair and symbol, merge the pair of successor states',
+                'Step 3: Stop as soon as a merged pair disagrees on acceptance',
+                'Step 4: If no pair disagrees, the DFAs are equivalent'
+            ]
+        }
+        
+        if equivalent:
+            result['explanation'] = f'The DFAs are equivalent. Hopcroft-Karp merged {unions} state pairs without finding a pair that disagrees on acceptance.'
+            return result
+        
+        witness, explored = shortest_difference(first, second)
+        counterexample = ''.join(witness)
+        accepted_by = 'automaton' if first.accepts(counterexample) else 'reference_automaton'
+        
+        result.update({
+            'counterexample': counterexample,
+            'accepted_by': accepted_by,
+            'product_states_explored': explored,
+            'explanation': f'The DFAs are not equivalent. The shortest distinguishing string is "{counterexample}", which only the {accepted_by.replace("_", " ")} accepts.'
+        })
+        return result
+    
+    def check_inclusion(self, parsed_input):
+        """Check whether the language of one DFA is contained in another's"""
+        first, second, error = self._compile_pair(parsed_input)
+        if error:
+            return error
+        
+        witness, explored = shortest_difference(first, second, mode='inclusion')
+        included = witness is None
+        
+        result = {
+            'included': included,
+            'product_states_explored': explored,
+            'steps': [
+                'Step 1: Start the product automaton at the pair of start states',
+                'Step 2: Explore product states breadth-first, creating them only when reached',
+                'Step 3: Stop at the first pair accepted by the automaton but not by the reference',
+                'Step 4: If no such pair is reachable, the language is included'
+            ]
+        }
+        
+        if included:
+            result['explanation'] = f'L(automaton) ⊆ L(reference). {explored} reachable product states were explored without finding a counterexample.'
+        else:
+            result['counterexample'] = ''.join(witness)
+            result['explanation'] = f'L(automaton) is not a subset of L(reference). The shortest counterexample is "{result["counterexample"]}", accepted by the automaton but not by the reference.'
+        
+        return result
     
     def _generate_transition_table(self, automaton):
         """Generate a transition table for display"""
@@ -598,6 +1090,12 @@ class DFAEngine:
         table = []
         table.append(['State'] + alphabet + ['Accept'])
         
+        # Deterministic automata keep the declared state order but look
+        # transitions up in the compiled table
+        if self._is_deterministic(automaton):
+            table.extend(self.compile(automaton).transition_rows(alphabet, states))
+            return table
+        
         for state in states:
             row = [state]
             for symbol in alphabet:
@@ -613,3 +1111,13 @@ class DFAEngine:
             table.append(row)
         
         return table
+    
+    def _is_deterministic(self, automaton):
+        """Check that every transition target is a single state"""
+        for moves in automaton.get('transitions', {}).values():
+            if moves.get('ε'):
+                return False
+            for next_state in moves.values():
+                if isinstance(next_state, list):
+                    return False
+        return automaton.get('start_state') is not None
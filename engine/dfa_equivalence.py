@@ -0,0 +1,145 @@
+"""
+DFA Equivalence - Equivalence and inclusion checks between two compiled DFAs
+"""
+from collections import deque
+
+
+def _aligned_columns(first, second):
+    """Union alphabet of two DFAs with the column of each symbol in both"""
+    symbols = list(first.symbols)
+    for symbol in second.symbols:
+        if symbol not in first.symbol_index:
+            symbols.append(symbol)
+
+    first_columns = [first.symbol_index.get(s, first.unknown_symbol) for s in symbols]
+    second_columns = [second.symbol_index.get(s, second.unknown_symbol) for s in symbols]
+    return symbols, first_columns, second_columns
+
+
+def _stepper(compiled, columns):
+    """
+    Transition function over aligned columns with an implicit sink
+
+    The sink has id num_states, loops on every symbol and never accepts.
+    """
+    table = compiled.table
+    width = compiled.width
+    sink = compiled.num_states
+
+    def step(state, position):
+        if state == sink:
+            return sink
+        target = table[state * width + columns[position]]
+        return target if target >= 0 else sink
+
+    def accepting(state):
+        return state != sink and compiled.is_accepting(state)
+
+    return step, accepting, sink
+
+
+def hopcroft_karp_equivalent(first, second):
+    """
+    Check two DFAs for equivalence with Hopcroft and Karp's union-find method
+
+    States of both automata live in one union-find structure. Starting from
+    the pair of start states, every pair of successor states on the same
+    symbol is merged; the DFAs are equivalent unless some merged pair
+    disagrees on acceptance. Each union removes a class, so the work is
+    near-linear in the total number of states.
+
+    Returns:
+        tuple: (equivalent, number of unions performed)
+    """
+    symbols, first_columns, second_columns = _aligned_columns(first, second)
+    step_a, accept_a, sink_a = _stepper(first, first_columns)
+    step_b, accept_b, _ = _stepper(second, second_columns)
+    offset = sink_a + 1
+
+    parent = {}
+
+    def find(node):
+        root = node
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while node != root:
+            parent[node], node = root, parent.get(node, node)
+        return root
+
+    start_a, start_b = first.start, second.start
+    if accept_a(start_a) != accept_b(start_b):
+        return False, 0
+
+    parent[start_a] = start_b + offset
+    unions = 1
+    pending = [(start_a, start_b)]
+
+    while pending:
+        p, q = pending.pop()
+        for position in range(len(symbols)):
+            next_p = step_a(p, position)
+            next_q = step_b(q, position)
+            root_p = find(next_p)
+            root_q = find(next_q + offset)
+            if root_p == root_q:
+                continue
+            if accept_a(next_p) != accept_b(next_q):
+                return False, unions
+            parent[root_p] = root_q
+            unions += 1
+            pending.append((next_p, next_q))
+
+    return True, unions
+
+
+def shortest_difference(first, second, mode='equivalence'):
+    """
+    Breadth-first search of the product automaton for a shortest witness
+
+    Product states are only created when the search reaches them, so the
+    full product is never built.
+
+    Args:
+        mode: 'equivalence' looks for a string accepted by exactly one DFA;
+            'inclusion' looks for a string accepted by the first DFA but not
+            the second (a witness that L(first) is not a subset of L(second)).
+
+    Returns:
+        tuple: (witness symbols as a list or None, product states explored)
+    """
+    symbols, first_columns, second_columns = _aligned_columns(first, second)
+    step_a, accept_a, _ = _stepper(first, first_columns)
+    step_b, accept_b, sink_b = _stepper(second, second_columns)
+    stride = sink_b + 1
+
+    def differs(p, q):
+        if mode == 'inclusion':
+            return accept_a(p) and not accept_b(q)
+        return accept_a(p) != accept_b(q)
+
+    start = (first.start, second.start)
+    start_key = start[0] * stride + start[1]
+    parents = {start_key: None}
+    queue = deque([start])
+
+    while queue:
+        p, q = queue.popleft()
+        key = p * stride + q
+
+        if differs(p, q):
+            witness = []
+            while parents[key] is not None:
+                key, position = parents[key]
+                witness.append(symbols[position])
+            witness.reverse()
+            return witness, len(parents)
+
+        for position in range(len(symbols)):
+            next_p = step_a(p, position)
+            next_q = step_b(q, position)
+            next_key = next_p * stride + next_q
+            if next_key not in parents:
+                parents[next_key] = (key, position)
+                queue.append((next_p, next_q))
+
+    return None, len(parents)
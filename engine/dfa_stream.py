@@ -0,0 +1,200 @@
+"""
+DFA Stream - Resumable streaming membership over chunked input
+"""
+from collections import OrderedDict
+import codecs
+import json
+import os
+import re
+import uuid
+from engine.compiled_dfa import CompiledDFA
+
+
+class MembershipSession:
+    """
+    Incremental DFA run over input that arrives in chunks
+
+    Only the current state and a few counters are kept between chunks, so
+    memory does not grow with the input. Sessions round-trip through
+    to_dict()/from_dict() to resume a run in another process.
+    """
+
+    def __init__(self, automaton, compiled=None):
+        self.automaton = automaton
+        self.compiled = compiled or CompiledDFA(automaton)
+        if self.compiled.start < 0:
+            raise ValueError('Automaton has no start state')
+
+        self.state = self.compiled.start
+        self.symbols_read = 0
+        self.chunks_read = 0
+        self.stuck_at = None
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def feed(self, chunk):
+        """Advance the run over a chunk of text"""
+        self.chunks_read += 1
+        self._advance(chunk)
+        return self.status()
+
+    def feed_bytes(self, data, final=False):
+        """Advance the run over raw UTF-8 bytes, buffering split characters"""
+        self.chunks_read += 1
+        self._advance(self._decoder.decode(data, final))
+        return self.status()
+
+    def feed_all(self, chunks):
+        """Advance the run over every chunk of an iterator"""
+        for chunk in chunks:
+            if isinstance(chunk, bytes):
+                self.feed_bytes(chunk)
+            else:
+                self.feed(chunk)
+        return self.status()
+
+    def _advance(self, text):
+        if not text:
+            return
+
+        if self.stuck_at is None:
+            symbols = self.compiled.encode(text)
+            state, consumed = self.compiled.run(symbols, self.state)
+            self.state = state
+            if consumed < len(symbols):
+                self.stuck_at = self.symbols_read + consumed
+
+        self.symbols_read += len(text)
+
+    def status(self):
+        """Current state and acceptance of the input read so far"""
+        stuck = self.stuck_at is not None
+        return {
+            'current_state': None if stuck else self.compiled.states[self.state],
+            'accepted': not stuck and self.compiled.is_accepting(self.state),
+            'symbols_read': self.symbols_read,
+            'chunks_read': self.chunks_read,
+            'stuck_at': self.stuck_at,
+            'last_live_state': self.compiled.states[self.state]
+        }
+
+    def to_dict(self, include_automaton=True):
+        """Serialize the session, including any partially received character"""
+        pending, _ = self._decoder.getstate()
+        data = {
+            'state': self.compiled.states[self.state],
+            'symbols_read': self.symbols_read,
+            'chunks_read': self.chunks_read,
+            'stuck_at': self.stuck_at,
+            'pending_bytes': pending.hex()
+        }
+        if include_automaton:
+            data['automaton'] = self.automaton
+        return data
+
+    @classmethod
+    def from_dict(cls, data, automaton=None, compiled=None):
+        """Restore a session serialized with to_dict()"""
+        session = cls(automaton if automaton is not None else data['automaton'], compiled)
+        session.state = session.compiled.state_index[data['state']]
+        session.symbols_read = data.get('symbols_read', 0)
+        session.chunks_read = data.get('chunks_read', 0)
+        session.stuck_at = data.get('stuck_at')
+        session._decoder.setstate((bytes.fromhex(data.get('pending_bytes', '')), 0))
+        return session
+
+
+class SessionStore:
+    """
+    Keep streaming sessions on disk so any worker can resume them
+
+    Each session is two files: the automaton, written once, and the small
+    run state, rewritten after every chunk. Compiled automata of the most
+    recently used CACHE_SIZE sessions are kept in memory; any other session
+    is recompiled from its automaton file on first use.
+    """
+
+    ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+    CACHE_SIZE = 128
+
+    def __init__(self, directory='sessions', cache_size=None):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.cache_size = cache_size or self.CACHE_SIZE
+        self._cache = OrderedDict()
+
+    def _paths(self, session_id):
+        if not self.ID_PATTERN.match(session_id or ''):
+            raise KeyError(session_id)
+        base = os.path.join(self.directory, session_id)
+        return f'{base}.automaton.json', f'{base}.json'
+
+    def _write(self, path, data):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+
+    def _remember(self, session_id, automaton, compiled):
+        """Cache a compiled automaton, evicting the least recently used"""
+        self._cache[session_id] = (automaton, compiled)
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _compiled(self, session_id, automaton_path):
+        """(automaton, compiled) for a session, from the cache or from disk"""
+        cached = self._cache.get(session_id)
+        if cached is not None:
+            self._cache.move_to_end(session_id)
+            return cached
+
+        with open(automaton_path) as f:
+            automaton = json.load(f)
+        compiled = CompiledDFA(automaton)
+        self._remember(session_id, automaton, compiled)
+        return automaton, compiled
+
+    def create(self, automaton):
+        """
+        Start a new session and return (session id, session)
+
+        Raises:
+            ValueError: if the automaton is not deterministic
+        """
+        for state, moves in (automaton.get('transitions') or {}).items():
+            if 'ε' in moves:
+                raise ValueError(f'State {state} has an ε-transition; streaming sessions need a DFA')
+            if any(isinstance(next_state, list) for next_state in moves.values()):
+                raise ValueError(f'State {state} has a non-deterministic transition; streaming sessions need a DFA')
+
+        session = MembershipSession(automaton)
+        session_id = uuid.uuid4().hex
+        automaton_path, _ = self._paths(session_id)
+        self._write(automaton_path, automaton)
+        self._remember(session_id, automaton, session.compiled)
+        self.save(session_id, session)
+        return session_id, session
+
+    def load(self, session_id):
+        """Load a session; raises KeyError if it does not exist"""
+        automaton_path, state_path = self._paths(session_id)
+        if not os.path.exists(state_path):
+            raise KeyError(session_id)
+
+        with open(state_path) as f:
+            data = json.load(f)
+
+        automaton, compiled = self._compiled(session_id, automaton_path)
+        return MembershipSession.from_dict(data, automaton, compiled)
+
+    def save(self, session_id, session):
+        """Write a session's run state atomically"""
+        _, state_path = self._paths(session_id)
+        self._write(state_path, session.to_dict(include_automaton=False))
+
+    def delete(self, session_id):
+        """Remove a session"""
+        self._cache.pop(session_id, None)
+        for path in self._paths(session_id):
+            if os.path.exists(path):
+                os.remove(path)
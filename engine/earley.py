@@ -0,0 +1,443 @@
+"""
+Earley Parser - CFG parsing into a shared packed parse forest
+"""
+import heapq
+from collections import deque
+from engine.utils import normalize_production
+
+EPSILON = 'ε'
+INFINITE = float('inf')
+
+
+def symbol_lengths(symbols):
+    """Distinct symbol lengths, longest first"""
+    return sorted({len(symbol) for symbol in symbols if symbol}, reverse=True)
+
+
+def tokenize(string, symbols, lengths=None):
+    """
+    Split a production or input string into grammar symbols
+
+    Uses the longest known symbol at each position and falls back to single
+    characters, so 'aSb' and '[q0,A,q1]b' both split as expected. 'ε' (or
+    'epsilon') is the empty string.
+    """
+    string = normalize_production(string)
+    if not string or string == EPSILON:
+        return ()
+    if lengths is None:
+        lengths = symbol_lengths(symbols)
+    tokens = []
+    i = 0
+    while i < len(string):
+        for length in lengths:
+            if string[i:i + length] in symbols:
+                break
+        else:
+            length = 1
+        piece = string[i:i + length]
+        if piece != EPSILON and not piece.isspace():
+            tokens.append(piece)
+        i += length
+    return tuple(tokens)
+
+
+class EarleyGrammar:
+    """
+    A grammar in parse_grammar form with tokenized right-hand sides
+
+    rules is a list of (lhs, rhs tuple); by_lhs maps a non-terminal to its
+    rule numbers; nullable holds the non-terminals that derive ε.
+    """
+
+    def __init__(self, grammar):
+        raw_rules = grammar.get('rules', {}) or {}
+        self.start = grammar.get('start_symbol')
+        self.non_terminals = set(raw_rules) | set(grammar.get('non_terminals', []) or [])
+        self.terminals = set(grammar.get('terminals', []) or [])
+
+        lengths = symbol_lengths(self.non_terminals | self.terminals)
+        self.rules = []
+        self.by_lhs = {}
+        for lhs, productions in raw_rules.items():
+            for production in productions:
+                rhs = tokenize(production, self.non_terminals | self.terminals, lengths)
+                self.by_lhs.setdefault(lhs, []).append(len(self.rules))
+                self.rules.append((lhs, rhs))
+                self.terminals.update(symbol for symbol in rhs if symbol not in self.non_terminals)
+
+        self.nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in self.rules:
+                if lhs not in self.nullable and all(symbol in self.nullable for symbol in rhs):
+                    self.nullable.add(lhs)
+                    changed = True
+
+    def tokenize_input(self, string):
+        """Split an input string into terminals"""
+        return tokenize(string, self.terminals)
+
+    def render(self, symbols):
+        """Sentential form as a string"""
+        return ''.join(symbols) or EPSILON
+
+
+class EarleyParser:
+    """
+    Earley recognizer whose chart doubles as a shared packed parse forest
+
+    Items are (rule, dot, origin). Prediction of a nullable non-terminal
+    also advances the predicting item (Aycock and Horspool), so ε-rules
+    need no special completion pass. The chart is O(n²) items per rule and
+    is built in O(n³) time; the forest is read off it on demand.
+    """
+
+    def __init__(self, grammar):
+        self.grammar = grammar
+
+    def parse(self, tokens):
+        grammar = self.grammar
+        rules = grammar.rules
+        non_terminals = grammar.non_terminals
+        tokens = tuple(tokens)
+        n = len(tokens)
+
+        sets = [dict() for _ in range(n + 1)]
+        waiting = [dict() for _ in range(n + 1)]
+        completed = [set() for _ in range(n + 1)]
+
+        for rule in grammar.by_lhs.get(grammar.start, ()):
+            sets[0][(rule, 0, 0)] = None
+
+        for j in range(n + 1):
+            current = sets[j]
+            agenda = list(current)
+            predicted = set()
+
+            def add(item):
+                if item not in current:
+                    current[item] = None
+                    agenda.append(item)
+
+            while agenda:
+                item = agenda.pop()
+                rule, dot, origin = item
+                rhs = rules[rule][1]
+
+                if dot == len(rhs):
+                    lhs = rules[rule][0]
+                    if (lhs, origin) in completed[j]:
+                        continue
+                    completed[j].add((lhs, origin))
+                    for waiter_rule, waiter_dot, waiter_origin in list(waiting[origin].get(lhs, ())):
+                        add((waiter_rule, waiter_dot + 1, waiter_origin))
+                    continue
+
+                symbol = rhs[dot]
+                if symbol in non_terminals:
+                    waiting[j].setdefault(symbol, []).append(item)
+                    if symbol not in predicted:
+                        predicted.add(symbol)
+                        for predicted_rule in grammar.by_lhs.get(symbol, ()):
+                            add((predicted_rule, 0, j))
+                    if symbol in grammar.nullable:
+                        add((rule, dot + 1, origin))
+                elif j < n and tokens[j] == symbol:
+                    sets[j + 1][(rule, dot + 1, origin)] = None
+
+        return ParseForest(grammar, tokens, sets, completed)
+
+
+class ParseForest:
+    """
+    The shared packed parse forest of one parse
+
+    Nodes are ('symbol', X, i, j) for X deriving tokens[i:j], ('item', rule,
+    dot, i, j) for the first 'dot' symbols of a rule deriving tokens[i:j],
+    and ('token', i) for a terminal. Each node's packed children are the
+    alternative ways of building it; a node with more than one packed child
+    is a point of ambiguity. Packed children are computed lazily and
+    memoized, so only the part of the chart reachable from the root is
+    ever expanded.
+    """
+
+    def __init__(self, grammar, tokens, sets, completed):
+        self.grammar = grammar
+        self.tokens = tokens
+        self.sets = sets
+        self.completed = completed
+        self._packed = {}
+        self._count = None
+
+        n = len(tokens)
+        self.root = ('symbol', grammar.start, 0, n) if (grammar.start, 0) in completed[n] else None
+
+    @property
+    def accepted(self):
+        return self.root is not None
+
+    def packed(self, node):
+        """Alternative child tuples of a node"""
+        found = self._packed.get(node)
+        if found is not None:
+            return found
+
+        rules = self.grammar.rules
+        found = []
+        if node[0] == 'symbol':
+            _, symbol, start, end = node
+            for rule in self.grammar.by_lhs.get(symbol, ()):
+                length = len(rules[rule][1])
+                if (rule, length, start) in self.sets[end]:
+                    found.append((('item', rule, length, start, end),) if length else ())
+        elif node[0] == 'item':
+            _, rule, dot, start, end = node
+            symbol = rules[rule][1][dot - 1]
+            splits = [start] if dot == 1 else range(start, end + 1)
+            for split in splits:
+                if dot > 1 and (rule, dot - 1, start) not in self.sets[split]:
+                    continue
+                if symbol in self.grammar.non_terminals:
+                    if (symbol, split) not in self.completed[end]:
+                        continue
+                    right = ('symbol', symbol, split, end)
+                elif split + 1 == end and self.tokens[split] == symbol:
+                    right = ('token', split)
+                else:
+                    continue
+                found.append((('item', rule, dot - 1, start, split), right) if dot > 1 else (right,))
+
+        self._packed[node] = found
+        return found
+
+    def nodes(self):
+        """Every node reachable from the root"""
+        if self.root is None:
+            return []
+        seen = {self.root}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for children in self.packed(node):
+                for child in children:
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+        return list(seen)
+
+    def count_trees(self):
+        """Number of parse trees; INFINITE if the forest has a cycle"""
+        if self.root is None:
+            return 0
+        if self._count is not None:
+            return self._count
+
+        # Iterative DFS so long inputs do not hit the recursion limit; each
+        # frame is [node, alternatives, alternative, child, total, product]
+        counts = {}
+        on_path = {self.root}
+        frames = [[self.root, self.packed(self.root), 0, 0, 0, 1]]
+        while frames:
+            frame = frames[-1]
+            node, alternatives, alternative, child_index = frame[:4]
+            if alternative == len(alternatives):
+                frames.pop()
+                on_path.discard(node)
+                counts[node] = frame[4]
+                if frames:
+                    frames[-1][5] *= frame[4]
+                    frames[-1][3] += 1
+                continue
+
+            children = alternatives[alternative]
+            if child_index == len(children):
+                frame[4] += frame[5]
+                frame[2] += 1
+                frame[3] = 0
+                frame[5] = 1
+                continue
+
+            child = children[child_index]
+            if child[0] == 'token' or child in counts or child in on_path:
+                if child[0] != 'token':
+                    frame[5] *= counts.get(child, INFINITE)
+                frame[3] += 1
+                continue
+            on_path.add(child)
+            frames.append([child, self.packed(child), 0, 0, 0, 1])
+
+        self._count = counts[self.root]
+        return self._count
+
+    def is_ambiguous(self):
+        return any(len(self.packed(node)) > 1 for node in self.nodes()) or self.count_trees() == INFINITE
+
+    def _ranks(self):
+        """
+        Height of the smallest finite tree under each node
+
+        Knuth's generalization of Dijkstra: nodes are settled in order of
+        height, and an alternative becomes available once all its children
+        are settled.
+        """
+        pending = {}
+        parents = {}
+        heap = []
+        order = 0
+        for node in self.nodes():
+            if node[0] == 'token':
+                heap.append((0, order, node))
+                order += 1
+                continue
+            for index, children in enumerate(self.packed(node)):
+                pending[(node, index)] = len(children)
+                for child in children:
+                    parents.setdefault(child, []).append((node, index))
+                if not children:
+                    heap.append((1, order, node))
+                    order += 1
+        heapq.heapify(heap)
+
+        rank = {}
+        while heap:
+            height, _, node = heapq.heappop(heap)
+            if node in rank:
+                continue
+            rank[node] = height
+            for parent, index in parents.get(node, ()):
+                pending[(parent, index)] -= 1
+                if pending[(parent, index)] == 0 and parent not in rank:
+                    heapq.heappush(heap, (height + 1, order, parent))
+                    order += 1
+        return rank
+
+    def trees(self, limit=1):
+        """
+        Up to 'limit' distinct parse trees as nested (symbol, children)
+        tuples with terminals as plain strings
+
+        The first tree takes the best alternative everywhere: the first one,
+        or in a cyclic forest the one with the smallest finite tree. Further
+        trees are found breadth-first by switching one node of an earlier
+        tree to another alternative.
+        """
+        if self.root is None:
+            return []
+        rank = self._ranks() if self.count_trees() == INFINITE else None
+        best = {}
+
+        def choose(node):
+            if node not in best:
+                alternatives = self.packed(node)
+                if rank is None:
+                    best[node] = alternatives[0]
+                else:
+                    best[node] = min(
+                        alternatives, key=lambda children: max((rank.get(c, INFINITE) for c in children), default=0)
+                    )
+            return best[node]
+
+        queue = deque([{}])
+        seen = set()
+        result = []
+        while queue and len(result) < limit:
+            overrides = queue.popleft()
+            tree, choices = self._build(lambda node: overrides[node] if node in overrides else choose(node))
+            if tree is None:
+                continue
+            signature = frozenset(choices)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            result.append(tree)
+            for node, chosen in choices:
+                for alternative in self.packed(node):
+                    if alternative != chosen:
+                        queue.append({**overrides, node: alternative})
+        return result
+
+    def _build(self, choose):
+        """
+        Build one tree, taking choose(node) as each node's children
+
+        Returns:
+            tuple: (tree, (node, children) choices in pre-order), or
+            (None, None) if the choices lead around a cycle
+        """
+        root_children = choose(self.root)
+        choices = [(self.root, root_children)]
+        on_path = {self.root}
+        frames = [[self.root, root_children, 0, []]]
+        while True:
+            frame = frames[-1]
+            node, children, index, parts = frame
+            if index < len(children):
+                frame[2] += 1
+                child = children[index]
+                if child[0] == 'token':
+                    parts.append(self.tokens[child[1]])
+                    continue
+                if child in on_path:
+                    return None, None
+                on_path.add(child)
+                child_children = choose(child)
+                choices.append((child, child_children))
+                frames.append([child, child_children, 0, []])
+                continue
+
+            frames.pop()
+            on_path.discard(node)
+            if node[0] == 'symbol':
+                value = (node[1], tuple(parts))
+                if not frames:
+                    return value, choices
+                frames[-1][3].append(value)
+            else:
+                frames[-1][3].extend(parts)
+
+
+def tree_to_dict(tree):
+    """Parse tree in the renderer's {label, is_terminal, children} form"""
+    def leaf(label):
+        return {'label': label, 'is_terminal': True, 'children': []}
+
+    if isinstance(tree, str):
+        return leaf(tree)
+    root = {'label': tree[0], 'is_terminal': False, 'children': []}
+    stack = [(tree, root)]
+    while stack:
+        (_, children), converted = stack.pop()
+        if not children:
+            converted['children'].append(leaf(EPSILON))
+        for child in children:
+            if isinstance(child, str):
+                converted['children'].append(leaf(child))
+            else:
+                node = {'label': child[0], 'is_terminal': False, 'children': []}
+                converted['children'].append(node)
+                stack.append((child, node))
+    return root
+
+
+def tree_derivation(tree, grammar, rightmost=False):
+    """
+    Derivation of a parse tree
+
+    Returns:
+        list: (non-terminal, production, sentential form) steps, starting
+        with (start, '', start)
+    """
+    form = [tree]
+    steps = [(tree[0], '', grammar.render([tree[0]]))]
+    while True:
+        positions = [i for i, part in enumerate(form) if not isinstance(part, str)]
+        if not positions:
+            return steps
+        position = positions[-1] if rightmost else positions[0]
+        symbol, children = form[position]
+        form[position:position + 1] = list(children)
+        production = grammar.render([child if isinstance(child, str) else child[0] for child in children])
+        sentential = grammar.render([part if isinstance(part, str) else part[0] for part in form])
+        steps.append((symbol, production, sentential))
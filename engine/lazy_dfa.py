@@ -0,0 +1,151 @@
+"""
+Lazy DFA - On-the-fly determinization for NFA membership
+"""
+from collections import OrderedDict
+import sys
+from engine.utils import EpsilonClosureIndex
+
+
+class LazyDFA:
+    """
+    Determinize an NFA only along the path a given input takes
+
+    DFA states are ε-closed subsets of NFA states stored as bitmasks. Each
+    one is built the first time the input reaches it and kept in an LRU
+    cache bounded by an approximate byte budget, together with the
+    transitions computed from it so far. If the cache keeps missing after it
+    has filled up, the run falls back to plain set-of-states simulation for
+    the rest of the input, so the cost per symbol stays bounded either way.
+    """
+
+    DEFAULT_CACHE_BYTES = 8 * 1024 * 1024
+
+    # Fallback kicks in when more than this share of steps in a window miss
+    THRASH_WINDOW = 1024
+    THRASH_RATIO = 0.5
+
+    def __init__(self, nfa, cache_bytes=None):
+        self.nfa = nfa
+        self.cache_bytes = cache_bytes or self.DEFAULT_CACHE_BYTES
+        self.closures = EpsilonClosureIndex(
+            nfa.get('transitions', {}),
+            list(nfa.get('states', [])) + [nfa['start_state']]
+        )
+        self.symbols = [s for s in nfa.get('alphabet', []) if s != 'ε']
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.rows = [self.closures.closed_move_row(symbol) for symbol in self.symbols]
+        self.accept_mask = self.closures.mask_of(
+            s for s in nfa.get('accept_states', []) if s in self.closures.index
+        )
+        self.start_mask = self.closures.closure_mask(nfa['start_state'])
+
+        self.cache = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _state_size(self, mask):
+        """Approximate memory held by one cached DFA state"""
+        return sys.getsizeof(mask) + 64 + 72 * len(self.symbols)
+
+    def _cached(self, mask):
+        """Fetch a DFA state's transition row, inserting and evicting as needed"""
+        row = self.cache.get(mask)
+        if row is not None:
+            self.cache.move_to_end(mask)
+            return row
+
+        row = [None] * len(self.symbols)
+        self.cache[mask] = row
+        self.bytes_used += self._state_size(mask)
+        while self.bytes_used > self.cache_bytes and len(self.cache) > 1:
+            evicted, _ = self.cache.popitem(last=False)
+            self.bytes_used -= self._state_size(evicted)
+            self.evictions += 1
+        return row
+
+    def _step(self, mask, symbol):
+        """Set-of-states step: union of the closed moves of every member"""
+        row = self.rows[symbol]
+        result = 0
+        while mask:
+            low = mask & -mask
+            result |= row[low.bit_length() - 1]
+            mask ^= low
+        return result
+
+    def run(self, string):
+        """
+        Run the NFA over a string
+
+        Returns:
+            tuple: (final subset mask, mode). The mode is 'lazy_dfa' or
+            'set_simulation' if the run gave up on the cache part way.
+        """
+        symbol_index = self.symbol_index
+        current = self.start_mask
+        row = self._cached(current)
+        window_misses = 0
+        window_steps = 0
+
+        for position, char in enumerate(string):
+            symbol = symbol_index.get(char)
+            if symbol is None:
+                return 0, 'lazy_dfa'
+
+            next_mask = row[symbol]
+            if next_mask is None:
+                self.misses += 1
+                window_misses += 1
+                next_mask = self._step(current, symbol)
+                row[symbol] = next_mask
+            else:
+                self.hits += 1
+
+            if not next_mask:
+                return 0, 'lazy_dfa'
+
+            current = next_mask
+            row = self._cached(current)
+
+            window_steps += 1
+            if window_steps == self.THRASH_WINDOW:
+                if self.evictions and window_misses > self.THRASH_RATIO * window_steps:
+                    return self._simulate(current, string, position + 1), 'set_simulation'
+                window_misses = 0
+                window_steps = 0
+
+        return current, 'lazy_dfa'
+
+    def _simulate(self, mask, string, start):
+        """Finish a run with plain set-of-states simulation"""
+        self.cache.clear()
+        self.bytes_used = 0
+        symbol_index = self.symbol_index
+
+        for char in string[start:]:
+            symbol = symbol_index.get(char)
+            if symbol is None:
+                return 0
+            mask = self._step(mask, symbol)
+            if not mask:
+                return 0
+
+        return mask
+
+    def accepts(self, string):
+        """Check whether the NFA accepts a string"""
+        mask, _ = self.run(string)
+        return bool(mask & self.accept_mask)
+
+    def stats(self):
+        """Cache statistics for the runs done so far"""
+        return {
+            'cached_states': len(self.cache),
+            'cache_bytes': self.bytes_used,
+            'cache_limit_bytes': self.cache_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
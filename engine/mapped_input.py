@@ -0,0 +1,91 @@
+"""
+Mapped Input - Run compiled automata over memory-mapped input files
+"""
+from contextlib import contextmanager
+import mmap
+import os
+
+BLOCK_SIZE = 1 << 20
+
+
+@contextmanager
+def open_mapped(path):
+    """Memory-map a file read-only (empty files yield an empty bytes object)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def resolve_input_path(base_dir, path):
+    """Resolve a client-supplied path, refusing anything outside base_dir"""
+    base = os.path.realpath(base_dir)
+    resolved = os.path.realpath(os.path.join(base, path))
+    if resolved != base and not resolved.startswith(base + os.sep):
+        raise ValueError('Input path is outside the allowed directory')
+    return resolved
+
+
+def run_dfa_file(compiled, path):
+    """
+    Run a CompiledDFA over the bytes of a file
+
+    Returns:
+        dict: final state id, bytes consumed and total bytes
+    """
+    with open_mapped(path) as data:
+        state, consumed = compiled.run_buffer(data, block_size=BLOCK_SIZE)
+        return {'state': state, 'consumed': consumed, 'size': len(data)}
+
+
+def run_transducer_file(compiled, path, output_path=None):
+    """
+    Run a CompiledTransducer over the bytes of a file
+
+    Output symbols are counted, and streamed to output_path if given, so
+    memory stays bounded by the block size.
+
+    Returns:
+        dict: final state id, bytes consumed, total bytes and output counts
+    """
+    lookup = compiled.byte_table()
+    counts = [0] * len(compiled.output_symbols)
+    names = compiled.output_symbols
+    state = compiled.start
+    consumed = 0
+
+    out_file = open(output_path, 'w', encoding='utf-8') if output_path else None
+    try:
+        initial = compiled.initial_output()
+        if initial >= 0:
+            counts[initial] += 1
+            if out_file:
+                out_file.write(names[initial])
+
+        with open_mapped(path) as data:
+            size = len(data)
+            runner = compiled.strided(size) or compiled
+            for offset in range(0, size, BLOCK_SIZE):
+                block = data[offset:offset + BLOCK_SIZE].translate(lookup)
+                out = [] if out_file else None
+                state, count = runner.run(block, state, counts, out)
+                consumed += count
+                if out_file:
+                    out_file.write(''.join(names[i] for i in out))
+                if count < len(block):
+                    break
+    finally:
+        if out_file:
+            out_file.close()
+
+    return {
+        'state': state,
+        'consumed': consumed,
+        'size': size,
+        'output_counts': {names[i]: c for i, c in enumerate(counts) if c}
+    }
@@ -1,6 +1,8 @@
 """
 Moore and Mealy Machine Engine - Handles finite state machines with output
 """
+from engine.compiled_transducer import CompiledTransducer
+from engine.mapped_input import run_transducer_file
 
 class MooreMealyEngine:
     """Engine for Moore and Mealy Machine problems"""
@@ -241,6 +243,38 @@ class MooreMealyEngine:
             'diagram_filename': 'mealy_to_moore.png'
         }
     
+    def run_file(self, machine, machine_type, path, output_path=None):
+        """
+        Run a Moore or Mealy machine over a memory-mapped input file
+        
+        Each byte is one input symbol. Output symbols are counted and, when
+        output_path is given, streamed to that file.
+        """
+        try:
+            compiled = CompiledTransducer(machine, machine_type)
+            if compiled.start < 0:
+                return {'error': 'Machine has no start state'}
+            run = run_transducer_file(compiled, path, output_path)
+        except (ValueError, KeyError, OSError) as e:
+            return {'error': str(e)}
+        
+        complete = run['consumed'] == run['size']
+        
+        result = {
+            'machine_type': machine_type,
+            'final_state': compiled.states[run['state']],
+            'symbols_read': run['consumed'],
+            'file_size': run['size'],
+            'output_counts': run['output_counts'],
+            'completed': complete,
+            'explanation': f'{machine_type.capitalize()} machine processed {run["consumed"]} of {run["size"]} input bytes.'
+        }
+        if output_path:
+            result['output_path'] = output_path
+        if not complete:
+            result['reason'] = f'No transition from state {compiled.states[run["state"]]} at byte offset {run["consumed"]}'
+        return result
+    
     def _generate_moore_table(self, moore):
         """Generate transition table for Moore machine"""
         headers = ['State', 'Output'] + [f'δ({sym})' for sym in moore['input_alphabet']]
@@ -0,0 +1,130 @@
+"""
+Parallel DFA - Multi-process DFA runs over one long input
+
+The input is split into chunks. For each chunk a worker computes the
+chunk's transfer function (the state reached from every possible entry
+state), and the transfer functions are then composed in order.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+from engine.mapped_input import open_mapped
+
+DEFAULT_CHUNK_SIZE = 8 << 20
+
+# Lanes are merged after every block of this many symbols
+MERGE_INTERVAL = 256
+
+_worker_table = None
+_worker_width = None
+_worker_lookup = None
+
+
+def _init_worker(table, width, lookup):
+    global _worker_table, _worker_width, _worker_lookup
+    _worker_table = table
+    _worker_width = width
+    _worker_lookup = lookup
+
+
+def _run_lane(table, width, state, symbols):
+    """Run one lane over a block of symbol ids; -1 once it hits a dead end"""
+    if state < 0:
+        return state
+    for symbol in symbols:
+        state = table[state * width + symbol]
+        if state < 0:
+            return state
+    return state
+
+
+def chunk_transfer(table, width, symbols, entry_states):
+    """
+    Compute where each entry state ends up after a chunk of symbol ids
+
+    Entry states are simulated as lanes. After every block, lanes that have
+    reached the same state are merged, so for most DFAs the lanes collapse
+    quickly and the rest of the chunk costs the same as a single run.
+
+    Returns:
+        list: final state (or -1 for a dead end) per entry state, in order
+    """
+    lanes = list(entry_states)
+    owner = list(range(len(lanes)))
+
+    for offset in range(0, len(symbols), MERGE_INTERVAL):
+        block = symbols[offset:offset + MERGE_INTERVAL]
+        lanes = [_run_lane(table, width, state, block) for state in lanes]
+
+        merged = {}
+        remap = [merged.setdefault(state, len(merged)) for state in lanes]
+        if len(merged) < len(lanes):
+            owner = [remap[lane] for lane in owner]
+            lanes = list(merged)
+
+        if len(lanes) == 1:
+            rest = symbols[offset + MERGE_INTERVAL:]
+            lanes = [_run_lane(table, width, lanes[0], rest)]
+            break
+
+    return [lanes[lane] for lane in owner]
+
+
+def _transfer_task(task):
+    """Worker entry point: a pre-encoded chunk or a (path, offset, length) slice"""
+    kind, payload, entry_states = task
+    if kind == 'file':
+        path, offset, length = payload
+        with open_mapped(path) as data:
+            symbols = data[offset:offset + length].translate(_worker_lookup)
+    else:
+        symbols = payload
+    return chunk_transfer(_worker_table, _worker_width, symbols, entry_states)
+
+
+def parallel_run(compiled, tasks, workers=None):
+    """
+    Compute every chunk's transfer function in a process pool and compose them
+
+    The first chunk only needs to be simulated from the start state; the
+    others are simulated from every state, and the start state is then
+    threaded through their transfer functions in order.
+
+    Returns:
+        int: final state id, or -1 if the run hit a missing transition
+    """
+    if not tasks:
+        return compiled.start
+
+    # Never more processes than CPUs, whatever the caller asks for
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, cpus))
+    all_states = list(range(compiled.num_states))
+    has_files = any(kind == 'file' for kind, _ in tasks)
+    lookup = compiled.byte_table() if has_files else None
+
+    jobs = [(kind, payload, [compiled.start] if i == 0 else all_states)
+            for i, (kind, payload) in enumerate(tasks)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(compiled.table, compiled.width, lookup)) as pool:
+        transfers = list(pool.map(_transfer_task, jobs))
+
+    state = transfers[0][0]
+    for finals in transfers[1:]:
+        if state < 0:
+            break
+        state = finals[state]
+    return state
+
+
+def string_tasks(compiled, string, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split an input string into pre-encoded chunk tasks"""
+    symbols = compiled.encode(string)
+    return [('symbols', symbols[i:i + chunk_size]) for i in range(0, len(symbols), chunk_size)]
+
+
+def file_tasks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a file into (path, offset, length) chunk tasks for the workers to map"""
+    size = os.path.getsize(path)
+    return [('file', (path, offset, min(chunk_size, size - offset)))
+            for offset in range(0, size, chunk_size)]
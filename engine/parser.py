@@ -17,10 +17,10 @@ def parse_input(classification, grammar="", automaton=None):
     """
     task_type = classification['task_type']
     
-    if task_type in ['cfg_construction', 'cfg_ambiguity', 'cfg_derivation', 'cfg_parse_tree', 'cfg_to_cnf', 'cfg_to_pda', 'pda_from_cfg']:
+    if task_type in ['cfg_construction', 'cfg_ambiguity', 'cfg_derivation', 'cfg_parse_tree', 'cfg_to_cnf', 'cfg_to_pda', 'cfg_membership', 'pda_from_cfg']:
         return parse_grammar(grammar, classification)
     
-    elif task_type in ['dfa_construction', 'nfa_to_dfa', 'dfa_minimization']:
+    elif task_type in ['dfa_construction', 'nfa_to_dfa', 'dfa_minimization', 'dfa_equivalence', 'dfa_inclusion']:
         return parse_automaton(automaton, classification)
     
     elif task_type in ['re_to_nfa']:
@@ -0,0 +1,153 @@
+"""
+Pattern DFA - Direct DFA construction for substring and suffix languages
+
+Builds "contains", "ends with" and "does not contain" DFAs straight from the
+patterns: from the KMP failure function for a single pattern, or from an
+Aho-Corasick automaton for a set of patterns. Both take time proportional
+to total pattern length times alphabet size, with no subset construction.
+"""
+from collections import deque
+
+MODES = ('contains', 'ends_with', 'not_contains')
+
+
+def _alphabet_for(patterns, alphabet):
+    symbols = list(alphabet or [])
+    seen = set(symbols)
+    for char in sorted(set(''.join(patterns))):
+        if char not in seen:
+            seen.add(char)
+            symbols.append(char)
+    return symbols
+
+
+def kmp_rows(pattern, index, absorbing):
+    """
+    KMP automaton for one pattern as a list of transition rows
+
+    State j means the longest suffix of the input that is a prefix of the
+    pattern has length j. Each row copies the row of its restart state and
+    overrides the column of the next pattern symbol.
+
+    Returns:
+        tuple: (rows, ids of the states where the pattern was just seen)
+    """
+    m = len(pattern)
+    rows = [[0] * len(index)]
+    restart = 0
+    for j, char in enumerate(pattern):
+        column = index[char]
+        if j:
+            rows.append(rows[restart][:])
+            restart = rows[restart][column]
+        rows[j][column] = j + 1
+
+    rows.append([m] * len(index) if absorbing else rows[restart][:])
+    return rows, {m}
+
+
+def aho_corasick_rows(patterns, index, absorbing):
+    """
+    Aho-Corasick automaton for a pattern set as a list of transition rows
+
+    The trie is completed breadth first: a missing edge follows the failure
+    link, whose row is already complete. With absorbing=True every state
+    that ends a pattern is merged into one looping accept state.
+
+    Returns:
+        tuple: (rows, ids of the states where some pattern was just seen)
+    """
+    children = [{}]
+    terminal = [False]
+    for pattern in patterns:
+        state = 0
+        for char in pattern:
+            column = index[char]
+            if column not in children[state]:
+                children[state][column] = len(children)
+                children.append({})
+                terminal.append(False)
+            state = children[state][column]
+        terminal[state] = True
+
+    width = len(index)
+    full = [None] * len(children)
+    fail = [0] * len(children)
+    full[0] = [children[0].get(column, 0) for column in range(width)]
+    order = []
+    queue = deque(children[0].values())
+    while queue:
+        state = queue.popleft()
+        order.append(state)
+        terminal[state] = terminal[state] or terminal[fail[state]]
+        row = full[fail[state]][:]
+        for column, child in children[state].items():
+            fail[child] = full[fail[state]][column]
+            row[column] = child
+            queue.append(child)
+        full[state] = row
+
+    if not absorbing:
+        return full, {state for state in range(len(full)) if terminal[state]}
+
+    # Renumber the non-matching states and send every match into one sink
+    numbering = {0: 0}
+    for state in order:
+        if not terminal[state]:
+            numbering[state] = len(numbering)
+    sink = len(numbering)
+    rows = [None] * (sink + 1)
+    for state, number in numbering.items():
+        rows[number] = [numbering.get(target, sink) for target in full[state]]
+    rows[sink] = [sink] * width
+    return rows, {sink}
+
+
+def pattern_dfa(patterns, mode='contains', alphabet=None):
+    """
+    Build a complete DFA for a substring or suffix language
+
+    Args:
+        patterns: Non-empty list of non-empty pattern strings
+        mode: 'contains' (any pattern occurs), 'ends_with' (the input ends
+            with some pattern) or 'not_contains' (no pattern occurs; the
+            complement of 'contains', obtained by flipping accept states)
+        alphabet: Input symbols; pattern characters are always included
+
+    Returns:
+        tuple: (automaton dict, construction name 'kmp' or 'aho_corasick')
+    """
+    if mode not in MODES:
+        raise ValueError(f'Unsupported pattern mode: {mode}')
+    if not patterns or any(not pattern for pattern in patterns):
+        raise ValueError('Patterns must be non-empty strings')
+
+    symbols = _alphabet_for(patterns, alphabet)
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    absorbing = mode != 'ends_with'
+
+    unique = sorted(set(patterns))
+    if len(unique) == 1:
+        rows, matched = kmp_rows(unique[0], index, absorbing)
+        construction = 'kmp'
+    else:
+        rows, matched = aho_corasick_rows(unique, index, absorbing)
+        construction = 'aho_corasick'
+
+    if mode == 'not_contains':
+        accepting = [state for state in range(len(rows)) if state not in matched]
+    else:
+        accepting = sorted(matched)
+
+    names = [f'q{i}' for i in range(len(rows))]
+    automaton = {
+        'states': names,
+        'alphabet': symbols,
+        'transitions': {
+            names[state]: {symbol: names[row[i]] for i, symbol in enumerate(symbols)}
+            for state, row in enumerate(rows)
+        },
+        'start_state': 'q0',
+        'accept_states': [names[state] for state in accepting]
+    }
+    return automaton, construction
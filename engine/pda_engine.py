@@ -1,12 +1,20 @@
 """
 PDA Engine - Handles Pushdown Automata problems
 """
+import heapq
+from engine.compiled_pda import CompiledPDA, split_stack_string
+from engine.pda_gss import GSSMembership
+from engine.pda_explorer import PDAExplorer, SearchBudget
+from engine.pda_saturation import PushdownSystem, PAutomaton, post_star, pre_star
+from engine.pda_to_cfg import TripleGrammarBuilder
 
 class PDAEngine:
     """Engine for PDA-related problems"""
     
     def __init__(self):
         self.max_moves = 100
+        self.max_gss_items = 1000000
+        self.max_table_rows = 200
     
     def solve(self, task_type, parsed_input):
         """Main solver dispatcher"""
@@ -23,6 +31,12 @@ class PDAEngine:
         elif task_type == 'pda_transitions':
             return self.show_transitions(parsed_input)
         
+        elif task_type == 'pda_reachability':
+            return self.analyze_reachability(parsed_input)
+        
+        elif task_type == 'pda_to_cfg':
+            return self.pda_to_cfg(parsed_input)
+        
         else:
             return {'error': f'Unsupported PDA task: {task_type}'}
     
@@ -284,113 +298,348 @@ class PDAEngine:
             'diagram_filename': 'cfg_to_pda.png'
         }
     
-    def test_membership(self, parsed_input):
-        """Test if a string is accepted by the PDA"""
+    def pda_to_cfg(self, parsed_input):
+        """
+        Convert a PDA to an equivalent CFG with the triple construction
+        
+        Only productive variables reachable from the start symbol are built;
+        the result also reports the sizes the naive construction would have.
+        """
         pda = parsed_input.get('automaton', {})
-        test_string = parsed_input.get('test_string', '')
         
         if not pda:
             return {'error': 'No PDA provided'}
+        if pda.get('acceptance_type') not in ('final_state', 'empty_stack'):
+            return {'error': 'PDA acceptance_type must be final_state or empty_stack'}
+        
+        compiled = CompiledPDA(pda)
+        if compiled.start < 0:
+            return {'error': 'PDA has no start state'}
         
-        # Simulate PDA (non-deterministic simulation)
-        initial_config = {
-            'state': pda['start_state'],
-            'input_position': 0,
-            'stack': [pda.get('start_stack_symbol', 'Z0')]
+        built = TripleGrammarBuilder(compiled).build()
+        grammar = built['grammar']
+        
+        rows = [['Variable', 'Productions']]
+        for lhs in grammar['non_terminals'][:self.max_table_rows]:
+            rows.append([lhs, ' | '.join(grammar['rules'][lhs])])
+        
+        return {
+            'pda': pda,
+            'grammar': grammar,
+            'variables': built['variables'],
+            'rule_count': built['rule_count'],
+            'naive_variables': built['naive_variables'],
+            'naive_rule_count': built['naive_rule_count'],
+            'grammar_table': rows,
+            'explanation': f'CFG built from the PDA with the triple construction: [p,A,q] generates the input read while going from state p to state q and popping A. Only productive variables reachable from S were generated: {built["variables"]} variables and {built["rule_count"]} rules, where the full construction creates {built["naive_variables"]} variables and {built["naive_rule_count"]} rules before pruning.',
+            'steps': [
+                'Step 1: Find the productive triples [p,A,q] with a worklist over partially popped moves',
+                'Step 2: Find the variables that can stop in an accepting configuration without popping their symbol',
+                'Step 3: Generate rules from S, expanding each reachable variable once',
+                'Step 4: Keep only intermediate states that lead to productive variables'
+            ]
         }
+    
+    def test_membership(self, parsed_input):
+        """
+        Test if a string is accepted by the PDA
+        
+        Deterministic PDAs run on a single configuration. Otherwise the 'gss'
+        engine merges configurations into a graph-structured stack and answers
+        exactly in polynomial time. 'membership_engine' can instead select an
+        explicit configuration search: 'bfs', 'iddfs' or 'best_first'.
+        
+        Budgets are set per request with 'max_configurations' (defaults:
+        max_gss_items for gss, max_moves for the searches), 'max_memory_bytes'
+        and 'max_time_ms'. Every result says which engine was used and whether
+        it is exact or was cut off by a budget.
+        """
+        pda = parsed_input.get('automaton', {})
+        test_string = parsed_input.get('test_string', '')
         
-        # BFS to explore all possible configurations
-        queue = [initial_config]
-        visited = set()
-        move_sequence = []
+        if not pda:
+            return {'error': 'No PDA provided'}
         
-        move_count = 0
+        compiled = CompiledPDA(pda)
+        if compiled.start < 0:
+            return {'error': 'PDA has no start state'}
+        
+        engine = parsed_input.get('membership_engine')
+        if engine in PDAExplorer.STRATEGIES:
+            budget = SearchBudget.from_request(parsed_input, self.max_moves)
+            return self._explore_membership(compiled, test_string, engine, budget)
+        if engine not in (None, 'gss'):
+            return {'error': f'Unknown membership engine: {engine}'}
+        if engine is None and compiled.deterministic:
+            result = self._deterministic_membership(compiled, test_string)
+            if result is not None:
+                return result
+        budget = SearchBudget.from_request(parsed_input, self.max_gss_items)
+        return self._gss_membership(compiled, test_string, budget)
+    
+    def _deterministic_membership(self, compiled, test_string):
+        """
+        Run a deterministic PDA on its single configuration
+        
+        Returns None if a run of consecutive ε-moves grows past a cap
+        proportional to the stack height it started from, which suggests an
+        ε-loop, so the caller can fall back to the exact GSS engine.
+        """
+        pda = compiled.pda
+        acceptance_type = pda.get('acceptance_type')
+        epsilon_cap = 4 * max(len(compiled.states), 1) * max(len(compiled.stack_symbols), 1)
+        
+        state = compiled.start
+        stack = [compiled.start_stack_symbol]
+        position = 0
+        steps = 0
+        epsilon_run = 0
         accepted = False
         
-        while queue and move_count < self.max_moves:
-            config = queue.pop(0)
-            move_count += 1
-            
-            # Create configuration signature
-            config_sig = (config['state'], config['input_position'], tuple(config['stack']))
-            if config_sig in visited:
-                continue
-            visited.add(config_sig)
+        while True:
+            at_end = position == len(test_string)
+            if at_end:
+                if acceptance_type == 'final_state' and state in compiled.accepting:
+                    accepted = True
+                    break
+                if acceptance_type == 'empty_stack' and (not stack or stack == ['Z0']):
+                    accepted = True
+                    break
             
-            # Check acceptance conditions
-            if config['input_position'] == len(test_string):
-                if pda.get('acceptance_type') == 'final_state':
-                    if config['state'] in pda.get('accept_states', []):
-                        accepted = True
-                        break
-                elif pda.get('acceptance_type') == 'empty_stack':
-                    if len(config['stack']) == 0 or (len(config['stack']) == 1 and config['stack'][0] == 'Z0'):
-                        accepted = True
-                        break
+            if not stack:
+                break
+            moves = compiled.moves(state, None if at_end else test_string[position], stack[-1])
+            if not moves:
+                break
             
-            # Try all applicable transitions
-            for transition in pda.get('transitions', []):
-                if self._can_apply_transition(config, transition, test_string):
-                    new_config = self._apply_transition(config, transition)
-                    queue.append(new_config)
-                    move_sequence.append({
-                        'from_config': config,
-                        'transition': transition,
-                        'to_config': new_config
-                    })
+            state, push, consumes, _ = moves[0]
+            stack.pop()
+            stack.extend(reversed(push))
+            steps += 1
+            if consumes:
+                position += 1
+                epsilon_run = 0
+            else:
+                if epsilon_run == 0:
+                    epsilon_limit = epsilon_cap * (len(stack) + 1)
+                epsilon_run += 1
+                if epsilon_run > epsilon_limit:
+                    return None
         
         return {
             'test_string': test_string,
             'accepted': accepted,
-            'move_count': move_count,
-            'explanation': f'String "{test_string}" is {"accepted" if accepted else "rejected"} by the PDA.',
-            'sample_moves': move_sequence[:10]  # Show first 10 moves
+            'exact': True,
+            'membership_engine': 'deterministic',
+            'move_count': steps,
+            'explanation': f'String "{test_string}" is {"accepted" if accepted else "rejected"} by the PDA. The PDA is deterministic, so it was run on a single configuration in linear time.'
         }
     
-    def _can_apply_transition(self, config, transition, test_string):
-        """Check if a transition can be applied to current configuration"""
-        # Check state
-        if config['state'] != transition['from']:
-            return False
+    def _gss_membership(self, compiled, test_string, budget):
+        """Test membership with the graph-structured-stack engine"""
+        run = GSSMembership(compiled, test_string, budget).run()
         
-        # Check stack top
-        if not config['stack'] or config['stack'][-1] != transition['stack_top']:
-            return False
+        result = {
+            'test_string': test_string,
+            'accepted': run['accepted'],
+            'exact': run['exact'],
+            'membership_engine': 'gss',
+            'gss_nodes': run['gss_nodes'],
+            'gss_edges': run['gss_edges'],
+            'summaries': run['summaries'],
+            'explanation': self._membership_explanation(test_string, run)
+        }
+        if run['stop_reason']:
+            result['stop_reason'] = run['stop_reason']
+        return result
+    
+    def _explore_membership(self, compiled, test_string, strategy, budget):
+        """Test membership by searching explicit configurations"""
+        run = PDAExplorer(compiled, test_string, budget).run(strategy)
         
-        # Check input
-        if transition['input'] == 'ε':
-            return True
+        result = {
+            'test_string': test_string,
+            'accepted': run['accepted'],
+            'exact': run['exact'],
+            'membership_engine': strategy,
+            'move_count': run['configurations'],
+            'distinct_stacks': run['distinct_stacks'],
+            'explanation': self._membership_explanation(test_string, run),
+            'sample_moves': [
+                {
+                    'from_config': self._config_dict(compiled, before),
+                    'transition': transition,
+                    'to_config': self._config_dict(compiled, after)
+                }
+                for before, transition, after in run['samples']
+            ]
+        }
+        if run['stop_reason']:
+            result['stop_reason'] = run['stop_reason']
+        return result
+    
+    def analyze_reachability(self, parsed_input):
+        """
+        Answer reachability and emptiness questions about a PDA symbolically
+        
+        post* saturation turns the initial configuration into a P-automaton
+        for every reachable configuration, from which the reachable states,
+        their possible stack tops, whether the stack can be emptied and
+        whether the language is empty are read off directly.
+        
+        An optional 'query' names a set of target configurations, e.g.
+        {'state': 'q1', 'stack_top': 'Z0'}, {'stack': ['Z0', 'A']} (bottom to
+        top) or {'empty_stack': True}; without 'state' any state matches.
+        'saturation': 'pre' answers the query with pre* of the target set
+        instead, checking whether it contains the initial configuration.
+        """
+        pda = parsed_input.get('automaton', {})
+        method = parsed_input.get('saturation', 'post')
+        query = parsed_input.get('query') or {}
         
-        if config['input_position'] < len(test_string):
-            if test_string[config['input_position']] == transition['input']:
-                return True
+        if not pda:
+            return {'error': 'No PDA provided'}
+        if method not in ('post', 'pre'):
+            return {'error': f'Unknown saturation method: {method}'}
+        
+        compiled = CompiledPDA(pda)
+        if compiled.start < 0:
+            return {'error': 'PDA has no start state'}
+        
+        targets = list(range(len(compiled.states)))
+        if query.get('state') is not None:
+            if query['state'] not in compiled.state_index:
+                return {'error': f'Unknown state: {query["state"]}'}
+            targets = [compiled.state_index[query['state']]]
+        
+        pds = PushdownSystem(compiled)
+        reachable = PAutomaton(pds.control_states)
+        final = reachable.new_state()
+        reachable.finals.add(final)
+        reachable.add(compiled.start, compiled.start_stack_symbol, final)
+        post_star(pds, reachable)
+        live = reachable.live_states()
+        
+        states = range(len(compiled.states))
+        reachable_states = [state for state in states if state in live]
+        empty_stack_states = [state for state in reachable_states if reachable.accepts(state, ())]
+        
+        acceptance_type = pda.get('acceptance_type')
+        if acceptance_type == 'final_state':
+            language_empty = not any(state in live for state in compiled.accepting)
+        elif acceptance_type == 'empty_stack':
+            language_empty = not any(
+                reachable.accepts(state, ()) or reachable.accepts(state, ('Z0',)) for state in reachable_states
+            )
+        else:
+            language_empty = None
+        
+        names = [self._p_automaton_state_name(compiled, pds, state) for state in range(reachable.num_states)]
+        result = {
+            'reachable_states': [compiled.states[state] for state in reachable_states],
+            'unreachable_states': [compiled.states[state] for state in states if state not in live],
+            'stack_tops': {compiled.states[state]: sorted(reachable.tops(state, live)) for state in reachable_states},
+            'can_empty_stack': bool(empty_stack_states),
+            'empty_stack_states': [compiled.states[state] for state in empty_stack_states],
+            'language_empty': language_empty,
+            'saturation': method,
+            'p_automaton_states': reachable.num_states,
+            'p_automaton_transitions': len(reachable.transitions),
+            'p_automaton_table': [['From', 'Stack Symbol', 'To']] + [
+                [names[source], 'ε' if symbol is None else symbol, names[target]]
+                for source, symbol, target in heapq.nsmallest(
+                    self.max_table_rows, reachable.transitions, key=lambda t: (t[0], t[1] or '', t[2])
+                )
+            ]
+        }
         
-        return False
+        if query:
+            stack = query.get('stack')
+            if isinstance(stack, str):
+                word = split_stack_string(stack, pds.stack_symbols)
+            elif stack is not None:
+                word = tuple(reversed(stack))
+            else:
+                word = None
+        
+            if method == 'pre':
+                target = self._target_automaton(pds, query, targets, word)
+                pre_star(pds, target)
+                found = target.accepts(compiled.start, (compiled.start_stack_symbol,))
+            else:
+                found = any(self._query_matches(reachable, live, state, query, word) for state in targets)
+            result['query'] = {**query, 'reachable': found}
+        
+        result['explanation'] = self._reachability_explanation(result)
+        return result
+    
+    def _query_matches(self, automaton, live, state, query, word):
+        """Whether a post* automaton holds a target configuration of 'state'"""
+        if word is not None:
+            return automaton.accepts(state, word)
+        if query.get('empty_stack'):
+            return automaton.accepts(state, ())
+        if query.get('stack_top') is not None:
+            return query['stack_top'] in automaton.tops(state, live)
+        return state in live
+    
+    def _target_automaton(self, pds, query, targets, word):
+        """P-automaton for the configurations a query asks about"""
+        automaton = PAutomaton(pds.control_states)
+        anything = automaton.new_state()
+        automaton.finals.add(anything)
+        for symbol in pds.stack_symbols:
+            automaton.add(anything, symbol, anything)
+        
+        for state in targets:
+            if word is not None:
+                current = state
+                for symbol in word:
+                    following = automaton.new_state()
+                    automaton.add(current, symbol, following)
+                    current = following
+                automaton.finals.add(current)
+            elif query.get('empty_stack'):
+                automaton.finals.add(state)
+            elif query.get('stack_top') is not None:
+                automaton.add(state, query['stack_top'], anything)
+            else:
+                automaton.finals.add(state)
+                for symbol in pds.stack_symbols:
+                    automaton.add(state, symbol, anything)
+        return automaton
+    
+    def _p_automaton_state_name(self, compiled, pds, state):
+        if state < len(compiled.states):
+            return compiled.states[state]
+        if state < pds.control_states:
+            return f'm{state - len(compiled.states)}'
+        return f's{state - pds.control_states}'
+    
+    def _reachability_explanation(self, result):
+        parts = [
+            f'Reachable states: {", ".join(result["reachable_states"]) or "none"}.',
+            'The stack can become empty.' if result['can_empty_stack'] else 'The stack can never become empty.'
+        ]
+        if result['language_empty'] is not None:
+            parts.append('The language is empty.' if result['language_empty'] else 'The language is non-empty.')
+        if 'query' in result:
+            parts.append(f'The queried configurations are {"" if result["query"]["reachable"] else "not "}reachable from the initial configuration.')
+        parts.append(f'Computed by {result["saturation"]}* saturation over a {result["p_automaton_states"]}-state P-automaton.')
+        return ' '.join(parts)
     
-    def _apply_transition(self, config, transition):
-        """Apply a transition to a configuration"""
-        new_config = {
-            'state': transition['to'],
-            'input_position': config['input_position'],
-            'stack': config['stack'][:]
+    def _membership_explanation(self, test_string, run):
+        if run['exact']:
+            return f'String "{test_string}" is {"accepted" if run["accepted"] else "rejected"} by the PDA.'
+        return f'No accepting configuration for "{test_string}" was found before the {run["stop_reason"]} budget ran out; the string is reported as rejected, but the result is not exact.'
+    
+    def _config_dict(self, compiled, config):
+        """Expand a configuration for display"""
+        return {
+            'state': compiled.states[config.state],
+            'input_position': config.position,
+            'stack': config.stack.to_list()
         }
-        
-        # Pop stack top
-        if new_config['stack']:
-            new_config['stack'].pop()
-        
-        # Push new symbols (in reverse order)
-        stack_push = transition.get('stack_push', '')
-        if stack_push:
-            for symbol in reversed(stack_push):
-                if symbol != 'ε':
-                    new_config['stack'].append(symbol)
-        
-        # Advance input if not epsilon transition
-        if transition['input'] != 'ε':
-            new_config['input_position'] += 1
-        
-        return new_config
     
     def _generate_move_table(self, pda):
         """Generate a move table for display"""
@@ -0,0 +1,210 @@
+"""
+PDA Explorer - Budgeted configuration search strategies for PDA membership
+"""
+from collections import deque
+import heapq
+import time
+from engine.compiled_pda import PDAConfig, StackPool
+
+# Rough per-object sizes used to estimate search memory
+CONFIG_BYTES = 200
+STACK_NODE_BYTES = 150
+
+
+class SearchBudget:
+    """
+    Per-request limits on a PDA search
+
+    The configuration count is checked on every step; memory and wall-clock
+    are checked every CHECK_INTERVAL steps. A limit of None is unbounded.
+    """
+
+    CHECK_INTERVAL = 256
+
+    def __init__(self, max_configurations=None, max_memory_bytes=None, max_time_ms=None):
+        self.max_configurations = max_configurations
+        self.max_memory_bytes = max_memory_bytes
+        self.max_time_ms = max_time_ms
+        self.started = time.monotonic()
+
+    @classmethod
+    def from_request(cls, parsed_input, max_configurations=None):
+        """Read 'max_configurations', 'max_memory_bytes' and 'max_time_ms' from a request"""
+        return cls(
+            parsed_input.get('max_configurations', max_configurations),
+            parsed_input.get('max_memory_bytes'),
+            parsed_input.get('max_time_ms')
+        )
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.started) * 1000
+
+    def check(self, steps, memory_bytes):
+        """
+        Args:
+            steps: Work done so far
+            memory_bytes: Callable returning the current memory estimate
+
+        Returns:
+            str: 'configurations', 'memory' or 'time' if that limit is
+            exhausted, otherwise None
+        """
+        if self.max_configurations is not None and steps > self.max_configurations:
+            return 'configurations'
+        if steps % self.CHECK_INTERVAL == 0:
+            if self.max_memory_bytes is not None and memory_bytes() > self.max_memory_bytes:
+                return 'memory'
+            if self.max_time_ms is not None and self.elapsed_ms() > self.max_time_ms:
+                return 'time'
+        return None
+
+
+class PDAExplorer:
+    """
+    Search a PDA's configuration graph with a pluggable strategy
+
+    Strategies:
+        bfs: breadth-first with a deque
+        iddfs: iterative-deepening depth-first, doubling the depth limit
+            each round; memory stays proportional to the configurations
+            seen in the current round
+        best_first: expands the configuration with the least input left
+            plus stack height, so moves that only grow the stack (as in
+            S → SS) wait behind ones that consume input or pop
+    """
+
+    STRATEGIES = ('bfs', 'iddfs', 'best_first')
+
+    def __init__(self, compiled, string, budget=None, sample_limit=10):
+        self.compiled = compiled
+        self.string = string
+        self.budget = budget or SearchBudget()
+        self.sample_limit = sample_limit
+        self.acceptance_type = compiled.pda.get('acceptance_type')
+
+        self.pool = StackPool()
+        self.explored = 0
+        self.stop_reason = None
+        self.samples = []
+        self._tracked = 0
+
+    def run(self, strategy='bfs'):
+        """
+        Returns:
+            dict: accepted, exact, stop_reason, configurations explored and
+            up to sample_limit sample moves as (before, transition, after)
+        """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f'Unknown search strategy: {strategy}')
+
+        compiled = self.compiled
+        initial = PDAConfig(compiled.start, 0, self.pool.push(compiled.start_stack_symbol, self.pool.empty))
+        accepted = getattr(self, f'_{strategy}')(initial)
+
+        return {
+            'accepted': accepted,
+            'exact': accepted or self.stop_reason is None,
+            'stop_reason': None if accepted else self.stop_reason,
+            'configurations': self.explored,
+            'distinct_stacks': len(self.pool),
+            'samples': self.samples
+        }
+
+    def _accepting(self, config):
+        if config.position != len(self.string):
+            return False
+        if self.acceptance_type == 'final_state':
+            return config.state in self.compiled.accepting
+        if self.acceptance_type == 'empty_stack':
+            stack = config.stack
+            return stack is self.pool.empty or (stack.below is self.pool.empty and stack.symbol == 'Z0')
+        return False
+
+    def _moves(self, config):
+        stack = config.stack
+        if stack is self.pool.empty:
+            return ()
+        position = config.position
+        symbol = self.string[position] if position < len(self.string) else None
+        return self.compiled.moves(config.state, symbol, stack.symbol)
+
+    def _successors(self, config):
+        successors = []
+        for target, push, consumes, transition in self._moves(config):
+            new_config = PDAConfig(target, config.position + consumes, self.pool.push_all(push, config.stack.below))
+            if len(self.samples) < self.sample_limit:
+                self.samples.append((config, transition, new_config))
+            successors.append(new_config)
+        return successors
+
+    def _memory_bytes(self):
+        return self._tracked * CONFIG_BYTES + len(self.pool) * STACK_NODE_BYTES
+
+    def _spend(self, tracked):
+        """Count one expansion; False once a budget is exhausted"""
+        self.explored += 1
+        self._tracked = tracked
+        self.stop_reason = self.budget.check(self.explored, self._memory_bytes)
+        return self.stop_reason is None
+
+    def _bfs(self, initial):
+        queue = deque([initial])
+        visited = set()
+        while queue:
+            config = queue.popleft()
+            key = config.key()
+            if key in visited:
+                continue
+            visited.add(key)
+            if self._accepting(config):
+                return True
+            if not self._spend(len(visited) + len(queue)):
+                return False
+            queue.extend(self._successors(config))
+        return False
+
+    def _best_first(self, initial):
+        length = len(self.string)
+        counter = 0
+        heap = [(length + initial.stack.depth, length, counter, initial)]
+        visited = set()
+        while heap:
+            _, _, _, config = heapq.heappop(heap)
+            key = config.key()
+            if key in visited:
+                continue
+            visited.add(key)
+            if self._accepting(config):
+                return True
+            if not self._spend(len(visited) + len(heap)):
+                return False
+            for new_config in self._successors(config):
+                counter += 1
+                remaining = length - new_config.position
+                heapq.heappush(heap, (remaining + new_config.stack.depth, remaining, counter, new_config))
+        return False
+
+    def _iddfs(self, initial):
+        limit = 1
+        while True:
+            cutoff = False
+            best_depth = {}
+            stack = [(initial, 0)]
+            while stack:
+                config, depth = stack.pop()
+                key = config.key()
+                if best_depth.get(key, depth + 1) <= depth:
+                    continue
+                best_depth[key] = depth
+                if self._accepting(config):
+                    return True
+                if not self._spend(len(best_depth) + len(stack)):
+                    return False
+                if depth == limit:
+                    cutoff = cutoff or bool(self._moves(config))
+                    continue
+                successors = self._successors(config)
+                stack.extend((new_config, depth + 1) for new_config in reversed(successors))
+            if not cutoff:
+                return False
+            limit *= 2
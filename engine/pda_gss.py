@@ -0,0 +1,148 @@
+"""
+PDA GSS - Polynomial-time PDA membership over a graph-structured stack
+"""
+from collections import deque
+from engine.pda_explorer import SearchBudget
+
+# Rough per-entry sizes used to estimate GSS memory
+NODE_BYTES = 400
+SUMMARY_BYTES = 120
+
+
+class GSSMembership:
+    """
+    Decide PDA membership by merging configurations into a graph-structured stack
+
+    A GSS node (state, top, position, bottom) stands for every reachable
+    configuration in that state, at that input position, with that stack
+    top; 'bottom' records whether the stack below the top is empty. Nodes
+    share everything underneath them, so the stack contents are never
+    enumerated.
+
+    For each node the engine collects its "returns": the (state, position)
+    pairs at which the top symbol has been popped off again. A move that
+    pushes Y1..Ym starts a node for Y1 and leaves an edge back to the
+    current node with the remaining symbols; each return of Y1 continues
+    with Y2, and so on, until the last symbol returns and the current node
+    returns as well. Nodes, edges and returns are memoized, so ε-moves
+    (including ε-cycles and ε-pushes) are closed over by the same worklist,
+    and the total work is polynomial in the input length.
+    """
+
+    def __init__(self, compiled, string, budget=None):
+        self.compiled = compiled
+        self.string = string
+        self.budget = budget or SearchBudget()
+        self.acceptance_type = compiled.pda.get('acceptance_type')
+
+        self.returns = {}
+        self.waiters = {}
+        self.worklist = deque()
+        self.items = 0
+        self.summaries = 0
+        self.accepted = False
+
+    def run(self):
+        """
+        Returns:
+            dict: accepted, exact (False only if a budget ran out before an
+            accepting configuration was found), the exhausted budget and GSS
+            sizes. Every worklist item counts as one configuration.
+        """
+        compiled = self.compiled
+        stop_reason = None
+
+        if compiled.start >= 0:
+            self._visit((compiled.start, compiled.start_stack_symbol, 0, True))
+
+        while self.worklist and not self.accepted:
+            self.items += 1
+            stop_reason = self.budget.check(self.items, self._memory_bytes)
+            if stop_reason is not None:
+                break
+
+            item = self.worklist.popleft()
+            if len(item) == 4:
+                self._expand(item)
+            else:
+                self._propagate(*item)
+
+        return {
+            'accepted': self.accepted,
+            'exact': self.accepted or stop_reason is None,
+            'stop_reason': None if self.accepted else stop_reason,
+            'gss_nodes': len(self.returns),
+            'gss_edges': sum(len(edges) for edges in self.waiters.values()),
+            'summaries': self.summaries,
+            'work_items': self.items
+        }
+
+    def _memory_bytes(self):
+        return len(self.returns) * NODE_BYTES + self.summaries * SUMMARY_BYTES
+
+    def _visit(self, node):
+        if node not in self.returns:
+            self.returns[node] = set()
+            self.waiters[node] = set()
+            self.worklist.append(node)
+
+    def _add_return(self, node, state, position):
+        found = self.returns[node]
+        if (state, position) not in found:
+            found.add((state, position))
+            self.summaries += 1
+            self.worklist.append((node, state, position))
+
+    def _add_waiter(self, child, parent, rest):
+        edges = self.waiters[child]
+        if (parent, rest) in edges:
+            return
+        edges.add((parent, rest))
+        for state, position in list(self.returns[child]):
+            self._continue(parent, rest, state, position)
+
+    def _continue(self, parent, rest, state, position):
+        """The symbol above 'rest' was popped, leaving state and position"""
+        if not rest:
+            self._add_return(parent, state, position)
+            return
+        child = (state, rest[0], position, parent[3] and len(rest) == 1)
+        self._visit(child)
+        self._add_waiter(child, parent, rest[1:])
+
+    def _expand(self, node):
+        state, top, position, bottom = node
+        string = self.string
+        at_end = position == len(string)
+
+        if at_end:
+            if self.acceptance_type == 'final_state':
+                if state in self.compiled.accepting:
+                    self.accepted = True
+                    return
+            elif self.acceptance_type == 'empty_stack' and bottom and top == 'Z0':
+                self.accepted = True
+                return
+
+        symbol = None if at_end else string[position]
+        for target, push, consumes, _ in self.compiled.moves(state, symbol, top):
+            next_position = position + consumes
+            if not push:
+                self._add_return(node, target, next_position)
+                continue
+            child = (target, push[0], next_position, bottom and len(push) == 1)
+            self._visit(child)
+            self._add_waiter(child, node, push[1:])
+
+    def _propagate(self, node, state, position):
+        # A bottom node returning means the whole stack is now empty
+        if node[3] and position == len(self.string):
+            if self.acceptance_type == 'empty_stack':
+                self.accepted = True
+                return
+            if self.acceptance_type == 'final_state' and state in self.compiled.accepting:
+                self.accepted = True
+                return
+
+        for parent, rest in list(self.waiters[node]):
+            self._continue(parent, rest, state, position)
@@ -0,0 +1,215 @@
+"""
+PDA Saturation - Symbolic reachability for pushdown automata with post* and pre*
+"""
+from collections import deque
+
+EPSILON = None
+
+
+class PushdownSystem:
+    """
+    The pushdown system underlying a compiled PDA
+
+    Input symbols are dropped: every transition can fire on some input, so a
+    configuration is reachable in the PDA exactly when it is reachable in the
+    pushdown system. Rules push at most two symbols; a longer push
+    ⟨p, γ⟩ -> ⟨p', γ1..γn⟩ is split through fresh control states m1..m(n-2):
+    ⟨p, γ⟩ -> ⟨m1, γ(n-1) γn⟩, ⟨m1, γ(n-1)⟩ -> ⟨m2, γ(n-2) γ(n-1)⟩, ...,
+    ⟨m(n-2), γ2⟩ -> ⟨p', γ1 γ2⟩. Control states 0..len(compiled.states)-1
+    are the PDA's own; the rest are internal.
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.num_states = len(compiled.states)
+        self.control_states = self.num_states
+        self.stack_symbols = set(compiled.stack_symbols)
+
+        seen = set()
+        self.rules = []
+        for moves in compiled.index.values():
+            for target, push, _, transition in moves:
+                source = compiled.state_index[transition['from']]
+                key = (source, transition['stack_top'], target, push)
+                if key in seen:
+                    continue
+                seen.add(key)
+                self.stack_symbols.update(push)
+                self._add_rule(source, transition['stack_top'], target, push)
+
+    def _add_rule(self, state, top, target, push):
+        while len(push) > 2:
+            middle = self.control_states
+            self.control_states += 1
+            self.rules.append((state, top, middle, push[-2:]))
+            state, top, push = middle, push[-2], push[:-1]
+        self.rules.append((state, top, target, push))
+
+
+class PAutomaton:
+    """
+    A finite automaton over stack symbols that represents a (possibly
+    infinite) set of PDA configurations
+
+    Control states double as the initial states: ⟨p, w⟩ is in the set when
+    the automaton accepts w (top first) starting from p. Transitions are
+    (source, symbol, target) with symbol None for ε.
+    """
+
+    def __init__(self, num_states, finals=()):
+        self.num_states = num_states
+        self.finals = set(finals)
+        self.transitions = set()
+        self.outgoing = {}
+
+    def new_state(self):
+        self.num_states += 1
+        return self.num_states - 1
+
+    def add(self, source, symbol, target):
+        transition = (source, symbol, target)
+        if transition in self.transitions:
+            return False
+        self.transitions.add(transition)
+        self.outgoing.setdefault(source, []).append((symbol, target))
+        return True
+
+    def closure(self, states):
+        """States reachable from 'states' over ε-transitions"""
+        found = set(states)
+        stack = list(found)
+        while stack:
+            state = stack.pop()
+            for symbol, target in self.outgoing.get(state, ()):
+                if symbol is EPSILON and target not in found:
+                    found.add(target)
+                    stack.append(target)
+        return found
+
+    def step(self, states, symbol):
+        return self.closure({
+            target for state in states for label, target in self.outgoing.get(state, ()) if label == symbol
+        })
+
+    def accepts(self, state, word):
+        """Whether ⟨state, word⟩ is in the set; word is read top first"""
+        current = self.closure({state})
+        for symbol in word:
+            current = self.step(current, symbol)
+            if not current:
+                return False
+        return bool(current & self.finals)
+
+    def live_states(self):
+        """States from which some final state can be reached"""
+        incoming = {}
+        for source, _, target in self.transitions:
+            incoming.setdefault(target, []).append(source)
+        live = set(self.finals)
+        stack = list(live)
+        while stack:
+            state = stack.pop()
+            for source in incoming.get(state, ()):
+                if source not in live:
+                    live.add(source)
+                    stack.append(source)
+        return live
+
+    def tops(self, state, live):
+        """Stack symbols that can be on top in an accepted configuration of 'state'"""
+        return {
+            symbol for source in self.closure({state})
+            for symbol, target in self.outgoing.get(source, ())
+            if symbol is not EPSILON and target in live
+        }
+
+
+def post_star(pds, automaton):
+    """
+    Saturate 'automaton' into post*: every configuration reachable from one
+    it accepts
+
+    Schwoon's algorithm. The automaton must have no transitions into control
+    states. Each push rule ⟨p, γ⟩ -> ⟨p', γ'γ''⟩ gets one extra state
+    q(p', γ') shared by every configuration it creates, so the result has
+    O(|states| + |rules|) states and is built in polynomial time.
+    """
+    by_head = {}
+    middles = {}
+    for state, top, target, push in pds.rules:
+        by_head.setdefault((state, top), []).append((target, push))
+        if len(push) == 2 and (target, push[0]) not in middles:
+            middles[(target, push[0])] = automaton.new_state()
+
+    epsilon_into = {}
+    transitions = automaton.transitions
+    worklist = deque(transitions)
+    transitions.clear()
+    automaton.outgoing = {}
+    add = automaton.add
+
+    while worklist:
+        source, symbol, target = worklist.popleft()
+        if not add(source, symbol, target):
+            continue
+
+        if symbol is EPSILON:
+            epsilon_into.setdefault(target, []).append(source)
+            for label, next_target in list(automaton.outgoing.get(target, ())):
+                if label is not EPSILON and (source, label, next_target) not in transitions:
+                    worklist.append((source, label, next_target))
+            continue
+
+        for next_state, push in by_head.get((source, symbol), ()):
+            if not push:
+                worklist.append((next_state, EPSILON, target))
+            elif len(push) == 1:
+                worklist.append((next_state, push[0], target))
+            else:
+                middle = middles[(next_state, push[0])]
+                worklist.append((next_state, push[0], middle))
+                if add(middle, push[1], target):
+                    for epsilon_source in epsilon_into.get(middle, ()):
+                        worklist.append((epsilon_source, push[1], target))
+
+    return automaton
+
+
+def pre_star(pds, automaton):
+    """
+    Saturate 'automaton' into pre*: every configuration from which one it
+    accepts can be reached
+
+    Schwoon's algorithm: a transition (q, γ, q') makes ⟨p1, γ1⟩ -> ⟨q, γ⟩
+    add (p1, γ1, q'), and a push rule ⟨p1, γ1⟩ -> ⟨q, γγ2⟩ is remembered as
+    ⟨p1, γ1⟩ -> ⟨q', γ2⟩ until a (q', γ2, q'') shows up. No new states
+    are created.
+    """
+    swaps = {}
+    pushes = {}
+    worklist = deque(automaton.transitions)
+    automaton.transitions = set()
+    automaton.outgoing = {}
+
+    for state, top, target, push in pds.rules:
+        if not push:
+            worklist.append((state, top, target))
+        elif len(push) == 1:
+            swaps.setdefault((target, push[0]), []).append((state, top))
+        else:
+            pushes.setdefault((target, push[0]), []).append((state, top, push[1]))
+
+    while worklist:
+        source, symbol, target = worklist.popleft()
+        if not automaton.add(source, symbol, target):
+            continue
+
+        for state, top in list(swaps.get((source, symbol), ())):
+            worklist.append((state, top, target))
+        for state, top, second in pushes.get((source, symbol), ()):
+            swaps.setdefault((target, second), []).append((state, top))
+            for label, next_target in list(automaton.outgoing.get(target, ())):
+                if label == second:
+                    worklist.append((state, top, next_target))
+
+    return automaton
@@ -0,0 +1,233 @@
+"""
+PDA to CFG - Triple construction restricted to productive, reachable variables
+"""
+from collections import deque
+
+EPSILON = 'ε'
+
+
+class TripleGrammarBuilder:
+    """
+    Convert a PDA into an equivalent context-free grammar
+
+    [p,A,q] derives the inputs that take the PDA from state p with A on top
+    to state q with A popped. Acceptance without emptying the stack uses
+    [p,A,⊤]: from p with A on top, read the rest of the input and stop in an
+    accepting configuration while A (or what replaced it) is still on the
+    stack. For empty-stack acceptance the stack [Z0] also counts as empty,
+    so the variable tracks whether A is the bottom symbol: [p,A,⊥] is the
+    bottom-of-stack version of [p,A,⊤].
+
+    The textbook construction creates all |Q|²·|Γ| triples and, for a move
+    pushing k symbols, |Q|^k rules per target. Here the productive triples
+    are found first by a worklist over partially popped moves, then rules
+    are generated top-down from the start symbol, memoizing each variable
+    and only choosing intermediate states that both continue a productive
+    chain and can still reach the state the variable asks for.
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.acceptance_type = compiled.pda.get('acceptance_type')
+        self.track_bottom = self.acceptance_type == 'empty_stack'
+
+        self.by_head = {}
+        for number, ((state, symbol, top), move) in enumerate(compiled.rules):
+            self.by_head.setdefault((state, top), []).append((symbol, move, number))
+
+        self.pops = {}
+        self.forward = {}
+        self.tops = set()
+
+    def build(self):
+        """
+        Returns:
+            dict: grammar in parse_grammar form ({rules, start_symbol,
+            terminals, non_terminals}) plus construction statistics
+        """
+        self._find_pops()
+        self._find_tops()
+
+        compiled = self.compiled
+        rules = {}
+        terminals = set()
+        start = 'S'
+        rules[start] = []
+
+        worklist = deque()
+        seen = set()
+
+        def use(variable):
+            if variable not in seen:
+                seen.add(variable)
+                worklist.append(variable)
+            return self._name(variable)
+
+        if compiled.start >= 0:
+            bottom = compiled.start_stack_symbol
+            for state in sorted(self.pops.get((compiled.start, bottom), ())):
+                if self.acceptance_type == 'empty_stack' or state in compiled.accepting:
+                    rules[start].append(use(('pop', compiled.start, bottom, state)))
+            if self._top_productive(compiled.start, bottom, True):
+                rules[start].append(use(('top', compiled.start, bottom, self.track_bottom)))
+
+        while worklist:
+            variable = worklist.popleft()
+            productions = []
+            for symbol, body in self._expand(variable):
+                if symbol != EPSILON:
+                    terminals.add(symbol)
+                production = ('' if symbol == EPSILON else symbol) + ''.join(use(part) for part in body)
+                productions.append(production or EPSILON)
+            rules[self._name(variable)] = list(dict.fromkeys(productions))
+
+        states = len(compiled.states)
+        symbols = len(compiled.stack_symbols)
+        return {
+            'grammar': {
+                'rules': rules,
+                'start_symbol': start,
+                'terminals': sorted(terminals),
+                'non_terminals': list(rules)
+            },
+            'variables': len(rules),
+            'rule_count': sum(len(productions) for productions in rules.values()),
+            'naive_variables': states * states * symbols + 1,
+            'naive_rule_count': states + sum(states ** len(move[1]) for _, move in compiled.rules)
+        }
+
+    def _name(self, variable):
+        kind, state, top, end = variable
+        states = self.compiled.states
+        if kind == 'pop':
+            return f'[{states[state]},{top},{states[end]}]'
+        return f'[{states[state]},{top},{"⊥" if end else "⊤"}]'
+
+    def _stop(self, state, top, bottom):
+        """Whether the configuration can stop and accept with 'top' still on the stack"""
+        if self.acceptance_type == 'final_state':
+            return state in self.compiled.accepting
+        if self.acceptance_type == 'empty_stack':
+            return bottom and top == 'Z0'
+        return False
+
+    def _top_productive(self, state, top, bottom):
+        bottom = bottom and self.track_bottom
+        return self._stop(state, top, bottom) or (state, top, bottom) in self.tops
+
+    def _find_pops(self):
+        """
+        Find every productive triple: pops[(p, A)] holds each q with [p,A,q]
+        productive. forward[rule number][i] holds the states reached after
+        the first i symbols a move pushed have been popped again.
+        """
+        waiting = {}
+        worklist = deque()
+
+        def reach(head, number, level, state):
+            levels = self.forward[number]
+            if state not in levels[level]:
+                levels[level].add(state)
+                worklist.append((head, number, level, state))
+
+        for head, moves in self.by_head.items():
+            for _, move, number in moves:
+                self.forward[number] = [set() for _ in range(len(move[1]) + 1)]
+                reach(head, number, 0, move[0])
+
+        rules = self.compiled.rules
+        while worklist:
+            head, number, level, state = worklist.popleft()
+            push = rules[number][1][1]
+            if level == len(push):
+                found = self.pops.setdefault(head, set())
+                if state not in found:
+                    found.add(state)
+                    for waiter, waiter_number, waiter_level in waiting.get(head, ()):
+                        reach(waiter, waiter_number, waiter_level + 1, state)
+                continue
+            key = (state, push[level])
+            waiting.setdefault(key, []).append((head, number, level))
+            for end in list(self.pops.get(key, ())):
+                reach(head, number, level + 1, end)
+
+    def _find_tops(self):
+        """Find every productive [p,A,⊤] / [p,A,⊥] by propagating from stopping configurations"""
+        dependents = {}
+        bottoms = (False, True) if self.track_bottom else (False,)
+        for (state, top), moves in self.by_head.items():
+            for _, move, number in moves:
+                push = move[1]
+                levels = self.forward[number]
+                for bottom in bottoms:
+                    for level in range(len(push)):
+                        below = bottom and level == len(push) - 1
+                        for middle in levels[level]:
+                            dependents.setdefault((middle, push[level], below), []).append((state, top, bottom))
+
+        worklist = deque(key for key in dependents if self._stop(*key))
+        while worklist:
+            key = worklist.popleft()
+            for dependent in dependents.get(key, ()):
+                if dependent not in self.tops and not self._stop(*dependent):
+                    self.tops.add(dependent)
+                    worklist.append(dependent)
+
+    def _expand(self, variable):
+        """Yield (input symbol, body variables) for each rule of a variable"""
+        kind, state, top, end = variable
+        if kind == 'top' and self._stop(state, top, end):
+            yield EPSILON, ()
+
+        for symbol, move, number in self.by_head.get((state, top), ()):
+            target, push = move[0], move[1]
+            if kind == 'pop':
+                if not push:
+                    if target == end:
+                        yield symbol, ()
+                    continue
+                for chain in self._chains(number, len(push), {end}):
+                    yield symbol, self._pop_body(push, chain)
+                continue
+
+            for level in range(len(push)):
+                below = end and level == len(push) - 1
+                goals = {
+                    middle for middle in self.forward[number][level]
+                    if self._top_productive(middle, push[level], below)
+                }
+                for chain in self._chains(number, level, goals):
+                    yield symbol, self._pop_body(push, chain) + (('top', chain[-1], push[level], below),)
+
+    def _pop_body(self, push, chain):
+        return tuple(('pop', chain[i], push[i], chain[i + 1]) for i in range(len(chain) - 1))
+
+    def _chains(self, number, length, goals):
+        """
+        State sequences s0..s(length) popping the first 'length' symbols a
+        move pushed, starting at the move's target and ending in 'goals'
+        """
+        target, push = self.compiled.rules[number][1][:2]
+        levels = self.forward[number]
+        allowed = [None] * (length + 1)
+        allowed[length] = goals & levels[length]
+        for level in range(length - 1, -1, -1):
+            allowed[level] = {
+                state for state in levels[level]
+                if self.pops.get((state, push[level]), set()) & allowed[level + 1]
+            }
+        if target not in allowed[0]:
+            return
+
+        chain = [target]
+
+        def extend(level):
+            if level == length:
+                yield tuple(chain)
+                return
+            for state in sorted(self.pops.get((chain[-1], push[level]), ()) & allowed[level + 1]):
+                chain.append(state)
+                yield from extend(level + 1)
+                chain.pop()
+
+        yield from extend(0)
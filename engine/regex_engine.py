@@ -0,0 +1,227 @@
+"""
+Regex Engine - Regular expression parsing, Thompson construction and matching
+"""
+from functools import lru_cache
+import threading
+from engine.parser import tokenize_regex
+from engine.utils import EpsilonClosureIndex
+from engine.lazy_dfa import LazyDFA
+
+EPSILON = 'ε'
+
+
+class RegexParser:
+    """
+    Precedence-aware parser over tokenize_regex() tokens
+
+    Grammar (lowest to highest precedence):
+        union   := concat ('|' concat)*
+        concat  := postfix*
+        postfix := atom ('*' | '+' | '?')*
+        atom    := symbol | '(' union ')'
+
+    Nodes are tuples: ('sym', a), ('eps',), ('cat', [nodes]),
+    ('alt', [nodes]), ('star', node), ('plus', node), ('opt', node).
+    Concatenation and union are n-ary so long regexes stay shallow.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self):
+        node = self._union()
+        if self.position != len(self.tokens):
+            raise ValueError(f'Unexpected "{self.tokens[self.position]["value"]}" at token {self.position}')
+        return node
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def _union(self):
+        items = [self._concat()]
+        while self._peek() and self._peek()['value'] == '|':
+            self.position += 1
+            items.append(self._concat())
+        return items[0] if len(items) == 1 else ('alt', items)
+
+    def _concat(self):
+        items = []
+        while True:
+            token = self._peek()
+            if token is None or (token['type'] == 'operator' and token['value'] != '('):
+                break
+            items.append(self._postfix())
+        if not items:
+            return ('eps',)
+        return items[0] if len(items) == 1 else ('cat', items)
+
+    def _postfix(self):
+        node = self._atom()
+        operators = {'*': 'star', '+': 'plus', '?': 'opt'}
+        while self._peek() and self._peek()['value'] in operators:
+            node = (operators[self._peek()['value']], node)
+            self.position += 1
+        return node
+
+    def _atom(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError('Unexpected end of regular expression')
+
+        self.position += 1
+        if token['type'] == 'symbol':
+            return ('eps',) if token['value'] == EPSILON else ('sym', token['value'])
+
+        if token['value'] == '(':
+            node = self._union()
+            closing = self._peek()
+            if closing is None or closing['value'] != ')':
+                raise ValueError('Missing closing parenthesis')
+            self.position += 1
+            return node
+
+        raise ValueError(f'Unexpected "{token["value"]}" at token {self.position - 1}')
+
+
+class ThompsonBuilder:
+    """Build a Thompson ε-NFA with integer state ids from a regex AST"""
+
+    def __init__(self):
+        self.moves = []
+        self.epsilon = []
+
+    def _new_state(self):
+        self.moves.append({})
+        self.epsilon.append([])
+        return len(self.moves) - 1
+
+    def build(self, node):
+        """Returns (start state id, accept state id) of the fragment for node"""
+        kind = node[0]
+
+        if kind in ('sym', 'eps'):
+            start, end = self._new_state(), self._new_state()
+            if kind == 'sym':
+                self.moves[start].setdefault(node[1], []).append(end)
+            else:
+                self.epsilon[start].append(end)
+            return start, end
+
+        if kind == 'cat':
+            start, end = self.build(node[1][0])
+            for item in node[1][1:]:
+                item_start, item_end = self.build(item)
+                self.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+
+        if kind == 'alt':
+            start, end = self._new_state(), self._new_state()
+            for item in node[1]:
+                item_start, item_end = self.build(item)
+                self.epsilon[start].append(item_start)
+                self.epsilon[item_end].append(end)
+            return start, end
+
+        # star / plus / opt
+        inner_start, inner_end = self.build(node[1])
+        start, end = self._new_state(), self._new_state()
+        self.epsilon[start].append(inner_start)
+        self.epsilon[inner_end].append(end)
+        if kind in ('star', 'plus'):
+            self.epsilon[inner_end].append(inner_start)
+        if kind in ('star', 'opt'):
+            self.epsilon[start].append(end)
+        return start, end
+
+    def to_automaton(self, start, accept):
+        """Convert to the engine's dict format with states named q0, q1, ..."""
+        names = [f'q{i}' for i in range(len(self.moves))]
+        alphabet = sorted({symbol for moves in self.moves for symbol in moves})
+
+        transitions = {}
+        for i, moves in enumerate(self.moves):
+            entry = {symbol: [names[t] for t in targets] for symbol, targets in moves.items()}
+            if self.epsilon[i]:
+                entry[EPSILON] = [names[t] for t in self.epsilon[i]]
+            transitions[names[i]] = entry
+
+        return {
+            'states': names,
+            'alphabet': alphabet,
+            'transitions': transitions,
+            'start_state': names[start],
+            'accept_states': [names[accept]]
+        }
+
+
+def remove_epsilon(nfa):
+    """
+    Remove ε-moves from an NFA
+
+    Every state takes the symbol moves of its whole ε-closure and becomes
+    accepting if its closure contains an accept state. States that are no
+    longer reachable from the start state are dropped.
+    """
+    transitions = nfa.get('transitions', {})
+    closures = EpsilonClosureIndex(transitions, nfa.get('states', []))
+    accept = set(nfa.get('accept_states', []))
+
+    new_transitions = {}
+    reachable = [nfa['start_state']]
+    seen = {nfa['start_state']}
+    i = 0
+    while i < len(reachable):
+        state = reachable[i]
+        i += 1
+        closure = closures.closure(state)
+        entry = {}
+        for symbol in nfa.get('alphabet', []):
+            targets = set()
+            for member in closure:
+                targets |= closures.targets(member, symbol)
+            if targets:
+                entry[symbol] = sorted(targets, key=closures.index.get)
+                for target in entry[symbol]:
+                    if target not in seen:
+                        seen.add(target)
+                        reachable.append(target)
+        new_transitions[state] = entry
+
+    return {
+        'states': reachable,
+        'alphabet': list(nfa.get('alphabet', [])),
+        'transitions': new_transitions,
+        'start_state': nfa['start_state'],
+        'accept_states': [s for s in reachable if closures.closure(s) & accept]
+    }
+
+
+class CompiledRegex:
+    """A parsed regex with its Thompson NFA, ε-free NFA and matcher"""
+
+    def __init__(self, regex):
+        self.regex = regex
+        self.ast = RegexParser(tokenize_regex(regex)).parse()
+
+        builder = ThompsonBuilder()
+        start, accept = builder.build(self.ast)
+        self.nfa = builder.to_automaton(start, accept)
+        self.epsilon_free_nfa = remove_epsilon(self.nfa)
+
+        self._matcher = LazyDFA(self.epsilon_free_nfa)
+        self._lock = threading.Lock()
+
+    def matches(self, string):
+        """Check whether the whole string matches the regex"""
+        with self._lock:
+            return self._matcher.accepts(string)
+
+
+@lru_cache(maxsize=256)
+def compile_regex(regex):
+    """Compile a regex, reusing earlier compilations of the same string"""
+    return CompiledRegex(regex)
@@ -0,0 +1,139 @@
+"""
+Shift-And - Bit-parallel simulation of chain-shaped NFAs
+"""
+from engine.utils import _as_state_list
+
+EPSILON = 'ε'
+
+
+class ShiftAndMatcher:
+    """
+    Shift-And matcher for an NFA that is a chain s0 -> s1 -> ... -> sm
+
+    Each chain edge may carry a set of symbols (a character class). The
+    first state may loop on every symbol (unanchored search) and the last
+    state may loop on every symbol (a "contains" language); no other loops
+    are allowed. Bit j-1 of the state word means chain state j is active, so
+    one step is D = ((D << 1) | start) & mask[symbol]. Python ints grow as
+    needed, so chains of any length use the same code.
+    """
+
+    def __init__(self, chain, classes, alphabet, unanchored, absorbing):
+        self.chain = chain
+        self.length = len(classes)
+        self.alphabet = alphabet
+        self.unanchored = unanchored
+        self.absorbing = absorbing
+        self.high_bit = 1 << (self.length - 1)
+
+        self.masks = {symbol: 0 for symbol in alphabet}
+        for position, symbols in enumerate(classes):
+            for symbol in symbols:
+                self.masks[symbol] |= 1 << position
+
+    @classmethod
+    def from_nfa(cls, nfa):
+        """Build a matcher if the NFA is chain-shaped, otherwise return None"""
+        transitions = nfa.get('transitions', {}) or {}
+        accept_states = nfa.get('accept_states', []) or []
+        start = nfa.get('start_state')
+        if start is None or len(accept_states) != 1:
+            return None
+
+        alphabet = list(nfa.get('alphabet', []) or [])
+        for moves in transitions.values():
+            for symbol in moves:
+                if symbol != EPSILON and symbol not in alphabet:
+                    alphabet.append(symbol)
+        full = set(alphabet)
+
+        chain = [start]
+        classes = []
+        loops = []
+        state = start
+        while True:
+            moves = transitions.get(state, {}) or {}
+            if _as_state_list(moves.get(EPSILON)):
+                return None
+
+            loop = set()
+            edges = {}
+            for symbol, targets in moves.items():
+                if symbol == EPSILON:
+                    continue
+                for target in _as_state_list(targets):
+                    if target == state:
+                        loop.add(symbol)
+                    else:
+                        edges.setdefault(target, set()).add(symbol)
+
+            if loop and loop != full:
+                return None
+            loops.append(bool(loop))
+
+            if not edges:
+                break
+            if len(edges) > 1:
+                return None
+            (target, symbols), = edges.items()
+            if target in chain:
+                return None
+            chain.append(target)
+            classes.append(symbols)
+            state = target
+
+        if not classes or state != accept_states[0]:
+            return None
+        # Only the two ends of the chain may loop
+        if any(loops[1:-1]):
+            return None
+
+        return cls(chain, classes, alphabet, loops[0], loops[-1])
+
+    def run(self, string, limit=None):
+        """
+        Run the matcher over a string
+
+        Args:
+            limit: Stop recording match end offsets after this many
+
+        Returns:
+            dict: accepted, match_ends (offsets just past each match),
+            match_count, and the NFA states active at the end (empty if an
+            unknown symbol killed the run)
+        """
+        masks = self.masks
+        high_bit = self.high_bit
+        start_bit = 1
+        active = 0
+        matched = False
+        match_ends = []
+        match_count = 0
+
+        for offset, symbol in enumerate(string):
+            mask = masks.get(symbol)
+            if mask is None:
+                return {'accepted': False, 'match_ends': match_ends, 'match_count': match_count, 'active_states': []}
+
+            active = ((active << 1) | start_bit) & mask
+            if not self.unanchored:
+                start_bit = 0
+
+            if active & high_bit:
+                matched = True
+                match_count += 1
+                if limit is None or len(match_ends) < limit:
+                    match_ends.append(offset + 1)
+
+        ended = bool(active & high_bit) or (self.absorbing and matched)
+        states = [self.chain[0]] if start_bit else []
+        states += [self.chain[j + 1] for j in range(self.length - 1) if active >> j & 1]
+        if ended:
+            states.append(self.chain[-1])
+
+        return {
+            'accepted': ended,
+            'match_ends': match_ends,
+            'match_count': match_count,
+            'active_states': states
+        }
@@ -0,0 +1,229 @@
+"""
+Stride Table - Multi-symbol transition tables for compiled automata
+
+A stride-k table maps (state, k-gram of symbol ids) straight to the state
+reached after those k symbols, so a run loop does one lookup per k symbols.
+K-gram ids put the first symbol in the most significant position:
+gram = s0 * width^(k-1) + ... + s(k-1).
+"""
+from array import array
+import numpy as np
+
+DEFAULT_MEMORY_BUDGET = 16 << 20
+
+# Strides to try, largest first; k = 1 (plain table) is the fallback
+STRIDES = (4, 2)
+
+# Skip strides whose table has more cells than this many per input symbol,
+# since building it would cost more than it saves
+CELLS_PER_SYMBOL = 8
+
+
+def choose_stride(num_states, width, input_length=None, memory_budget=DEFAULT_MEMORY_BUDGET,
+                  bytes_per_cell=8):
+    """
+    Pick the largest stride whose table fits the memory budget
+
+    Args:
+        input_length: Total symbols the table will be used for; strides
+            that would not pay for themselves on this much input are skipped
+        bytes_per_cell: Memory per table cell across all arrays kept
+
+    Returns:
+        int: 4, 2 or 1
+    """
+    for k in STRIDES:
+        cells = num_states * width ** k
+        if cells * bytes_per_cell > memory_budget:
+            continue
+        if input_length is not None and cells > CELLS_PER_SYMBOL * input_length:
+            continue
+        return k
+    return 1
+
+
+def dense_transitions(table, width, num_states):
+    """Flat -1-padded table as a NumPy matrix with a trailing sink row"""
+    sink = num_states
+    dense = np.full((num_states + 1, width), sink, dtype=np.int32)
+    if num_states:
+        flat = np.frombuffer(table, dtype=np.int32).reshape(num_states, width)
+        dense[:sink] = np.where(flat >= 0, flat, sink)
+    return dense
+
+
+def compose_dense(dense, k):
+    """Raise a sink-padded transition matrix to k-gram columns"""
+    rows = dense.shape[0]
+    result = dense
+    for _ in range(k - 1):
+        result = dense[result].reshape(rows, -1)
+    return result
+
+
+def gram_digits(width, k):
+    """Symbol id at each of the k positions, for every k-gram id"""
+    grams = np.arange(width ** k)
+    return [(grams // width ** (k - 1 - j)) % width for j in range(k)]
+
+
+def encode_grams(symbols, width, k):
+    """
+    Split a sequence of symbol ids into k-gram ids
+
+    Returns:
+        tuple: (k-gram ids as array('i'), number of symbols they cover)
+    """
+    dtype = np.uint8 if isinstance(symbols, (bytes, bytearray)) else np.int32
+    ids = np.frombuffer(symbols, dtype=dtype)
+    covered = len(ids) - len(ids) % k
+    powers = width ** np.arange(k - 1, -1, -1, dtype=np.int64)
+    grams = ids[:covered].astype(np.int64).reshape(-1, k) @ powers
+
+    encoded = array('i')
+    encoded.frombytes(grams.astype(np.int32).tobytes())
+    return encoded, covered
+
+
+def _as_cells(matrix):
+    cells = array('i')
+    cells.frombytes(np.ascontiguousarray(matrix, dtype=np.int32).tobytes())
+    return cells
+
+
+class StrideDFA:
+    """
+    Stride-k runner for a CompiledDFA
+
+    Table cells hold the target state's row offset (state * width^k) rather
+    than its id, so each step is a single add and lookup. A k-gram that hits
+    a missing transition is replayed one symbol at a time to report exactly
+    where the run stopped.
+    """
+
+    def __init__(self, compiled, k):
+        self.compiled = compiled
+        self.k = k
+        self.span = compiled.width ** k
+
+        # Sink-padded k-gram matrix, also used for lockstep batch runs
+        self.dense = compose_dense(compiled.dense_table(), k)
+
+        sink = compiled.num_states
+        composed = self.dense[:sink]
+        self.table = _as_cells(np.where(composed < sink, composed.astype(np.int64) * self.span, -1))
+
+    def run(self, symbols, state=None):
+        """Same contract as CompiledDFA.run()"""
+        compiled = self.compiled
+        current = compiled.start if state is None else state
+        grams, covered = encode_grams(symbols, compiled.width, self.k)
+        table = self.table
+        span = self.span
+        k = self.k
+
+        offset = current * span
+        consumed = 0
+        for gram in grams:
+            next_offset = table[offset + gram]
+            if next_offset < 0:
+                current, count = compiled.run(symbols[consumed:consumed + k], offset // span)
+                return current, consumed + count
+            offset = next_offset
+            consumed += k
+
+        current, count = compiled.run(symbols[covered:], offset // span)
+        return current, covered + count
+
+
+class StrideTransducer:
+    """
+    Stride-k runner for a CompiledTransducer
+
+    Besides the target offset, every cell records the id of the output
+    sequence emitted over its k symbols. Output counts are tallied per
+    sequence and expanded into per-symbol counts once at the end.
+    """
+
+    def __init__(self, compiled, k):
+        self.compiled = compiled
+        self.k = k
+        width = compiled.width
+        self.span = width ** k
+
+        sink = compiled.num_states
+        dense = dense_transitions(compiled.table, width, sink)
+        rows = np.arange(sink)[:, None]
+
+        if compiled.machine_type == 'mealy':
+            cell_outputs = np.full((sink + 1, width), -1, dtype=np.int64)
+            if sink:
+                cell_outputs[:sink] = np.frombuffer(compiled.outputs, dtype=np.int32).reshape(sink, width)
+        else:
+            state_outputs = np.full(sink + 1, -1, dtype=np.int64)
+            state_outputs[:sink] = np.frombuffer(compiled.outputs, dtype=np.int32)
+
+        # Walk all k positions for every (state, k-gram) cell at once,
+        # packing the k outputs into one base-(outputs + 1) code
+        radix = len(compiled.output_symbols) + 1
+        current = np.broadcast_to(rows, (sink, self.span))
+        codes = np.zeros((sink, self.span), dtype=np.int64)
+        for j, digit in enumerate(gram_digits(width, k)):
+            following = dense[current, digit]
+            if compiled.machine_type == 'mealy':
+                emitted = cell_outputs[current, digit]
+            else:
+                emitted = state_outputs[following]
+            codes += (emitted + 1) * radix ** (k - 1 - j)
+            current = following
+
+        unique_codes, sequence_ids = np.unique(codes, return_inverse=True)
+        self.sequences = [self._decode(int(code), radix) for code in unique_codes]
+        self.output_cells = _as_cells(sequence_ids.reshape(sink, self.span))
+        self.table = _as_cells(np.where(current < sink, current.astype(np.int64) * self.span, -1))
+
+    def _decode(self, code, radix):
+        digits = []
+        for _ in range(self.k):
+            code, digit = divmod(code, radix)
+            digits.append(digit - 1)
+        return tuple(d for d in reversed(digits) if d >= 0)
+
+    def run(self, symbols, state=None, counts=None, out=None):
+        """Same contract as CompiledTransducer.run()"""
+        compiled = self.compiled
+        current = compiled.start if state is None else state
+        grams, covered = encode_grams(symbols, compiled.width, self.k)
+        table = self.table
+        output_cells = self.output_cells
+        sequences = self.sequences
+        span = self.span
+        k = self.k
+        tally = [0] * len(sequences) if counts is not None else None
+
+        offset = current * span
+        consumed = 0
+        stopped = False
+        for gram in grams:
+            cell = offset + gram
+            next_offset = table[cell]
+            if next_offset < 0:
+                stopped = True
+                break
+            sequence = output_cells[cell]
+            if tally is not None:
+                tally[sequence] += 1
+            if out is not None:
+                out.extend(sequences[sequence])
+            offset = next_offset
+            consumed += k
+
+        if tally is not None:
+            for sequence, times in enumerate(tally):
+                if times:
+                    for output in sequences[sequence]:
+                        counts[output] += times
+
+        rest = symbols[consumed:consumed + k] if stopped else symbols[covered:]
+        current, count = compiled.run(rest, offset // span, counts, out)
+        return current, consumed + count
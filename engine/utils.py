@@ -8,6 +8,171 @@ def generate_unique_id(prefix=''):
     """Generate a unique identifier"""
     return f"{prefix}_{random.randint(1000, 9999)}"
 
+def _as_state_list(targets):
+    """Normalize a transition target (single state or list) to a list"""
+    if isinstance(targets, str):
+        return [targets]
+    return targets or []
+
+class EpsilonClosureIndex:
+    """
+    Precomputed ε-closures for every state of an NFA
+    
+    States are interned to bit positions. ε-cycles are collapsed with
+    Tarjan's SCC algorithm and closures are built once per component in
+    reverse topological order, so every state of a cycle shares the same
+    closure bitmask. Build one index per NFA; closures and closed moves
+    are then lookups instead of a graph walk per query.
+    """
+    
+    def __init__(self, transitions, states=None):
+        self.transitions = transitions
+        self.states = []
+        self.index = {}
+        
+        for state in states or []:
+            self._intern(state)
+        for state, moves in transitions.items():
+            self._intern(state)
+            for targets in moves.values():
+                for target in _as_state_list(targets):
+                    self._intern(target)
+        
+        epsilon_edges = []
+        for state in self.states:
+            moves = transitions.get(state, {})
+            epsilon_edges.append([self.index[t] for t in _as_state_list(moves.get('ε'))])
+        
+        self.component, components = self._strongly_connected(epsilon_edges)
+        
+        # Tarjan emits components sinks-first, so successors are always done
+        component_mask = []
+        for members in components:
+            mask = 0
+            for state in members:
+                mask |= 1 << state
+            for state in members:
+                for target in epsilon_edges[state]:
+                    c = self.component[target]
+                    if c < len(component_mask):
+                        mask |= component_mask[c]
+            component_mask.append(mask)
+        
+        self.component_count = len(components)
+        self.masks = [component_mask[c] for c in self.component]
+        self._component_sets = [None] * len(components)
+        self._move_sets = {}
+        self._closed_moves = {}
+    
+    def _intern(self, state):
+        if state not in self.index:
+            self.index[state] = len(self.states)
+            self.states.append(state)
+    
+    @staticmethod
+    def _strongly_connected(edges):
+        """Iterative Tarjan SCC; returns (component id per node, components)"""
+        count = len(edges)
+        order = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        component = [-1] * count
+        components = []
+        stack = []
+        counter = 0
+        
+        for root in range(count):
+            if order[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    order[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                
+                recurse = False
+                while child < len(edges[node]):
+                    target = edges[node][child]
+                    child += 1
+                    if order[target] < 0:
+                        work.append((node, child))
+                        work.append((target, 0))
+                        recurse = True
+                        break
+                    if on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                if recurse:
+                    continue
+                
+                if low[node] == order[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+                
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        
+        return component, components
+    
+    def closure_mask(self, state):
+        """Bitmask of the ε-closure of a state"""
+        return self.masks[self.index[state]]
+    
+    def closure(self, state):
+        """ε-closure of a state as a shared frozenset"""
+        if state not in self.index:
+            return frozenset([state])
+        c = self.component[self.index[state]]
+        if self._component_sets[c] is None:
+            self._component_sets[c] = frozenset(self.states_of(self.masks[self.index[state]]))
+        return self._component_sets[c]
+    
+    def mask_of(self, states):
+        """Bitmask of a collection of states"""
+        mask = 0
+        for state in states:
+            mask |= 1 << self.index[state]
+        return mask
+    
+    def states_of(self, mask):
+        """Decode a bitmask into a list of states"""
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.states[low.bit_length() - 1])
+            mask ^= low
+        return result
+    
+    def targets(self, state, symbol):
+        """δ(state, symbol) as a shared frozenset"""
+        key = (state, symbol)
+        if key not in self._move_sets:
+            moves = self.transitions.get(state, {})
+            self._move_sets[key] = frozenset(_as_state_list(moves.get(symbol)))
+        return self._move_sets[key]
+    
+    def closed_move_row(self, symbol):
+        """For every state id, the ε-closure of δ(state, symbol) as a bitmask"""
+        if symbol not in self._closed_moves:
+            row = []
+            for state in self.states:
+                mask = 0
+                for target in self.targets(state, symbol):
+                    mask |= self.masks[self.index[target]]
+                row.append(mask)
+            self._closed_moves[symbol] = row
+        return self._closed_moves[symbol]
+
 def epsilon_closure(state, transitions):
     """Compute epsilon closure for NFA states"""
     closure = {state}
@@ -4,6 +4,8 @@ Comprehensive Test for All New Automata Features
 """
 import requests
 import json
+import os
+import shutil
 
 BASE_URL = "http://localhost:5000/api/solve"
 
@@ -40,6 +42,431 @@ def test_feature(name, question, grammar=""):
         print(f"❌ Error: {e}")
         return False
 
+def test_regression(name, payload, expected_task=None, check=None, url=BASE_URL, status=200):
+    """Post a full payload and check the status, the task type and, optionally, the result"""
+    print(f"\n{'='*70}")
+    print(f"Regression: {name}")
+    print(f"{'='*70}")
+    
+    try:
+        response = requests.post(url, json=payload, timeout=10)
+        result = response.json()
+        
+        if response.status_code != status:
+            print(f"❌ FAILED: HTTP {response.status_code}, expected {status}: {result.get('error', '')}")
+            return False
+        if status == 200 and 'error' in result:
+            print(f"❌ FAILED: {result['error']}")
+            return False
+        if expected_task and result.get('task_type') != expected_task:
+            print(f"❌ FAILED: routed to {result.get('task_type')}, expected {expected_task}")
+            return False
+        if check and not check(result):
+            print(f"❌ FAILED: unexpected result {json.dumps(result.get('details', result))[:200]}")
+            return False
+        print(f"✅ SUCCESS - Task Type: {result.get('task_type', 'n/a')}")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+EVEN_A_DFA = {
+    "states": ["q0", "q1"],
+    "alphabet": ["a", "b"],
+    "transitions": {"q0": {"a": "q1", "b": "q0"}, "q1": {"a": "q0", "b": "q1"}},
+    "start_state": "q0",
+    "accept_states": ["q0"]
+}
+
+# Same language as EVEN_A_DFA with two redundant states
+EVEN_A_DFA_4 = {
+    "states": ["p0", "p1", "p2", "p3"],
+    "alphabet": ["a", "b"],
+    "transitions": {
+        "p0": {"a": "p1", "b": "p0"}, "p1": {"a": "p2", "b": "p1"},
+        "p2": {"a": "p3", "b": "p2"}, "p3": {"a": "p0", "b": "p3"}
+    },
+    "start_state": "p0",
+    "accept_states": ["p0", "p2"]
+}
+
+# Accepts only "ab"; every other move is missing
+AB_DFA = {
+    "states": ["s0", "s1", "s2"],
+    "alphabet": ["a", "b"],
+    "transitions": {"s0": {"a": "s1"}, "s1": {"b": "s2"}},
+    "start_state": "s0",
+    "accept_states": ["s2"]
+}
+
+BATCH_URL = "http://localhost:5000/api/membership/batch"
+
+# Strings over {a, b} ending in "ab"
+ENDS_AB_NFA = {
+    "states": ["q0", "q1", "q2"],
+    "alphabet": ["a", "b"],
+    "transitions": {"q0": {"a": ["q0", "q1"], "b": ["q0"]}, "q1": {"b": ["q2"]}},
+    "start_state": "q0",
+    "accept_states": ["q2"]
+}
+
+# p and q form an ε-cycle; r reaches s by ε
+EPSILON_CYCLE_NFA = {
+    "states": ["p", "q", "r", "s"],
+    "alphabet": ["a"],
+    "transitions": {"p": {"ε": ["q"]}, "q": {"ε": ["p"], "a": ["r"]}, "r": {"ε": ["s"]}},
+    "start_state": "p",
+    "accept_states": ["s"]
+}
+
+EPSILON_NFA = {
+    "states": ["p", "q", "r"],
+    "alphabet": ["a", "b"],
+    "transitions": {"p": {"ε": ["q"], "a": ["p"]}, "q": {"b": ["r"]}},
+    "start_state": "p",
+    "accept_states": ["r"]
+}
+
+STREAM_URL = "http://localhost:5000/api/membership/stream"
+
+def test_stream_session():
+    """Feed a streaming session in chunks, read it back and close it"""
+    print(f"\n{'='*70}")
+    print("Regression: Streaming Session")
+    print(f"{'='*70}")
+    
+    try:
+        created = requests.post(STREAM_URL, json={"automaton": EVEN_A_DFA}, timeout=10)
+        if created.status_code != 201:
+            print(f"❌ FAILED: create returned HTTP {created.status_code}")
+            return False
+        session_url = f"{STREAM_URL}/{created.json()['session_id']}"
+        
+        for chunk in ["ab", "ba", "a"]:
+            status = requests.post(session_url, data=chunk.encode(), timeout=10).json()
+        if (status.get('symbols_read'), status.get('current_state'), status.get('accepted')) != (5, 'q1', False):
+            print(f"❌ FAILED: unexpected status after feeding {status}")
+            return False
+        
+        if requests.get(session_url, timeout=10).json().get('chunks_read') != 3:
+            print("❌ FAILED: status does not report three chunks")
+            return False
+        requests.delete(session_url, timeout=10)
+        if requests.get(session_url, timeout=10).status_code != 404:
+            print("❌ FAILED: session still exists after DELETE")
+            return False
+        
+        print("✅ SUCCESS - streamed 5 symbols in 3 chunks")
+        return True
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+# File-backed runs read from the server's INPUT_DIR; run the server from this directory
+INPUT_DIR = os.environ.get('INPUT_DIR', 'inputs')
+REGRESSION_INPUTS = 'regression'
+FILE_URL = "http://localhost:5000/api/membership/file"
+
+def write_input(name, data):
+    """Write a regression input file and return its path relative to INPUT_DIR"""
+    os.makedirs(os.path.join(INPUT_DIR, REGRESSION_INPUTS), exist_ok=True)
+    with open(os.path.join(INPUT_DIR, REGRESSION_INPUTS, name), 'w') as f:
+        f.write(data)
+    return f'{REGRESSION_INPUTS}/{name}'
+
+def read_input(name):
+    with open(os.path.join(INPUT_DIR, REGRESSION_INPUTS, name)) as f:
+        return f.read()
+
+# Outputs 1 for every a and 0 for every b
+AB_MEALY = {
+    "states": ["m"],
+    "input_alphabet": ["a", "b"],
+    "output_alphabet": ["0", "1"],
+    "start_state": "m",
+    "transitions": [
+        {"from": "m", "to": "m", "input": "a", "output": "1"},
+        {"from": "m", "to": "m", "input": "b", "output": "0"}
+    ]
+}
+
+# a^n b^n by final state; q3 is unreachable
+ANBN_PDA = {
+    "states": ["q0", "q1", "q2", "q3"],
+    "input_alphabet": ["a", "b"],
+    "stack_alphabet": ["Z0", "A"],
+    "start_state": "q0",
+    "start_stack_symbol": "Z0",
+    "accept_states": ["q2"],
+    "transitions": [
+        {"from": "q0", "input": "a", "stack_top": "Z0", "to": "q0", "stack_push": "AZ0"},
+        {"from": "q0", "input": "a", "stack_top": "A", "to": "q0", "stack_push": "AA"},
+        {"from": "q0", "input": "b", "stack_top": "A", "to": "q1", "stack_push": ""},
+        {"from": "q1", "input": "b", "stack_top": "A", "to": "q1", "stack_push": ""},
+        {"from": "q1", "input": "ε", "stack_top": "Z0", "to": "q2", "stack_push": "Z0"},
+        {"from": "q3", "input": "a", "stack_top": "Z0", "to": "q2", "stack_push": "Z0"}
+    ],
+    "acceptance_type": "final_state"
+}
+
+# cfg_to_pda output for S → aSb | SS | ε; nondeterministic, accepts by empty stack
+BALANCED_PDA = {
+    "states": ["q0", "q1", "q2"],
+    "input_alphabet": ["a", "b"],
+    "stack_alphabet": ["Z0", "S", "a", "b"],
+    "start_state": "q0",
+    "start_stack_symbol": "Z0",
+    "accept_states": ["q2"],
+    "transitions": [
+        {"from": "q0", "input": "ε", "stack_top": "Z0", "to": "q1", "stack_push": "SZ0"},
+        {"from": "q1", "input": "ε", "stack_top": "S", "to": "q1", "stack_push": "aSb"},
+        {"from": "q1", "input": "ε", "stack_top": "S", "to": "q1", "stack_push": "SS"},
+        {"from": "q1", "input": "ε", "stack_top": "S", "to": "q1", "stack_push": ""},
+        {"from": "q1", "input": "a", "stack_top": "a", "to": "q1", "stack_push": ""},
+        {"from": "q1", "input": "b", "stack_top": "b", "to": "q1", "stack_push": ""},
+        {"from": "q1", "input": "ε", "stack_top": "Z0", "to": "q2", "stack_push": ""}
+    ],
+    "acceptance_type": "empty_stack"
+}
+
+def regression_tests():
+    """Task types and engines added to the solver, and previously misrouted questions"""
+    details = lambda result: result.get('details', {})
+    return [
+        # Compiled DFA: membership with trace, missing transitions, table order
+        ("DFA Membership", {"question": "Does the DFA accept abba?", "automaton": EVEN_A_DFA, "test_string": "abba"},
+         "dfa_membership", lambda r: details(r).get('accepted') is True and details(r).get('final_state') == 'q0'
+         and details(r).get('trace') == ['q0', 'q1', 'q1', 'q1', 'q0']),
+        ("DFA Missing Transition", {"question": "Does the DFA accept aa?", "automaton": AB_DFA, "test_string": "aa"},
+         "dfa_membership", lambda r: details(r).get('accepted') is False and 'No transition' in details(r).get('reason', '')),
+        ("Table Follows State Order", {"question": "Minimize the DFA", "automaton": EVEN_A_DFA_4},
+         "dfa_minimization", lambda r: [row[0] for row in r['tables'][0]['data'][1:]] == details(r)['dfa']['states']),
+        
+        # Batch membership: one compiled run for many strings
+        ("DFA Batch via Solve", {"question": "Which of these strings does the DFA accept?", "automaton": EVEN_A_DFA,
+                                 "test_strings": ["", "a", "aa", "bab", "abab"]},
+         "dfa_membership", lambda r: [item['accepted'] for item in details(r).get('results', [])] == [True, False, True, False, True]
+         and details(r).get('accepted_count') == 3),
+        ("DFA Batch Endpoint", {"automaton": EVEN_A_DFA, "test_strings": ["ab", "aab", "x"], "final_states": True},
+         None, lambda r: [(item['accepted'], item['final_state']) for item in r.get('results', [])]
+         == [(False, 'q1'), (True, 'q0'), (False, None)], BATCH_URL),
+        ("DFA Batch Bad Input", {"automaton": EVEN_A_DFA, "test_strings": "abab"},
+         None, None, BATCH_URL, 400),
+        
+        # Hopcroft minimization: redundant and unreachable states merge away
+        ("Hopcroft Minimization", {"question": "Minimize the DFA", "automaton": EVEN_A_DFA_4},
+         "dfa_minimization", lambda r: details(r).get('minimized_state_count') == 2
+         and len(details(r)['dfa']['accept_states']) == 1),
+        ("Minimize Unreachable", {"question": "Minimize the DFA", "automaton": dict(
+            EVEN_A_DFA_4, states=EVEN_A_DFA_4["states"] + ["u"],
+            transitions=dict(EVEN_A_DFA_4["transitions"], u={"a": "p0", "b": "u"}))},
+         "dfa_minimization", lambda r: details(r).get('original_state_count') == 5
+         and details(r).get('minimized_state_count') == 2 and 'unreachable' in r.get('explanation', '')),
+        
+        # Subset construction over bitmask subsets
+        ("NFA to DFA", {"question": "Convert NFA to DFA", "automaton": ENDS_AB_NFA},
+         "nfa_to_dfa", lambda r: sorted(details(r)['dfa']['states']) == ['{q0,q1}', '{q0,q2}', '{q0}']
+         and details(r)['dfa']['accept_states'] == ['{q0,q2}']
+         and details(r)['dfa']['transitions']['{q0,q2}'] == {'a': '{q0,q1}', 'b': '{q0}'}),
+        
+        # ε-closures precomputed over the SCCs of the ε-graph
+        ("ε-Cycle Closure", {"question": "Convert NFA to DFA", "automaton": EPSILON_CYCLE_NFA},
+         "nfa_to_dfa", lambda r: details(r)['dfa']['start_state'] == '{p,q}'
+         and details(r)['dfa']['transitions']['{p,q}'] == {'a': '{r,s}'}
+         and details(r)['dfa']['accept_states'] == ['{r,s}']),
+        
+        # NFA membership determinized lazily along the input
+        ("NFA Lazy Membership", {"question": "Does the NFA accept aab?", "automaton": EPSILON_NFA, "test_string": "aab"},
+         "dfa_membership", lambda r: details(r).get('accepted') is True and details(r).get('simulation_mode') == 'lazy_dfa'),
+        ("NFA Tiny Cache", {"question": "Does the NFA accept aaaaaab?", "automaton": EPSILON_NFA,
+                            "test_string": "aaaaaab", "cache_bytes": 1},
+         "dfa_membership", lambda r: details(r).get('accepted') is True and details(r)['cache_stats']['cached_states'] <= 1),
+        ("NFA Batch Membership", {"automaton": EPSILON_NFA, "test_strings": ["ab", "b", "aab", "a"]},
+         None, lambda r: [item['accepted'] for item in r.get('results', [])] == [True, True, True, False], BATCH_URL),
+        
+        # Thompson NFA and its compiled matcher
+        ("Thompson NFA", {"question": "Convert the regular expression (a|b)*abb to an NFA",
+                          "test_strings": ["abb", "babb", "ab", ""]},
+         "re_to_nfa", lambda r: [item['accepted'] for item in details(r).get('matches', [])] == [True, True, False, False]
+         and any('ε' in moves for moves in details(r)['nfa']['transitions'].values())),
+        
+        # Brzozowski-derivative backend builds a DFA directly
+        ("Derivative Regex", {"question": "Convert the regular expression (a|b)*abb to an NFA", "regex_backend": "derivative",
+                              "test_strings": ["abb", "babb", "ab", ""]},
+         "re_to_nfa", lambda r: [item['accepted'] for item in details(r).get('matches', [])] == [True, True, False, False]
+         and len(details(r)['nfa']['states']) == 4
+         and all(isinstance(target, str) for moves in details(r)['nfa']['transitions'].values() for target in moves.values())),
+        
+        # DFA equivalence and inclusion with shortest counterexamples
+        ("DFA Equivalence", {"question": "Are these two DFAs equivalent?", "automaton": EVEN_A_DFA_4,
+                             "reference_automaton": EVEN_A_DFA},
+         "dfa_equivalence", lambda r: details(r).get('equivalent') is True),
+        ("DFA Counterexample", {"question": "Are these two DFAs equivalent?", "automaton": AB_DFA,
+                                "reference_automaton": EVEN_A_DFA},
+         "dfa_equivalence", lambda r: details(r).get('equivalent') is False and details(r).get('counterexample') == ''),
+        ("DFA Inclusion", {"question": "Is the language of the first DFA contained in the second?", "automaton": AB_DFA,
+                           "reference_automaton": EVEN_A_DFA},
+         "dfa_inclusion", lambda r: details(r).get('included') is False and details(r).get('counterexample') == 'ab'),
+        ("Minimize, not equivalence", {"question": "Minimize the DFA to get an equivalent minimal DFA",
+                                       "automaton": EVEN_A_DFA_4},
+         "dfa_minimization", None),
+        ("Regex, not equivalence", {"question": "Convert this automaton to an equivalent regular expression"},
+         "re_to_nfa", None),
+        
+        # Streaming sessions only take DFAs
+        ("Stream Rejects NFA", {"automaton": EPSILON_NFA}, None, None, STREAM_URL, 400),
+        
+        # Memory-mapped file input for DFAs and transducers
+        ("DFA File Membership", {"automaton": EVEN_A_DFA, "path": write_input("abab.txt", "abab")},
+         None, lambda r: r.get('accepted') is True and r.get('symbols_read') == 4, FILE_URL),
+        ("Mealy File Run", {"automaton": AB_MEALY, "machine_type": "mealy", "path": write_input("abba.txt", "abba"),
+                            "output_path": f"{REGRESSION_INPUTS}/abba.out"},
+         None, lambda r: r.get('output_counts') == {'0': 2, '1': 2} and read_input("abba.out") == "1001", FILE_URL),
+        ("File Outside INPUT_DIR", {"automaton": EVEN_A_DFA, "path": "../app.py"}, None, None, FILE_URL, 400),
+        
+        # Parallel chunked runs over a file
+        ("Parallel File Membership", {"automaton": EVEN_A_DFA, "path": write_input("aab.txt", "aab"), "workers": 1},
+         None, lambda r: r.get('accepted') is True and r.get('chunks') == 1, FILE_URL),
+        ("Zero Workers 400", {"automaton": EVEN_A_DFA, "path": write_input("aab.txt", "aab"), "workers": 0},
+         None, None, FILE_URL, 400),
+        ("Boolean Workers 400", {"automaton": EVEN_A_DFA, "path": write_input("aab.txt", "aab"), "workers": True},
+         None, None, FILE_URL, 400),
+        
+        # Multi-symbol stride tables must not change any answer
+        ("Strided Membership", {"question": "Does the DFA accept this string?", "automaton": EVEN_A_DFA,
+                                "test_string": "ab" * 501 + "a", "trace": False},
+         "dfa_membership", lambda r: details(r).get('accepted') is True and details(r).get('final_state') == 'q0'),
+        ("Strided Missing Transition", {"question": "Does the DFA accept this string?", "automaton": EVEN_A_DFA,
+                                        "test_string": "ab" * 50 + "c", "trace": False},
+         "dfa_membership", lambda r: details(r).get('accepted') is False and details(r).get('reason') == 'No transition for symbol "c" from state q0'),
+        ("Stride Budget Off", {"automaton": EVEN_A_DFA, "test_strings": ["ab" * 300, "aab" * 301 + "a", "abx"],
+                               "final_states": True, "stride_budget": 0},
+         None, lambda r: [(item['accepted'], item['final_state']) for item in r.get('results', [])]
+         == [(True, 'q0'), (False, 'q1'), (False, None)], BATCH_URL),
+        ("Stride Budget On", {"automaton": EVEN_A_DFA, "test_strings": ["ab" * 300, "aab" * 301 + "a", "abx"],
+                              "final_states": True, "stride_budget": 1 << 20},
+         None, lambda r: [(item['accepted'], item['final_state']) for item in r.get('results', [])]
+         == [(True, 'q0'), (False, 'q1'), (False, None)], BATCH_URL),
+        
+        # Minimal DFA of a sorted word list; "cat" and "dog" share their suffix states
+        ("DAWG Word List", {"question": "Construct a DFA accepting exactly these words", "words": ["cat", "cats", "dog", "dogs"]},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 7),
+        ("DAWG Word File", {"question": "Construct a DFA accepting exactly these words",
+                            "words_file": write_input("words.txt", "cat\ncats\ndog\ndogs\n")},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 7),
+        
+        # Substring and suffix conditions built from KMP / Aho-Corasick
+        ("KMP Contains", {"question": "Construct a DFA over {a, b} for strings containing 'abab'"},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 5
+         and details(r)['dfa']['accept_states'] == ['q4']),
+        ("KMP Ends With", {"question": "Construct a DFA for strings ending with 01"},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 3
+         and details(r)['dfa']['alphabet'] == ['0', '1']),
+        ("KMP Not Contains", {"question": "Construct a DFA for strings that do not contain 11"},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 3
+         and len(details(r)['dfa']['accept_states']) == 2),
+        ("Aho-Corasick Contains", {"question": "Construct a DFA for strings containing any of 010, 0110"},
+         "dfa_construction", lambda r: len(details(r).get('dfa', {}).get('states', [])) == 5),
+        ("Not A Pattern List", {"question": "Construct a DFA for binary strings without consecutive 1s"},
+         "dfa_construction", None),
+        
+        # Chain-shaped NFAs run bit-parallel with Shift-And
+        ("Shift-And Membership", {"question": "Does the NFA accept abab?", "automaton": ENDS_AB_NFA, "test_string": "abab"},
+         "dfa_membership", lambda r: details(r).get('accepted') is True and details(r).get('simulation_mode') == 'shift_and'
+         and details(r).get('match_ends') == [2, 4]),
+        ("Shift-And Rejects", {"question": "Does the NFA accept aba?", "automaton": ENDS_AB_NFA, "test_string": "aba"},
+         "dfa_membership", lambda r: details(r).get('accepted') is False and details(r).get('match_count') == 1),
+        ("Shift-And Batch", {"automaton": ENDS_AB_NFA, "test_strings": ["ab", "ba", "bbab", ""]},
+         None, lambda r: r.get('simulation_mode') == 'shift_and'
+         and [item['accepted'] for item in r.get('results', [])] == [True, False, True, False], BATCH_URL),
+        
+        # PDA transitions indexed by state, input and stack top
+        ("PDA Indexed Moves", {"question": "Does the PDA accept aabb?", "automaton": ANBN_PDA, "test_string": "aabb",
+                               "membership_engine": "bfs"},
+         "pda_membership", lambda r: details(r).get('accepted') is True and details(r).get('exact') is True
+         and details(r)['sample_moves'][0]['to_config']['stack'] == ['Z0', 'A']),
+        ("PDA Indexed Moves Reject", {"question": "Does the PDA accept aab?", "automaton": ANBN_PDA, "test_string": "aab",
+                                      "membership_engine": "bfs"},
+         "pda_membership", lambda r: details(r).get('accepted') is False and details(r).get('exact') is True),
+        
+        # Explicit configuration search over shared persistent stacks
+        ("PDA Shared Stacks", {"question": "Does the PDA accept abab?", "automaton": BALANCED_PDA, "test_string": "abab",
+                               "membership_engine": "bfs"},
+         "pda_membership", lambda r: details(r).get('accepted') is True and details(r).get('distinct_stacks', 0) > 0
+         and details(r)['sample_moves'][0]['to_config']['stack'] == ['Z0', 'S']),
+        
+        # Graph-structured-stack membership for nondeterministic PDAs
+        ("PDA GSS Membership", {"question": "Does the PDA accept aabb?", "automaton": BALANCED_PDA, "test_string": "aabb"},
+         "pda_membership", lambda r: details(r).get('accepted') is True and details(r).get('exact') is True
+         and details(r).get('membership_engine') == 'gss' and details(r).get('gss_nodes', 0) > 0),
+        ("PDA GSS Rejects", {"question": "Does the PDA accept aabba?", "automaton": BALANCED_PDA, "test_string": "aabba"},
+         "pda_membership", lambda r: details(r).get('accepted') is False and details(r).get('exact') is True),
+        ("PDA GSS Budget", {"question": "Does the PDA accept aabbab?", "automaton": BALANCED_PDA, "test_string": "aabbab",
+                            "max_configurations": 2},
+         "pda_membership", lambda r: details(r).get('exact') is False and details(r).get('stop_reason') == 'configurations'),
+        
+        # Deterministic PDAs run on a single configuration
+        ("Deterministic PDA", {"question": "Does the PDA accept aabb?", "automaton": ANBN_PDA, "test_string": "aabb"},
+         "pda_membership", lambda r: details(r).get('accepted') is True
+         and details(r).get('membership_engine') == 'deterministic' and details(r).get('move_count') == 5),
+        ("Deterministic PDA Rejects", {"question": "Does the PDA accept aab?", "automaton": ANBN_PDA, "test_string": "aab"},
+         "pda_membership", lambda r: details(r).get('accepted') is False and details(r).get('exact') is True
+         and details(r).get('membership_engine') == 'deterministic'),
+        
+        # Pluggable PDA search strategies with per-request budgets
+        ("PDA Best-First Search", {"question": "Does the PDA accept abab?", "automaton": BALANCED_PDA, "test_string": "abab",
+                                   "membership_engine": "best_first", "max_configurations": 100000},
+         "pda_membership", lambda r: details(r).get('accepted') is True and details(r).get('exact') is True
+         and details(r).get('membership_engine') == 'best_first'),
+        ("PDA Search Budget", {"question": "Does the PDA accept aabbab?", "automaton": BALANCED_PDA, "test_string": "aabbab",
+                               "membership_engine": "best_first", "max_configurations": 3},
+         "pda_membership", lambda r: details(r).get('accepted') is False and details(r).get('exact') is False
+         and details(r).get('stop_reason') == 'configurations'),
+        ("PDA Iterative Deepening", {"question": "Does the PDA accept ab?", "automaton": BALANCED_PDA, "test_string": "ab",
+                                     "membership_engine": "iddfs", "max_configurations": 100000},
+         "pda_membership", lambda r: details(r).get('accepted') is True and details(r).get('membership_engine') == 'iddfs'),
+        
+        # PDA reachability by post* / pre* saturation
+        ("PDA Reachable States", {"question": "Which states are reachable in this PDA?", "automaton": ANBN_PDA},
+         "pda_reachability", lambda r: details(r).get('unreachable_states') == ['q3']
+         and details(r).get('stack_tops', {}).get('q2') == ['Z0'] and details(r).get('can_empty_stack') is False),
+        ("PDA Empty Stack", {"question": "Which states are reachable in this PDA?", "automaton": BALANCED_PDA},
+         "pda_reachability", lambda r: details(r).get('empty_stack_states') == ['q2'] and details(r).get('language_empty') is False),
+        ("PDA Query Post*", {"question": "Which states are reachable in this PDA?", "automaton": ANBN_PDA,
+                             "query": {"state": "q2", "stack_top": "A"}, "saturation": "post"},
+         "pda_reachability", lambda r: details(r).get('query', {}).get('reachable') is False),
+        ("PDA Query Pre*", {"question": "Which states are reachable in this PDA?", "automaton": ANBN_PDA,
+                            "query": {"state": "q1", "stack_top": "Z0"}, "saturation": "pre"},
+         "pda_reachability", lambda r: details(r).get('query', {}).get('reachable') is True and details(r).get('saturation') == 'pre'),
+        
+        # PDA to CFG with only the useful triple variables
+        ("PDA to CFG", {"question": "Convert this pushdown automaton to an equivalent CFG", "automaton": BALANCED_PDA},
+         "pda_to_cfg", lambda r: details(r).get('grammar', {}).get('terminals') == ['a', 'b']
+         and details(r).get('rule_count', 0) < details(r).get('naive_rule_count', 0)),
+        ("PDA to CFG Short Form", {"question": "Convert this PDA to a CFG", "automaton": ANBN_PDA},
+         "pda_to_cfg", lambda r: details(r).get('grammar', {}).get('start_symbol') == 'S'
+         and not any('q3' in variable for variable in details(r)['grammar']['non_terminals'])),
+        
+        # Earley parse forests: nullable ambiguity and derivations of a quoted target
+        ("Nullable Ambiguity", {"question": "Is this grammar ambiguous?", "grammar": "S → SS | a | ε", "test_string": "aa"},
+         "cfg_ambiguity", lambda r: details(r).get('is_ambiguous') is True and details(r).get('ambiguous_string') == 'aa'),
+        ("Quoted Derivation", {"question": 'Show the leftmost derivation of "id+id*id"', "grammar": "E → E+E | E*E | id"},
+         "cfg_derivation", lambda r: details(r).get('derivation_steps', [None])[-1] == 'id+id*id'),
+        ("Apostrophe In Question", {"question": "What's the leftmost derivation of 'aab'?", "grammar": "S → aS | b"},
+         "cfg_derivation", lambda r: details(r).get('derivation_steps') == ['S', 'aS', 'aaS', 'aab']),
+        ("Rightmost Derivation Of Target", {"question": "Show the rightmost derivation of 'aab'", "grammar": "S → AB\nA → aA | a\nB → b"},
+         "cfg_derivation", lambda r: details(r).get('derivation_steps') == ['S', 'AB', 'Ab', 'aAb', 'aab']),
+        
+        # CYK over the CNF grammar
+        ("CYK Membership", {"question": "Use CYK to test membership", "grammar": "S → aSb | ab",
+                            "test_strings": ["aabb", "abab"]},
+         "cfg_membership", lambda r: [item['accepted'] for item in details(r).get('results', [])] == [True, False]),
+        ("CYK Table", {"question": "Use CYK to check whether aabb belongs to the grammar", "grammar": "S → aSb | ab",
+                       "test_string": "aabb"},
+         "cfg_membership", lambda r: details(r).get('accepted') is True
+         and any(table['title'] == 'CYK Table' for table in r.get('tables', []))),
+    ]
+
 def main():
     """Run all tests"""
     print("\n" + "="*70)
@@ -101,6 +528,12 @@ def main():
         success = test_feature(name, question, grammar)
         results.append((name, success))
     
+    for name, payload, expected_task, check, *url_args in regression_tests():
+        success = test_regression(name, payload, expected_task, check, *url_args)
+        results.append((name, success))
+    results.append(("Streaming Session", test_stream_session()))
+    shutil.rmtree(os.path.join(INPUT_DIR, REGRESSION_INPUTS), ignore_errors=True)
+    
     # Print summary
     print("\n" + "="*70)
     print("TEST SUMMARY")